@@ -0,0 +1,16 @@
+"""
+Headless benchmarks of baopig
+
+Every scenario runs in a fresh process, with a headless application (see Application.step()).
+The results can be written as JSON, then compared with the results of a former version :
+
+    python -m baopig.bench --output baseline.json
+    ... upgrade baopig ...
+    python -m baopig.bench --output results.json --baseline baseline.json --threshold .15
+
+See 'python -m baopig.bench --help' for the other options
+"""
+
+from .runner import SCENARIOS, Bench, scenario, run_scenario, run_scenarios, compare_results, load_results, \
+    save_results
+from . import scenarios
@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+from baopig.bench import SCENARIOS, run_scenarios, compare_results, load_results, save_results
+
+
+def _parse_assignment(assignment):
+    """'name.key=value' -> ('name', 'key', value), the value is read as JSON if possible"""
+
+    target, _, value = assignment.partition("=")
+    name, _, key = target.partition(".")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return name, key, value
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog="python -m baopig.bench", description="Run the baopig benchmarks")
+    parser.add_argument("scenarios", nargs="*", help="the scenarios to run (default : all of them)")
+    parser.add_argument("-l", "--list", action="store_true", help="list the scenarios and their parameters")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="SCENARIO.PARAM=VALUE",
+                        help="override a parameter, like hover_grid.rows=50")
+    parser.add_argument("-o", "--output", help="write the results in this JSON file")
+    parser.add_argument("-b", "--baseline", help="compare the results with this JSON file")
+    parser.add_argument("-t", "--threshold", type=float, default=.1,
+                        help="the slowdown from which a metric regresses (default : .1, for 10%%)")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="SCENARIO[.METRIC]=VALUE",
+                        help="a specific threshold, like text_set_text.paint=.3")
+    parser.add_argument("--statistic", default="p50", choices=("mean", "min", "p50", "p90", "p99", "max"),
+                        help="the compared statistic (default : p50)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (function, params) in SCENARIOS.items():
+            print(f"{name} {params}\n    {function.__doc__.strip().splitlines()[0]}")
+        return 0
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios : {unknown}")
+
+    params = {}
+    for assignment in args.param:
+        name, key, value = _parse_assignment(assignment)
+        params.setdefault(name, {})[key] = value
+    thresholds = {}
+    for assignment in args.threshold_for:
+        name, metric, value = _parse_assignment(assignment)
+        thresholds[f"{name}.{metric}" if metric else name] = float(value)
+
+    results = run_scenarios(args.scenarios or None, params)
+    for name, scenario_results in results["scenarios"].items():
+        print(f"{name} {scenario_results['params']}")
+        for metric, stats in scenario_results["metrics"].items():
+            print("    {:<12} x{:<5} mean {:>9.3f} ms   p50 {:>9.3f} ms   p90 {:>9.3f} ms   max {:>9.3f} ms".format(
+                metric, stats["count"], *(stats[key] * 1000 for key in ("mean", "p50", "p90", "max"))))
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        for name, scenario_results in results["scenarios"].items():
+            if baseline["scenarios"].get(name, {}).get("params") != scenario_results["params"]:
+                print(f"{name} is not compared : no baseline with the same parameters")
+        regressions = compare_results(results, baseline, args.threshold, thresholds, args.statistic)
+        for regression in regressions:
+            print("REGRESSION {scenario}.{metric} : {baseline:.6f} s -> {current:.6f} s (x{ratio:.2f})".format(
+                **regression))
+        if regressions:
+            return 1
+        print(f"No regression compared to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import json
+import multiprocessing
+import platform
+import time
+import traceback
+import pygame
+from baopig.pybao.statistics import percentile
+from baopig.version.version import version
+
+
+# name -> (function, default parameters)
+SCENARIOS = {}
+
+
+def scenario(**params):
+    """
+    Register a function as a benchmark scenario, with its default parameters
+
+    The function receives a headless Application (not launched yet), a Bench and the
+    parameters. It builds its scene, launches the application, then times what it wants :
+
+        @scenario(count=100)
+        def many_rectangles(app, bench, count):
+            scene = Scene(app)
+            app.launch()
+            with bench.measure("create"):
+                for i in range(count):
+                    Rectangle(scene, pos=(i, i))
+            with bench.measure("paint"):
+                app.step()
+    """
+
+    def register(function):
+        SCENARIOS[function.__name__] = function, params
+        return function
+    return register
+
+
+class Bench:
+    """
+    A Bench collects the durations measured by a scenario
+
+    Every measure with the same name is a sample of the same metric. The metrics are
+    summarized with their count, total, mean, min, p50, p90, p99 and max, in seconds
+    """
+
+    def __init__(self):
+
+        self._samples = {}  # metric name -> list of durations
+
+    samples = property(lambda self: self._samples)
+
+    def add_sample(self, name, duration):
+
+        try:
+            self._samples[name].append(duration)
+        except KeyError:
+            self._samples[name] = [duration]
+
+    def get_results(self):
+
+        results = {}
+        for name, samples in self._samples.items():
+            sorted_samples = sorted(samples)
+            total = sum(samples)
+            results[name] = {
+                "count": len(samples),
+                "total": total,
+                "mean": total / len(samples),
+                "min": sorted_samples[0],
+                "p50": percentile(sorted_samples, .5),
+                "p90": percentile(sorted_samples, .9),
+                "p99": percentile(sorted_samples, .99),
+                "max": sorted_samples[-1],
+            }
+        return results
+
+    def measure(self, name):
+        """Return a context manager who adds the duration of its block as a sample of name"""
+
+        return _Measure(self, name)
+
+
+class _Measure:
+
+    def __init__(self, bench, name):
+
+        self._bench = bench
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:  # a failed operation is not a sample
+            self._bench.add_sample(self._name, time.perf_counter() - self._start)
+
+
+def _run_in_current_process(name, params):
+    """Executed in a fresh process, because an Application can only be launched once"""
+
+    from baopig.lib import Application
+    from . import scenarios  # registers the default scenarios
+
+    function = SCENARIOS[name][0]
+    app = Application(name=name, size=(1024, 768), headless=True)
+    bench = Bench()
+    function(app, bench, **params)
+    return bench.get_results()
+
+
+def _work(connection, name, params):
+
+    try:
+        connection.send((True, _run_in_current_process(name, params)))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def run_scenario(name, **params):
+    """
+    Run a scenario in a new process, and return its results :
+        {"params": {...}, "metrics": {metric: {"count": ..., "mean": ..., "p50": ..., ...}}}
+    The given parameters override the default ones
+    """
+
+    if name not in SCENARIOS:
+        raise KeyError(f"Unknown scenario : '{name}' (existing scenarios : {tuple(SCENARIOS)})")
+    unknown = set(params) - set(SCENARIOS[name][1])
+    if unknown:
+        raise KeyError(f"Unknown parameters for {name} : {tuple(unknown)}")
+    params = dict(SCENARIOS[name][1], **params)
+
+    # Not a multiprocessing.Pool : pygame catches SIGTERM, so a pool cannot terminate its workers
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_work, args=(sender, name, params), name=f"bench-{name}", daemon=True)
+    process.start()
+    sender.close()
+    try:
+        succeeded, value = receiver.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"The scenario {name} crashed (exit code : {process.exitcode})")
+    process.join()
+    if not succeeded:
+        raise RuntimeError(f"The scenario {name} failed :\n{value}")
+    return {"params": params, "metrics": value}
+
+
+def run_scenarios(names=None, params=None):
+    """
+    Run the scenarios (default : all of them), one after the other
+    params is a dictionnary : scenario name -> parameters to override
+    Return the results, ready to be written as JSON
+    """
+
+    if names is None:
+        names = tuple(SCENARIOS)
+    if params is None:
+        params = {}
+
+    return {
+        "baopig": str(version),
+        "pygame": pygame.version.ver,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        "scenarios": {name: run_scenario(name, **params.get(name, {})) for name in names},
+    }
+
+
+def compare_results(results, baseline, threshold=.1, thresholds=None, statistic="p50"):
+    """
+    Compare results with baseline results, and return the list of regressions
+
+    A metric regresses when its statistic grows more than its threshold (.1 -> 10% slower)
+    thresholds overrides the threshold by 'scenario' or by 'scenario.metric'
+    The scenarios run with other parameters than in the baseline are not compared
+
+    Each regression is a dictionnary : scenario, metric, baseline, current, ratio
+    """
+
+    if thresholds is None:
+        thresholds = {}
+
+    regressions = []
+    for name, scenario_results in results["scenarios"].items():
+        try:
+            scenario_baseline = baseline["scenarios"][name]
+        except KeyError:
+            continue
+        if scenario_baseline["params"] != scenario_results["params"]:
+            continue
+        for metric, stats in scenario_results["metrics"].items():
+            try:
+                reference = scenario_baseline["metrics"][metric][statistic]
+            except KeyError:
+                continue
+            current = stats[statistic]
+            limit = thresholds.get(f"{name}.{metric}", thresholds.get(name, threshold))
+            if reference > 0 and current > reference * (1 + limit):
+                regressions.append({"scenario": name, "metric": metric, "baseline": reference,
+                                    "current": current, "ratio": current / reference})
+    return regressions
+
+
+def load_results(path):
+
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_results(results, path):
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
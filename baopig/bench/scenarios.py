@@ -0,0 +1,380 @@
+import random
+import threading
+import time
+import pygame
+from baopig.communicative import Communicative
+from baopig.lib import Scene, Zone, Layer, GridLayer, Rectangle, paint_lock
+from baopig.time.timer import RepeatingTimer
+from baopig.widgets import Button, Text, ScrollView, DataGrid
+from .runner import scenario
+
+
+def _motion(pos, rel=(1, 1)):
+
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel, buttons=(0, 0, 0), touch=False)
+
+
+class _Receiver(Communicative):
+
+    def __init__(self):
+
+        Communicative.__init__(self)
+        self.count = 0
+
+    def handle(self):
+        self.count += 1
+
+    def handle_value(self, value=1):
+        self.count += value
+
+
+def _make_text(length, line_length, seed):
+    """Return a deterministic text of random words, with a line break every line_length characters"""
+
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    lines = []
+    size = 0
+    while size < length:
+        words = []
+        line_size = 0
+        while line_size < line_length:
+            word = "".join(rnd.choice(letters) for _ in range(rnd.randint(2, 9)))
+            words.append(word)
+            line_size += len(word) + 1
+        line = " ".join(words)[:line_length]
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)[:length]
+
+
+@scenario(count=400, cols=20)
+def buttons_grid(app, bench, count, cols):
+    """Create count Buttons in a GridLayer, then paint them"""
+
+    scene = Scene(app)
+    app.launch()
+    app.step()
+
+    zone = Zone(scene, size=scene.size)
+    GridLayer(zone, nbrows=-(-count // cols), nbcols=cols, row_height=30, col_width=50)
+    with bench.measure("create"):
+        for i in range(count):
+            Button(zone, str(i), row=i // cols, col=i % cols)
+    with bench.measure("paint"):
+        app.step()
+
+
+@scenario(length=10000, line_length=80, max_width=None, repeat=5)
+def text_set_text(app, bench, length, line_length, max_width, repeat):
+    """
+    Replace the text of a Text widget by a long text, then paint it
+    With a max_width, the lines are also cut to fit in
+    """
+
+    scene = Scene(app)
+    text = Text(scene, "-") if max_width is None else Text(scene, "-", max_width=max_width)
+    app.launch()
+    app.step()
+
+    for i in range(repeat):
+        string = _make_text(length, line_length, seed=i)
+        with bench.measure("set_text"):
+            text.set_text(string)
+        with bench.measure("paint"):
+            app.step()
+
+
+@scenario(texts=80, frames=100)
+def live_texts(app, bench, texts, frames):
+    """Change the text of many small Texts at every frame, like a dashboard of live values"""
+
+    scene = Scene(app)
+    widgets = [Text(scene, "0", pos=(10 + 60 * (i % 16), 10 + 20 * (i // 16))) for i in range(texts)]
+    app.launch()
+    app.step()
+
+    for frame in range(frames):
+        with bench.measure("frame"):
+            for i, text in enumerate(widgets):
+                text.set_text(f"{frame * i % 1000}.{i}")
+            app.step(dt=1 / 60)
+
+
+@scenario(children=5000, scrolls=200)
+def scrollview_scroll(app, bench, children, scrolls):
+    """Scroll with the mouse wheel through a ScrollView containing a Zone with many children"""
+
+    scene = Scene(app)
+    scrollview = ScrollView(scene, size=(400, 600), pos=(20, 20))
+    content = Zone(scrollview, size=(380, children * 10))
+    with bench.measure("create"):
+        for i in range(children):
+            Rectangle(content, size=(300, 8), pos=(0, i * 10), color=(i % 256, 100, 100))
+    with bench.measure("first_paint"):
+        app.launch()
+        app.step()
+
+    center = scrollview.abs_rect.center
+    app.step([_motion(center)])
+    button = 5  # down
+    for i in range(scrolls):
+        if scrollview.y_scroller.val >= scrollview.y_scroller.maxval:
+            button = 4  # up
+        elif scrollview.y_scroller.val <= 0:
+            button = 5
+        event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=center, button=button)
+        with bench.measure("frame"):
+            app.step([event], dt=.05)
+
+
+@scenario(children=2000, repaints=20)
+def overlapping_children(app, bench, children, repaints):
+    """
+    Paint a Zone crowded with small opaque Rectangles overlapping each other, the worst case
+    of the occlusion culling, then repaint it entirely again and again
+    """
+
+    scene = Scene(app)
+    zone = Zone(scene, size=(640, 480), background_color=(255, 255, 255))
+    rnd = random.Random(0)
+    for i in range(children):
+        Rectangle(zone, size=(rnd.randint(4, 40), rnd.randint(4, 40)),
+                  pos=(rnd.randrange(620), rnd.randrange(460)), color=(i % 256, 100, 100))
+    with bench.measure("first_paint"):
+        app.launch()
+        app.step()
+
+    for i in range(repaints):
+        with bench.measure("repaint"):
+            zone._flip()
+            app.step()
+
+
+@scenario(children=5000, frames=200, changes=5, indexed=None)
+def large_layer(app, bench, children, frames, changes, indexed):
+    """
+    Recolor and move a few Rectangles among many small ones in one layer, while the mouse moves over them
+    indexed is given to the Layer : None builds the spatial index from Layer.INDEX_THRESHOLD children
+    """
+
+    scene = Scene(app)
+    zone = Zone(scene, size=(640, 480), background_color=(255, 255, 255))
+    layer = Layer(zone, indexed=indexed)
+    rnd = random.Random(0)
+    rects = [Rectangle(zone, layer=layer, size=(rnd.randint(4, 12), rnd.randint(4, 12)),
+                       pos=(rnd.randrange(630), rnd.randrange(470)), color=(i % 256, 100, 100))
+             for i in range(children)]
+    app.launch()
+    app.step()
+
+    for i in range(frames):
+        with bench.measure("frame"):
+            for rect in rnd.sample(rects, changes):
+                rect.set_color((rnd.randrange(256), 100, 100))
+            rnd.choice(rects).move(rnd.randint(-3, 3), rnd.randint(-3, 3))
+            app.step([_motion((i * 3 % 640, i * 7 % 480))], dt=1 / 60)
+
+
+@scenario(children=2000, frames=100, changes=10)
+def painter_contention(app, bench, children, frames, changes):
+    """
+    While a painter thread repaints Zones crowded with Rectangles again and again, the main
+    thread moves a few Rectangles and creates one per frame, who all need the paint_lock.
+    'main_wait' is the time the main thread waited for the lock during each frame, read from
+    the counters of the lock
+    """
+
+    scene = Scene(app)
+    rnd = random.Random(0)
+    zones = [Zone(scene, size=(200, 150), pos=(i % 5 * 200, i // 5 * 150), background_color=(255, 255, 255))
+             for i in range(25)]
+    rects = [Rectangle(rnd.choice(zones), size=(rnd.randint(4, 40), rnd.randint(4, 40)),
+                       pos=(rnd.randrange(180), rnd.randrange(130)), color=(i % 256, 100, 100))
+             for i in range(children)]
+    app.launch()
+    app.step()
+
+    is_running = True
+
+    def paint_forever():
+        while is_running:
+            for zone in zones:
+                zone._warn_change(zone.auto_rect)  # a heavy frame, every zone is painted again
+            app.painter.paint()
+
+    painter = threading.Thread(target=paint_forever, name="Painter")
+    painter.start()
+    try:
+        time.sleep(.05)
+        for i in range(frames):
+            wait = paint_lock.get_stats().get("MainThread", {}).get("wait", 0.)
+            with bench.measure("main_frame"):
+                for rect in rnd.sample(rects, changes):
+                    rect.move(rnd.choice((-1, 1)), rnd.choice((-1, 1)))
+                rects.append(Rectangle(rnd.choice(zones), size=(10, 10), pos=(rnd.randrange(180), rnd.randrange(130))))
+            bench.add_sample("main_wait", paint_lock.get_stats()["MainThread"]["wait"] - wait)
+            time.sleep(1 / 120)  # the rest of the main loop
+    finally:
+        is_running = False
+        painter.join()
+
+
+@scenario(rows=50000, cols=20, scrolls=200)
+def datagrid_scroll(app, bench, rows, cols, scrolls):
+    """Sort a big DataGrid, then scroll through it with the mouse wheel"""
+
+    scene = Scene(app)
+    rnd = random.Random(0)
+    columns = {f"col {col}": [rnd.randint(0, 100000) for _ in range(rows)] for col in range(cols)}
+    with bench.measure("create"):
+        grid = DataGrid(scene, columns=columns, size=(800, 600), pos=(20, 20))
+        app.launch()
+        app.step()
+    with bench.measure("sort"):
+        grid.sort(1)
+        app.step()
+
+    center = grid.abs_rect.center
+    app.step([_motion(center)])
+    for i in range(scrolls):
+        button = 5 if i < scrolls // 2 else 4  # down, then up
+        event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=center, button=button)
+        with bench.measure("frame"):
+            app.step([event], dt=.05)
+
+
+@scenario(rows=30, cols=30, moves=600, geometry_store=False)
+def hover_grid(app, bench, rows, cols, moves, geometry_store):
+    """
+    Move the mouse across a dense grid of Buttons, so the hovered Button changes at almost every frame
+    With geometry_store, the mouse searches the hovered Button in the GeometryStore of the scene
+    """
+
+    scene = Scene(app)
+    zone = Zone(scene, size=scene.size)
+    GridLayer(zone, nbrows=rows, nbcols=cols, row_height=24, col_width=32)
+    for row in range(rows):
+        for col in range(cols):
+            Button(zone, "", size=(30, 22), row=row, col=col)
+    scene.set_geometry_store(geometry_store)
+    app.launch()
+    app.step()
+
+    # A serpentine path through the grid, at 8 pixels per frame
+    width, height = cols * 32, rows * 24
+    x, y, dx = 4, 4, 8
+    for i in range(moves):
+        x += dx
+        if not 0 < x < width:
+            dx = -dx
+            x += 2 * dx
+            y = (y + 24) % height
+        with bench.measure("frame"):
+            app.step([_motion((x, y), rel=(dx, 0))], dt=1 / 60)
+
+
+@scenario(rows=30, cols=30, frames=200, samples=8)
+def hover_grid_fast_mouse(app, bench, rows, cols, frames, samples):
+    """Like hover_grid, with a mouse sending several motions per frame, like a high polling rate mouse"""
+
+    scene = Scene(app)
+    zone = Zone(scene, size=scene.size)
+    GridLayer(zone, nbrows=rows, nbcols=cols, row_height=24, col_width=32)
+    for row in range(rows):
+        for col in range(cols):
+            Button(zone, "", size=(30, 22), row=row, col=col)
+    app.launch()
+    app.step()
+
+    width, height = cols * 32, rows * 24
+    x, y, dx = 4, 4, 3
+    for i in range(frames):
+        events = []
+        for sample in range(samples):
+            x += dx
+            if not 0 < x < width:
+                dx = -dx
+                x += 2 * dx
+                y = (y + 24) % height
+            events.append(_motion((x, y), rel=(dx, 0)))
+        with bench.measure("frame"):
+            app.step(events, dt=1 / 60)
+
+
+@scenario(zones=40, children=50, moves=100)
+def move_panel(app, bench, zones, children, moves):
+    """Move a panel containing zones * children small Rectangles back and forth, like a dragged window"""
+
+    scene = Scene(app)
+    panel = Zone(scene, size=(600, 500), pos=(20, 20))
+    for i in range(zones):
+        zone = Zone(panel, size=(100, 60), pos=(i % 6 * 100, i // 6 * 60))
+        for j in range(children):
+            Rectangle(zone, size=(8, 8), pos=(j % 10 * 10, j // 10 * 10), color=(i * 6 % 256, j * 5, 100))
+    app.launch()
+    app.step()
+
+    for i in range(moves):
+        dx = 3 if i % 40 < 20 else -3
+        with bench.measure("move"):
+            panel.move(dx, 1 if i % 2 else -1)
+        with bench.measure("frame"):
+            app.step(dt=1 / 60)
+
+
+@scenario(timers=1000, rectangles=100, steps=300)
+def many_timers(app, bench, timers, rectangles, steps):
+    """Run a lot of RepeatingTimers, some of them changing the color of a Rectangle"""
+
+    scene = Scene(app)
+    rnd = random.Random(0)
+    rects = [Rectangle(scene, size=(20, 20), pos=(i % 40 * 25, i // 40 * 25), color=(0, 0, 0))
+             for i in range(rectangles)]
+
+    def switch_color(rect):
+        rect.set_color((255, 255, 255) if rect.color == (0, 0, 0) else (0, 0, 0))
+
+    timers = [RepeatingTimer(rnd.uniform(.01, 1), switch_color, rects[i % rectangles])
+              if i % 2 else RepeatingTimer(rnd.uniform(.01, 1), lambda: None)
+              for i in range(timers)]
+    app.launch()
+    for timer in timers:
+        timer.start()
+    app.step()
+
+    for i in range(steps):
+        with bench.measure("frame"):
+            app.step(dt=1 / 60)
+
+
+@scenario(connections=1000, emits=100, rounds=20)
+def signals(app, bench, connections, emits, rounds):
+    """
+    Connect many slots to a signal, emit it with and without argument, then disconnect them
+    A connect or disconnect sample is a batch of connections calls, an emit sample a batch of emits
+    """
+
+    emitter = _Receiver()
+    emitter.create_signal("PING")
+    signal = emitter.signal.PING
+    receivers = [_Receiver() for _ in range(connections)]
+    slots = [(receiver.handle if i % 2 else receiver.handle_value, receiver) for i, receiver in enumerate(receivers)]
+    rnd = random.Random(0)
+    app.launch()
+
+    for i in range(rounds):
+        with bench.measure("connect"):
+            for slot, receiver in slots:
+                signal.connect(slot, owner=receiver)
+        with bench.measure("emit"):
+            for j in range(emits):
+                signal.emit()
+        with bench.measure("emit_args"):
+            for j in range(emits):
+                signal.emit(1)
+        order = slots[:]
+        rnd.shuffle(order)
+        with bench.measure("disconnect"):
+            for slot, receiver in order:
+                signal.disconnect(slot)
@@ -1,12 +1,46 @@
 
 
 import inspect
+import weakref
 from baopig.pybao.objectutilities import Object
 from baopig.io.logging import LOGGER
 from .documentation import ApplicationExit
 from .documentation import Communicative as CommunicativeDoc
 
 
+# (code, is_bound) -> the function needs arguments, see _need_arguments()
+_arities = {}
+
+
+def _get_key(slot):
+    """
+    Return the key of a slot in Signal._slots
+    A bound method is identified by its object and its function, like in bound methods equality
+    """
+
+    if inspect.ismethod(slot):
+        return id(slot.__self__), slot.__func__
+    return slot
+
+
+def _need_arguments(slot):
+    """
+    Return True if the slot has parameters
+    The answer only depends on the code of the function and if it is bound, so it is cached
+    """
+
+    function = slot.__func__ if inspect.ismethod(slot) else slot
+    code = getattr(function, "__code__", None)
+    if code is None or hasattr(function, "__wrapped__") or hasattr(function, "__signature__"):
+        return len(inspect.signature(slot).parameters) > 0  # partials, builtins, decorated functions...
+
+    key = code, function is not slot
+    need_arguments = _arities.get(key)
+    if need_arguments is None:
+        need_arguments = _arities[key] = len(inspect.signature(slot).parameters) > 0
+    return need_arguments
+
+
 class Signal:
 
     def __init__(self, emitter, id):
@@ -16,50 +50,81 @@ class Signal:
 
         self._emitter = emitter
         self._id = id
-        self._connections = []
+        self._connections = {}  # connection -> None, in the order of connection
+        self._slots = {}  # slot key -> connections of the slot, see _get_key()
+        self._calls = ()  # (connection, function, need_arguments) for each connection, None after a change
 
     def __str__(self):
 
         return f"Signal(id={self._id}, emitter={self._emitter})"
 
-    def connect(self, command, owner):
+    def _get_calls(self):
+
+        calls = self._calls
+        if calls is None:
+            calls = self._calls = tuple((con, con.call, con.need_arguments) for con in self._connections)
+        return calls
+
+    def connect(self, command, owner, weak=False):
         """
         Connect the command to the signal
         When self will emit 'signal', the owner's method 'command' will be executed
         :param command: a method of owner
         :param owner: a Communicative object
+        :param weak: if True, command must be a bound method, and the connection doesn't keep
+                     its object alive : the connection is killed when the object dies
         NOTE : The "owner" parameter is very important when it comes to deletion
                When the owner is deleted, this connection is automatically killed
         """
         if not callable(command):
             raise TypeError(f"'{command}' object is not callable")
-        for con in self._connections:
-            if con.slot is command:
-                raise PermissionError(f"This command is already connected to the signal {self._id}")
-
-        conn = Connection(owner, self, command)
-        self._connections.append(conn)
+        if weak and not inspect.ismethod(command):
+            raise TypeError(f"Only a bound method can be weakly connected, not {command}")
+
+        key = _get_key(command)
+        connections = self._slots.get(key)
+        if connections is None:
+            connections = self._slots[key] = []
+        else:
+            for con in connections:
+                if con.slot is command:
+                    raise PermissionError(f"This command is already connected to the signal {self._id}")
+
+        conn = Connection(owner, self, command, weak=weak)
+        conn._key = key
+        connections.append(conn)
+        self._connections[conn] = None
+        self._calls = None
         if owner is not None:
             owner._connections.add(conn)
 
     def disconnect(self, command):
 
-        for con in tuple(self._connections):
-            if con.slot == command:
-                con.kill()
-                return
-        raise ValueError(f"This command is not connected to the signal {self._id}")
+        connections = self._slots.get(_get_key(command))
+        if not connections:
+            raise ValueError(f"This command is not connected to the signal {self._id}")
+        connections[0].kill()
 
     def emit(self, *args):
         """
         Emitting a signal will execute all its connected commands
         If an error occurs while executing a command, it will be raised
+        The commands connected during the emission are executed at the next one
         """
-        for con in self._connections:
-            if con.need_arguments:
-                con.slot(*args)
-            else:
-                con.slot()
+        calls = self._get_calls()
+        if args:
+            for con, function, need_arguments in calls:
+                if calls is not self._calls and con not in self._connections:
+                    continue  # killed by a previous command
+                if need_arguments:
+                    function(*args)
+                else:
+                    function()
+        else:
+            for con, function, _ in calls:
+                if calls is not self._calls and con not in self._connections:
+                    continue
+                function()
 
     def emit_with_catch(self, *args):
         """
@@ -68,12 +133,15 @@ class Signal:
         The error ApplicationExit is not catched
         """
 
-        for con in self._connections:
+        calls = self._get_calls()
+        for con, function, need_arguments in calls:
+            if calls is not self._calls and con not in self._connections:
+                continue
             try:
-                if con.need_arguments:
-                    con.slot(*args)
+                if need_arguments and args:
+                    function(*args)
                 else:
-                    con.slot()
+                    function()
             except ApplicationExit as e:
                 raise e
             except Exception as e:
@@ -81,17 +149,54 @@ class Signal:
 
 
 class Connection:
+    """
+    A Connection links a slot to a signal, until it is killed
+
+    A weak Connection only keeps a weakref to its slot, a bound method : when the object
+    of the method dies, the connection is killed
+    """
 
-    def __init__(self, owner, signal, slot):
+    def __init__(self, owner, signal, slot, weak=False):
 
         self.owner = owner
         self.signal = signal
-        self.slot = slot
-        self.need_arguments = len(inspect.signature(slot).parameters) > 0
+        self.need_arguments = _need_arguments(slot)
+        self._key = None  # set by Signal.connect()
+        if weak:
+            self._slot = None
+            self._weak_slot = weakref.WeakMethod(slot, self._handle_slot_death)
+            self.call = self._call_weak_slot
+        else:
+            self._slot = self.call = slot
+            self._weak_slot = None
+
+    is_weak = property(lambda self: self._weak_slot is not None)
+    slot = property(lambda self: self._slot if self._weak_slot is None else self._weak_slot())
+
+    def _call_weak_slot(self, *args):
+
+        slot = self._weak_slot()
+        if slot is None:
+            return
+        if self.need_arguments and args:
+            slot(*args)
+        else:
+            slot()
+
+    def _handle_slot_death(self, weak_slot):
+
+        if self in self.signal._connections:
+            self.kill()
 
     def kill(self):
 
-        self.signal._connections.remove(self)
+        signal = self.signal
+        del signal._connections[self]
+        connections = signal._slots[self._key]
+        connections.remove(self)
+        if not connections:
+            del signal._slots[self._key]
+        signal._calls = None
         if self.owner is not None:
             self.owner._connections.remove(self)
 
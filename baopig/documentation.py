@@ -331,15 +331,19 @@ class Runable(Widget):
     :Attributes:
     ------------
         is_running: bool -> True if the widget is running
+        min_interval: float -> minimum time between two run() calls, in seconds (0 by default)
 
     :Methods:
     ---------
         run() -> abstract - called as much as possible, while the object is running
 
+        set_min_interval(interval) -> throttles run(), useful for widgets polling a value
+
         set_running(val) -> starts or stops to run the widget
     """
 
     is_running: bool
+    min_interval: float
 
     def run(self):
         """ Abstract - called as much as possible, while the object is running """
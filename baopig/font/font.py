@@ -285,8 +285,9 @@ filepaths = {}
 sys_fonts = pygame.font.get_fonts()
 
 # The 2 last font files, on my ACER with Windows 11, are bugged
-sys_fonts.remove('leelawadeegras')
-sys_fonts.remove('microsoftuighurgras')
+for _bugged_font in ('leelawadeegras', 'microsoftuighurgras'):
+    if _bugged_font in sys_fonts:  # only installed on Windows
+        sys_fonts.remove(_bugged_font)
 
 if __name__ == "__main__":
     import os
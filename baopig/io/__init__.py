@@ -2,3 +2,4 @@
 from .logging import LOGGER
 from .keyboard import keyboard
 from .mouse import mouse
+from .trace import TraceRecorder, TraceReplayer
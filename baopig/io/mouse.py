@@ -1,9 +1,9 @@
 
 
-import time
 import pygame
 from baopig.pybao.objectutilities import Object, History
 from baopig.communicative import Communicative
+from baopig.time.utilities import clock
 from baopig.documentation import Container, Focusable, HoverableByMouse, LinkableByMouse, ScrollableByMouse
 from .logging import LOGGER
 
@@ -51,6 +51,13 @@ class _Mouse(Communicative):
         """
         self._hovered_widget = None
 
+        """
+        The last result of _get_touched_widget() : (scene, layout epoch, touched widget, free area)
+        The free area is the part of the touched widget where no other widget can be touched,
+        while the layout epoch of the scene doesn't change
+        """
+        self._last_touch = None
+
         """
         When the mouse click on a Text inside a Button inside a Zone inside a Scene,
         then the Text is linked
@@ -85,6 +92,10 @@ class _Mouse(Communicative):
         self._display = None
         self._is_hovering_display = True
 
+        # When the mouse moves faster than the frames, the motions of a frame are merged,
+        # so the hovered widget is searched once per frame, see merge_motions()
+        self._merges_motions = True
+
     def __repr__(self):
         return "<Mouse(" + str(self.__dict__) + ")>"
 
@@ -96,6 +107,7 @@ class _Mouse(Communicative):
     y = property(lambda self: self._pos[1])
 
     is_hovering_display = property(lambda self: self._is_hovering_display)
+    merges_motions = property(lambda self: self._merges_motions)
     linked_widget = property(lambda self: self._linked_widget)
     hovered_widget = property(lambda self: self._hovered_widget)
 
@@ -119,21 +131,71 @@ class _Mouse(Communicative):
     def _get_touched_widget(self):
         """ Return the youngest touchable widget that is touched """
 
+        def is_touchable(widget):
+            return widget.is_touchable_by_mouse
+
         def get_touched_widget(cont):
 
+            pos = cont.abs_rect.referencing(self.pos)  # hitboxes are relative to their container
             for layer in reversed(tuple(cont.layers_manager.touchable_layers)):
                 assert layer.touchable
-                for child in reversed(layer):
-                    if child.is_touchable_by_mouse and child.collidemouse():
-                        if isinstance(child, Container):
-                            touched = get_touched_widget(child)
-                            if touched is not None:
-                                return touched
-                        return child
+                child = layer.get_topmost_at(pos, key=is_touchable)
+                if child is not None:
+                    if isinstance(child, Container):
+                        touched = get_touched_widget(child)
+                        if touched is not None:
+                            return touched
+                    return child
             if cont.is_touchable_by_mouse:
                 return cont
 
-        return get_touched_widget(self._application.focused_scene)
+        scene = self._application.focused_scene
+
+        # Fast path : nothing moved since the last search, and the mouse is still in the free area
+        last_touch = self._last_touch
+        if last_touch is not None and last_touch[0] is scene and last_touch[1] == scene._layout_epoch and \
+                last_touch[3] is not None and last_touch[3].collidepoint(self.pos):
+            touched = last_touch[2]
+            if not isinstance(touched, Container) or get_touched_widget(touched) is touched:
+                return touched
+
+        store = scene.geometry_store
+        touched = get_touched_widget(scene) if store is None else store.get_topmost_at(self.pos)
+        if touched is None:
+            self._last_touch = None
+        else:
+            free_area = self._get_free_area(touched) if store is None else store.get_free_area(touched)
+            self._last_touch = scene, scene._layout_epoch, touched, free_area
+        return touched
+
+    @staticmethod
+    def _get_free_area(widget):
+        """
+        Return the part of the widget's abs_hitbox where the mouse can only touch the widget or
+        its children, or None if another touchable widget is in front of it
+        """
+
+        def is_in_front(other):
+            return other.is_touchable_by_mouse and other is not child
+
+        area = pygame.Rect(widget.abs_hitbox)
+        child = widget
+        while child is not child.scene:
+            parent = child.parent
+            area = area.clip(parent.abs_hitbox)
+            rect = area.move(-parent.abs_rect.left, -parent.abs_rect.top)  # hitboxes are relative to their container
+            for layer in reversed(tuple(parent.layers_manager.touchable_layers)):
+                colliding = layer.get_visible_colliding(rect)
+                if layer is child.layer:
+                    # Only the widgets in front of child
+                    colliding = colliding[colliding.index(child) + 1:] if child in colliding else colliding
+                    if any(map(is_in_front, colliding)):
+                        return None
+                    break
+                if any(map(is_in_front, colliding)):
+                    return None
+            child = parent
+        return area if area.w and area.h else None
 
     def _hover_display(self):
 
@@ -211,6 +273,13 @@ class _Mouse(Communicative):
         # While the mouse left button was press, we didn't update hovered_widget
         self.update_hovered_widget()
 
+    def can_merge_motions(self):
+        """Return True if the next mouse motions can be merged, see merge_motions()"""
+
+        if not self._merges_motions:
+            return False
+        return self._linked_widget is None or not self._linked_widget.needs_every_motion
+
     def get_pos_relative_to(self, widget):
 
         return widget.abs_rect.referencing(self.pos)
@@ -224,6 +293,20 @@ class _Mouse(Communicative):
             # Here, the button has never been pressed
             return 0
 
+    def merge_motions(self, motion, next_motion):
+        """
+        Return a MOUSEMOTION event equivalent to two successive MOUSEMOTION events :
+        the position and the buttons of the last one, and the sum of their movements
+
+        The application merges the motions received during a frame, unless :
+            - the merge is disabled, see set_motion_merging()
+            - the linked widget needs every motion, like a drawing zone, see
+              LinkableByMouse.needs_every_motion
+        """
+
+        rel = (motion.rel[0] + next_motion.rel[0], motion.rel[1] + next_motion.rel[1])
+        return pygame.event.Event(pygame.MOUSEMOTION, next_motion.dict, rel=rel)
+
     def receive(self, event):
 
         # Unknown & skipable events
@@ -278,7 +361,7 @@ class _Mouse(Communicative):
                     scrolled.handle_mouse_scroll(event)
 
             else:  # Ignore wheel
-                self.clic_history.append(Object(time=time.time(), button=event.button, pos=event.pos))
+                self.clic_history.append(Object(time=clock.get_time(), button=event.button, pos=event.pos))
                 self._pressed_buttons[event.button] = True
 
                 self.has_double_clicked = \
@@ -347,6 +430,11 @@ class _Mouse(Communicative):
                 getattr(self.signal, signal_id).emit(event)
                 break
 
+    def set_motion_merging(self, merges_motions):
+        """If merges_motions is False, every mouse motion is treated, even many times per frame"""
+
+        self._merges_motions = bool(merges_motions)
+
     def update_hovered_widget(self):
 
         if self.linked_widget is not None:
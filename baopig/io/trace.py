@@ -0,0 +1,184 @@
+import gzip
+import json
+import time
+import pygame
+from baopig.documentation import ApplicationExit
+from baopig.pybao.statistics import percentile
+from baopig.time.utilities import clock
+from .logging import LOGGER
+
+
+_TRACE_FORMAT = "baopig-trace"
+_TRACE_VERSION = 1
+
+
+def _encode_attributes(event):
+    """Return the attributes of an event who can be written in a trace"""
+
+    attributes = {}
+    for key, value in event.dict.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        elif not isinstance(value, (bool, int, float, str, list)) and value is not None:
+            continue  # like event.window
+        attributes[key] = value
+    return attributes
+
+
+def _decode_attributes(attributes):
+
+    return {key: tuple(value) if isinstance(value, list) else value for key, value in attributes.items()}
+
+
+class TraceRecorder:
+    """
+    A TraceRecorder writes the events received by the application into a trace file
+
+    The events are written by batch : one line per call to Application._manage_events(),
+    with the time elapsed since the start of the recording. The file is a gzip-compressed
+    JSON lines file, so a long session stays small :
+
+        {"format": "baopig-trace", "version": 1, "size": [800, 600]}
+        {"t": 0.0163, "events": [[1024, {"pos": [52, 40], "rel": [3, 1], "buttons": [0, 0, 0], ...}]]}
+
+    The attributes who cannot be written, like event.window, are ignored
+
+    Usually, a TraceRecorder is created by Application.start_input_recording()
+    """
+
+    def __init__(self, path, size=None, ignored_types=()):
+
+        self._path = path
+        self._size = size
+        self._ignored_types = frozenset(ignored_types)
+        self._file = None
+        self._start_time = None
+        self._recorded_batches = 0
+        self._recorded_events = 0
+
+    is_recording = property(lambda self: self._file is not None)
+    path = property(lambda self: self._path)
+    recorded_batches = property(lambda self: self._recorded_batches)
+    recorded_events = property(lambda self: self._recorded_events)
+
+    def record(self, events):
+        """Write a batch of events, in the order they were received"""
+
+        if self._file is None:
+            raise PermissionError("The recorder is not started")
+        events = [[event.type, _encode_attributes(event)] for event in events
+                  if event.type not in self._ignored_types]
+        if not events:
+            return
+        line = {"t": round(clock.get_time() - self._start_time, 6), "events": events}
+        self._file.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self._recorded_batches += 1
+        self._recorded_events += len(events)
+
+    def start(self):
+
+        if self._file is not None:
+            raise PermissionError("Already recording")
+        self._file = gzip.open(self._path, "wt", encoding="utf-8")
+        header = {"format": _TRACE_FORMAT, "version": _TRACE_VERSION,
+                  "size": None if self._size is None else list(self._size)}
+        self._file.write(json.dumps(header) + "\n")
+        self._start_time = clock.get_time()
+
+    def stop(self):
+
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+
+class TraceReplayer:
+    """
+    A TraceReplayer feeds a trace file, written by a TraceRecorder, to a headless application
+
+    Each batch of events is given to Application.step(), who treats them exactly like the
+    main loop does (mouse.receive(), keyboard.receive(), then the focused widget), runs the
+    timers and the Runables, and paints. The virtual clock moves as it did during the
+    recording, so the timers behave the same way.
+
+    The replay can follow the recorded rhythm (speed=1 for real time, 2 for twice faster...)
+    or go as fast as possible (speed=None). At the end, the duration of each frame is
+    summarized in percentiles, to be compared between two versions of an application :
+
+        replayer = TraceReplayer("session.jsonl.gz")
+        stats = replayer.replay(app)
+        stats["p99"]  # -> 0.0042, 99% of the frames took less than 4.2 ms
+    """
+
+    def __init__(self, path):
+
+        self._path = path
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline())
+            if header.get("format") != _TRACE_FORMAT:
+                raise ValueError(f"Not a trace file : {path}")
+            if header["version"] > _TRACE_VERSION:
+                raise ValueError(f"Unsupported trace version : {header['version']}")
+            self._size = None if header["size"] is None else tuple(header["size"])
+            self._batches = [json.loads(line) for line in file if line.strip()]
+
+    def __len__(self):
+        return len(self._batches)
+
+    path = property(lambda self: self._path)
+    size = property(lambda self: self._size)
+
+    def get_batches(self):
+        """Yield the recorded batches, as (time, list of pygame events)"""
+
+        for batch in self._batches:
+            yield batch["t"], [pygame.event.Event(event_type, _decode_attributes(attributes))
+                               for event_type, attributes in batch["events"]]
+
+    def replay(self, app, speed=None):
+        """
+        Replay the trace on a launched headless application
+        Return the frame statistics : frames, events, total, mean, p50, p90, p99 and max, in seconds
+        """
+
+        if not app.is_headless:
+            raise PermissionError("A trace can only be replayed by a headless application")
+        if self._size is not None and self._size != tuple(app.size):
+            LOGGER.warning(f"The trace was recorded with a size of {self._size}, "
+                           f"the application has a size of {tuple(app.size)}")
+
+        durations = []
+        replayed_events = 0
+        previous_time = 0.
+        start = time.perf_counter()
+        for batch_time, events in self.get_batches():
+            if speed is not None:
+                delay = start + batch_time / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            frame_start = time.perf_counter()
+            try:
+                app.step(events, dt=max(batch_time - previous_time, 0))
+                exited = False
+            except ApplicationExit:  # the trace contains an exit, like a press on ESCAPE
+                exited = True
+            durations.append(time.perf_counter() - frame_start)
+            replayed_events += len(events)
+            previous_time = batch_time
+            if exited:
+                break
+
+        stats = {"frames": len(durations), "events": replayed_events, "total": sum(durations)}
+        if durations:
+            sorted_durations = sorted(durations)
+            stats.update(mean=stats["total"] / len(durations),
+                         p50=percentile(sorted_durations, .5),
+                         p90=percentile(sorted_durations, .9),
+                         p99=percentile(sorted_durations, .99),
+                         max=sorted_durations[-1])
+            LOGGER.info("Replayed {} events in {} frames : mean {:.2f} ms, p50 {:.2f} ms, p90 {:.2f} ms, "
+                        "p99 {:.2f} ms, max {:.2f} ms".format(
+                            replayed_events, len(durations), *(stats[key] * 1000 for key in
+                                                               ("mean", "p50", "p90", "p99", "max"))))
+        return stats
@@ -1,6 +1,8 @@
 from .style import Theme
 from .utilities import *
+from .diagnostics import PaintDiagnostics, paint_diagnostics
 from .widget import Widget
+from .widgetpool import Poolable, WidgetPool
 from .widget_supers import DraggableByMouse, Focusable, HoverableByMouse, LinkableByMouse, MaintainableByFocus, \
     RepetivelyAnimated, Runable, Validable
 from .imagewidget import Image
@@ -9,6 +11,7 @@ from .layer import Layer
 from .gridlayer import GridLayer
 from .layersmanager import LayersManager
 from .container import Container
+from .geometrystore import GeometryStore
 from .zone import Zone, SubZone
 from .selections import SelectableWidget, Selector, SelectionRect
 from .scene import Scene
@@ -1,24 +1,43 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
 import time
 
 from baopig.pybao import WeakList
+from baopig.time.utilities import clock
 from baopig.documentation import ApplicationExit
-from baopig.io import keyboard, mouse, LOGGER
+from baopig.io import keyboard, mouse, LOGGER, TraceRecorder
 from .style import HasStyle, Theme, StyleClass
 from .widget import Widget
 from .utilities import *
 
 
+# Posted by other threads to wake up an idle main loop
+_WAKE_EVENT = pygame.event.custom_type()
+
+
 class Application(HasStyle):
     """
     This is the main class in baopig
     It needs to be instanced before everything else
+
+    When nothing happens (no event, no running Runable, no paint request, no scene's run()
+    override), the main loop sleeps until the next event or the next Timer deadline, and
+    the painter is only woken up when something needs to be drawn. The idle_time and
+    busy_time attributes tell how long the main loop slept or worked, in seconds.
+
+    A headless application runs on SDL's dummy video driver, without window and without
+    painter thread. Once launched, it only moves when step() is called, on a virtual clock :
+
+        app = Application(size=(400, 300), headless=True)
+        ...
+        app.launch()
+        surface, rects = app.step(events=[click_event], dt=1/60)
     """
     STYLE = StyleClass()
 
-    def __init__(self, name=None, theme=None, size=None, mode=pygame.RESIZABLE):
+    def __init__(self, name=None, theme=None, size=None, mode=pygame.RESIZABLE, headless=False):
 
         if name is None:
             name = self.__class__.__name__
@@ -27,15 +46,24 @@ class Application(HasStyle):
 
         HasStyle.__init__(self, theme)
 
+        if headless:
+            # The dummy driver draws in memory, it needs to be chosen before the display initialization
+            if pygame.display.get_init() and pygame.display.get_driver() != "dummy":
+                pygame.display.quit()
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+
         pygame.init()
         info = pygame.display.Info()
+        modes = pygame.display.list_modes()
 
         self._name = name
+        self._is_headless = bool(headless)
         self._is_launched = False
         self._is_running = False
         self._fps = None
+        self._flip_threshold = None
         self._default_mode = mode
-        self._default_size = pygame.display.list_modes()[2] if size is None else size
+        self._default_size = modes[min(2, len(modes) - 1)] if size is None else size
         self._current_mode = self._current_size = None
         self._max_resolution = (info.current_w, info.current_h)
         self._is_fullscreen_TO_REMOVE = False
@@ -44,6 +72,13 @@ class Application(HasStyle):
         self._caption = self.name
         self._painter = None  # To be set in self.launch()
         self._time_manager = None  # To be set in self.launch()
+        self._input_recorder = None
+
+        # Idle mode
+        self._paint_requested = False  # True when a paint or display request is waiting for the painter
+        self._is_idle = False  # True from the last look of the main loop at the events until the end of its wait
+        self._idle_time = 0.
+        self._busy_time = 0.
 
         # debug attributes
         self._debug_averagefps = False
@@ -56,12 +91,16 @@ class Application(HasStyle):
 
         self.launch_time = time.time()
 
+    busy_time = property(lambda self: self._busy_time)
     default_mode = property(lambda self: self._default_mode)
     default_size = property(lambda self: self._default_size)
     focused_scene = property(lambda self: self._focused_scene)
     fps = property(lambda self: self._fps)
+    idle_time = property(lambda self: self._idle_time)
     is_fullscreen = property(lambda self: bool(self.default_mode & pygame.FULLSCREEN))
+    is_headless = property(lambda self: self._is_headless)
     is_launched = property(lambda self: self._is_launched)
+    is_recording_input = property(lambda self: self._input_recorder is not None)
     max_resolution = property(lambda self: self._max_resolution)
     name = property(lambda self: self._name)
     painter = property(lambda self: self._painter)
@@ -75,21 +114,63 @@ class Application(HasStyle):
             self._focused_scene = scene
         self.scenes.append(scene)
 
-    def _manage_events(self):
+    def _get_idle_timeout(self):
+        """Return how long, in seconds, the main loop can wait for an event"""
+
+        if self._paint_requested and pygame.display.get_active():
+            return 0
+
+        timeout = self.focused_scene._get_runables_timeout()
+        if timeout == 0:
+            return 0
+
+        from baopig.time.timer import _running_timers, timer_lock
+        with timer_lock:
+            deadlines = [timer._end_time for timer in _running_timers if timer._end_time is not None]
+        if deadlines:
+            timer_timeout = max(min(deadlines) - clock.get_time(), 0)
+            if timeout is None or timer_timeout < timeout:
+                timeout = timer_timeout
+        return timeout
+
+    def _handle_paint_request(self):
+        """Called when a paint or display request is queued"""
+
+        self._paint_requested = True
+        self._wake()
+
+    def _wake(self):
+        """Wake up the main loop if it is waiting for an event (only happens from another thread)"""
+
+        if self._is_idle:
+            self._is_idle = False
+            pygame.event.post(pygame.event.Event(_WAKE_EVENT))
+
+    def _handle_events(self, events):
+        """Treat the events, in the given order"""
 
         # TODO : solve : mouse entering and leaving the display are not properly handled
         #                      -> hovered widget may stay hovered
 
-        # Events listening
         # Only apply on keyboard, mouse and application's operations
-        events = pygame.event.get()
-        for event in events:
+        events = tuple(events)
+        motion = None  # the mouse motions following each other are treated as one, see mouse.merge_motions()
+        for index, event in enumerate(events):
+            if event.type == _WAKE_EVENT:
+                continue  # only ends the wait in _manage_events()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
                 self.exit("FORCED EXIT (F6)")
             elif event.type == pygame.QUIT:
                 self.exit()
 
-            elif event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            elif event.type == pygame.MOUSEMOTION:
+                motion = event if motion is None else mouse.merge_motions(motion, event)
+                if index + 1 < len(events) and events[index + 1].type == pygame.MOUSEMOTION and \
+                        mouse.can_merge_motions():
+                    continue
+                mouse.receive(motion)
+                motion = None
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
                 mouse.receive(event)
             elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
                 keyboard.receive(event)
@@ -117,12 +198,15 @@ class Application(HasStyle):
             # DEFAULT SHORTKEYS
             if event.type == pygame.KEYDOWN:
                 if keyboard.mod.ctrl:
-                    # Cmd + e -> toggle debugging
+                    # Cmd + e -> toggle debugging (if Alt: toggle the render diagnostics)
                     if event.key == pygame.K_e:
                         if keyboard.mod.maj:
                             _ = self.focused_scene.children
                             raise Exception("Made for debugging")
-                        self.toggle_debugging()
+                        if keyboard.mod.alt:
+                            self.toggle_render_diagnostics()
+                        else:
+                            self.toggle_debugging()
                     # Cmd + g -> collect garbage
                     elif event.key == pygame.K_g:
                         import gc
@@ -173,6 +257,52 @@ class Application(HasStyle):
             # Events optionnal treatment
             self.focused_scene.handle_event(event)
 
+    def _manage_events(self, timeout=0):
+        """
+        Treat the pending events
+        If there are none, wait for one during timeout seconds (forever if timeout is None)
+        """
+
+        # Events listening
+        # The main loop is idle before its last look at the queue : a request coming from
+        # another thread after this look posts a _WAKE_EVENT, who ends the wait
+        self._is_idle = timeout != 0
+        events = pygame.event.get()
+        if not events and timeout != 0:
+            start = time.perf_counter()
+            if timeout is None:
+                event = pygame.event.wait()
+            else:
+                event = pygame.event.wait(max(int(timeout * 1000), 1))  # 0 would mean forever
+            self._idle_time += time.perf_counter() - start
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+        self._is_idle = False
+        if self._input_recorder is not None:
+            self._input_recorder.record(events)
+        self._handle_events(events)
+
+    def _quit(self):
+        """Stuff to do once the main loop is over"""
+
+        self.stop_input_recording()
+
+        if self._idle_time + self._busy_time:
+            LOGGER.debug("{} main loop was idle {:.0%} of the time".format(
+                self.__class__.__name__, self._idle_time / (self._idle_time + self._busy_time)))
+
+        if self._debug_averagefps:
+            fps_history = self.painter.fps_history
+            if len(fps_history) > 0:
+                fps_moy = sum(fps_history) / len(fps_history)
+                LOGGER.info("{} ran with a global average of {} FPS"
+                            "".format(self.__class__.__name__, fps_moy))
+            else:
+                LOGGER.info("{} didn't ran enough for a global FPS average".format(self.__class__.__name__))
+
+        self._is_launched = False
+        pygame.quit()
+
     def _run(self):
         """
         Launch the application
@@ -181,23 +311,33 @@ class Application(HasStyle):
         try:
 
             self._is_running = True
+            timeout = 0
 
             while self._is_running:
 
                 # User events
-                self._manage_events()
+                self._manage_events(timeout)
+                start = time.perf_counter()
 
                 # Possible advanced events treatments
                 self._time_manager.update()
-                self.focused_scene._container_run()
+                self.focused_scene._run_runables()
 
                 # Possible coded stuff
                 self.focused_scene.run()
 
                 # If needed, drawing display
-                if pygame.display.get_active():
+                if self._paint_requested and pygame.display.get_active():
+                    self._paint_requested = False
                     self.painter._can_draw.set()
 
+                # Idle mode : without animation, the loop can wait for the next event, timer or Runable
+                if self.focused_scene.has_run:
+                    timeout = 0
+                else:
+                    timeout = self._get_idle_timeout()
+                self._busy_time += time.perf_counter() - start
+
         except Exception as e:
             if isinstance(e, ApplicationExit):
                 if str(e) != 'None':
@@ -205,17 +345,7 @@ class Application(HasStyle):
             else:
                 raise e
 
-        if self._debug_averagefps:
-            fps_history = self.painter.fps_history
-            if len(fps_history) > 0:
-                fps_moy = sum(fps_history) / len(fps_history)
-                LOGGER.info("{} ran with a global average of {} FPS"
-                            "".format(self.__class__.__name__, fps_moy))
-            else:
-                LOGGER.info("{} didn't ran enough for a global FPS average".format(self.__class__.__name__))
-
-        self._is_launched = False
-        pygame.quit()
+        self._quit()
 
     def _update_display(self):
         """Updates display mode and size"""
@@ -303,6 +433,8 @@ class Application(HasStyle):
         from baopig.threads import PainterThread
         self._painter = PainterThread(self)
         self.painter.set_fps(self._fps)
+        if self._flip_threshold is not None:
+            self.painter.set_flip_threshold(self._flip_threshold)
 
         assert self.focused_scene is not None
         scene = self.focused_scene
@@ -312,6 +444,14 @@ class Application(HasStyle):
 
         pygame.display.set_mode(self.size, self.default_mode)  # prevents a threading lag with painter.start()
         self.focused_scene.focus(self.focused_scene)
+
+        if self.is_headless:
+            # No painter thread and no main loop : everything happens in step(), on a virtual time
+            clock.set_virtual()
+            self._is_running = True
+            pygame.event.get()
+            return
+
         self.painter.start()
 
         pygame.scrap.init()  # clipboard uses
@@ -360,6 +500,16 @@ class Application(HasStyle):
         if self.painter is not None:
             self.painter.set_fps(fps)
 
+    def set_flip_threshold(self, share):
+        """
+        Set the share of the window (between 0 and 1) from which a frame is displayed
+        with a single flip instead of an update of its dirty rects
+        """
+
+        self._flip_threshold = share
+        if self.painter is not None:
+            self.painter.set_flip_threshold(share)
+
     @staticmethod
     def set_icon(icon):
 
@@ -381,10 +531,75 @@ class Application(HasStyle):
         self._default_mode = mode
         self._update_display()
 
+    def start_input_recording(self, path=None):
+        """
+        Start to write the received events in a trace file, who can be replayed by a TraceReplayer
+        By default, the file is created in painter.out_directory
+        """
+
+        if self._input_recorder is not None:
+            raise PermissionError("Already recording the inputs")
+        if path is None:
+            os.makedirs(self.painter.out_directory, exist_ok=True)
+            path = self.painter.out_directory + time.strftime("inputs_%Y.%m.%d-%Hh%M-%S.jsonl.gz", time.localtime())
+        recorder = TraceRecorder(path, size=self.size, ignored_types=(_WAKE_EVENT,))
+        recorder.start()
+        self._input_recorder = recorder
+        LOGGER.info(f"Start recording the inputs in {path}")
+
+    def step(self, events=(), dt=0):
+        """
+        Run one frame of a headless application, synchronously :
+            - the virtual clock moves forward by dt seconds
+            - the pending pygame events, then the given events, are treated
+            - the timers, the Runables and the scene's run() are executed
+            - the dirty containers are painted
+
+        Return the focused scene's surface and the rects who changed during this frame
+        If the application exits during the step, ApplicationExit is raised
+        """
+
+        if not self.is_headless:
+            raise PermissionError("Only a headless application can step")
+        if not self._is_running:
+            raise PermissionError("The application must be launched before stepping")
+
+        try:
+            clock.advance(dt)
+            events = pygame.event.get() + list(events)
+            if self._input_recorder is not None:
+                self._input_recorder.record(events)
+            self._handle_events(events)
+            self._time_manager.update()
+            self.focused_scene._run_runables()
+            self.focused_scene.run()
+
+            self._paint_requested = False
+            rects = self.painter.paint()
+
+        except ApplicationExit:
+            self._quit()
+            raise
+
+        return self.focused_scene.surface, rects
+
+    def stop_input_recording(self):
+
+        recorder = self._input_recorder
+        if recorder is None:
+            return
+        self._input_recorder = None
+        recorder.stop()
+        LOGGER.info(f"Stop recording the inputs ({recorder.recorded_events} events recorded)")
+
     def toggle_debugging(self):
 
         self.focused_scene.toggle_debugging()
 
+    def toggle_render_diagnostics(self):
+
+        self.focused_scene.toggle_render_diagnostics()
+
     def warning(self, i_dont_know):
 
         # TODO : show the warning on screen
@@ -2,11 +2,13 @@
 
 from baopig.pybao.objectutilities import *
 from baopig.documentation import Container as ContainerDoc
+from .diagnostics import paint_diagnostics
 from .imagewidget import Image
 from .layer import Layer
 from .layersmanager import LayersManager
 from .widget_supers import Runable, Widget
 from .utilities import *
+from .utilities import _subtract_rect
 
 
 class BoxRect(pygame.Rect):
@@ -105,6 +107,10 @@ class Container(ContainerDoc, Widget):
     WARNING : Try to do not override 'container_something' methods
     """
 
+    # Past this number of uncovered fragments in an updated rect, the occlusion culling stops :
+    # the children behind are all blitted, instead of cutting the fragments again and again
+    MAX_UNCOVERED = 16
+
     STYLE = Widget.STYLE.substyle()
     STYLE.create(
         background_color=(0, 0, 0, 0),  # transparent by default
@@ -130,7 +136,8 @@ class Container(ContainerDoc, Widget):
 
         self._children_manager = ChildrenManager(self)  # needed in Widget.__init__  TODO : still ?
         self._children_to_paint = WeakSet()  # a set cannot have two same occurences
-        self._rect_to_update = None
+        self._dirty_region = DirtyRegion()
+        self._depth = 0 if parent is self else parent._depth + 1  # the scene's depth is 0
 
         Widget.__init__(self, parent, **kwargs)
 
@@ -158,11 +165,15 @@ class Container(ContainerDoc, Widget):
             self.set_background_image(background_image)
         self.signal.RESIZE.connect(self.handle_resize, owner=None)
 
-        self._rect_to_update = pygame.Rect(self.auto_rect)
+        self._dirty_region.add(self.auto_rect)
+        self._warn_scene()
+        self._update_surface_format()
 
     children = property(lambda self: self._children_manager.all)
     background_color = property(lambda self: self._background_color)
     default_layer = property(lambda self: self.layers_manager.default_layer)
+    is_opaque = property(lambda self: self._background_color.a == 255 and
+                         (not self._border_width or self._border_color.a == 255))
 
     # Box attributes
     spacing = property(lambda self: self._spacing)
@@ -186,6 +197,16 @@ class Container(ContainerDoc, Widget):
         for child in tuple(self._children_manager.handlers_sceneclose):  # tuple prevent from in-loop killed widgets
             child.handle_scene_close()
 
+    def _container_convert_surfaces(self):
+        """Convert the surfaces of self and its children to the display format"""
+
+        self._convert_surface()
+        for child in self.children:
+            if isinstance(child, Container):
+                child._container_convert_surfaces()
+            else:
+                child._convert_surface()
+
     def _container_open(self):
 
         for cont in self._children_manager.containers:
@@ -194,14 +215,17 @@ class Container(ContainerDoc, Widget):
             child.handle_scene_open()
 
     def _container_paint(self):
-        """ Executes paint requests """
+        """
+        Executes the paint requests of the children, then updates the dirty region
 
-        # TODO : solve :     for cont in self._children_manager.containers:
-        #                RuntimeError: Set changed size during iteration
-        for cont in self._children_manager.containers:
-            cont._container_paint()
+        The child containers are not visited : the scene only calls this method on
+        the containers who warned it (see _warn_scene), from the deepest to the scene
+        Return True if some children need to be painted again at the next frame
+        """
 
         if self._children_to_paint:
+            if paint_diagnostics.is_enabled:
+                paint_diagnostics.add_paints(sum(child.is_visible for child in self._children_to_paint))
             for child in tuple(self._children_to_paint):
                 if child.is_visible:
                     child.paint()
@@ -212,10 +236,11 @@ class Container(ContainerDoc, Widget):
                         self._children_to_paint.remove(child)
                     # LOGGER.debug("Painting {} from container {}".format(child, self))
 
-        rect = self._update_rect()
-        if rect:
+        for rect in self._update_rect():
             self._warn_parent(rect)
 
+        return bool(self._children_to_paint)
+
     def _container_refresh(self, recursive=False, only_containers=True, with_update=True):
 
         if recursive:
@@ -231,14 +256,6 @@ class Container(ContainerDoc, Widget):
         else:
             self._flip_without_update()
 
-    def _container_run(self):
-
-        for cont in self._children_manager.containers:
-            cont._container_run()
-        for child in self._children_manager.runables:
-            if child.is_running:
-                child.run()
-
     def _flip(self):
         """Update all the surface"""
 
@@ -247,11 +264,19 @@ class Container(ContainerDoc, Widget):
         self._flip_without_update()
         self.send_display_request()
 
+    def _create_surface(self, size):
+        """An opaque container doesn't need per-pixel alpha, so its surface is created without SRCALPHA"""
+
+        if self.is_opaque:
+            return pygame.Surface(size)
+        return pygame.Surface(size, pygame.SRCALPHA)
+
     def _flip_without_update(self):
         """Update all the surface, but don't prevent the parent"""
 
-        with paint_lock:  # prevents self._rect_to_update changes during self._update_rect()
-            self._rect_to_update = pygame.Rect(self.auto_rect)
+        with paint_lock:  # prevents self._dirty_region changes during self._update_rect()
+            self._dirty_region.clear()
+            self._dirty_region.add(self.auto_rect)
             self._update_rect()
 
     def _remove_child(self, child):
@@ -259,6 +284,17 @@ class Container(ContainerDoc, Widget):
         if child in self._children_to_paint:
             self._children_to_paint.remove(child)
 
+    def _update_surface_format(self):
+        """Recreate the surface if its per-pixel alpha doesn't match the container opacity"""
+
+        if self.surface.get_parent() is not None:
+            return  # a subsurface shares its parent's format
+        if bool(self.surface.get_flags() & pygame.SRCALPHA) is not self.is_opaque:
+            return
+        with paint_lock:
+            self.set_surface(self._create_surface(self.rect.size))
+            self._flip_without_update()
+
     def _update_rect(self):
         """
         How to update a given portion of the application ?
@@ -296,38 +332,83 @@ class Container(ContainerDoc, Widget):
                                      :     :
         rect to update :             :-----:
 
+        The portion to update is a DirtyRegion : a few disjoint rects, each of them
+        is updated separately, so two small changes far from each other don't
+        repaint everything between them.
+
+        Before any drawing, the children are read from front to back : the parts of
+        the rect covered by an opaque child (see Widget.is_opaque) don't need the
+        children behind it, nor the background. Only the uncovered fragments colliding
+        with an opaque child are cut, and the culling stops when there are more than
+        MAX_UNCOVERED fragments, so many small opaque children don't cost a quadratic time.
+
+        Return the list of updated rects
         """
 
-        if self._rect_to_update is None:
-            return
+        if not self._dirty_region:
+            return ()
         if self.is_hidden:
-            return
+            return ()
 
         with paint_lock:
-            rect, self._rect_to_update = self._rect_to_update, None
-            self.surface.fill(self.background_color, rect=rect)
+            rects = self._dirty_region.pop_all()
+            fills = [] if paint_diagnostics.is_enabled else None
+
+            # Occlusion culling, from front to back
+            children_to_blit = []
+            max_uncovered = self.MAX_UNCOVERED
+            for rect in rects:
+                uncovered = [rect]
+                children = []
+                for layer in reversed(self.layers):
+                    for child in reversed(layer.get_visible_colliding(rect)):
+                        if len(uncovered) > max_uncovered:
+                            children.append(child)  # too fragmented, the culling is over
+                            continue
+                        hitbox = child.hitbox
+                        covered = hitbox.collidelistall(uncovered)
+                        if not covered:
+                            continue  # fully occluded
+                        children.append(child)
+                        if child.is_opaque:
+                            for index in reversed(covered):
+                                uncovered[index:index + 1] = _subtract_rect(uncovered[index], hitbox)
+                            if not uncovered:
+                                break
+                    if not uncovered:
+                        break
+                for part in uncovered:
+                    self.surface.fill(self.background_color, rect=part)
+                if fills is not None:
+                    fills.extend(uncovered)
+                children.reverse()
+                children_to_blit.append((rect, children))
+
             if self._border_width:
-                pygame.draw.rect(self.surface, self._border_color, (0, 0) + self.rect.size, self._border_width * 2 - 1)
-
-            for layer in self.layers:
-                for child in layer.visible:
-                    if child.hitbox.colliderect(rect):
-                        try:
-                            # collision is relative to self
-                            collision = child.hitbox.clip(rect)
-                            if collision == child.rect:
-                                self.surface.blit(child.surface, child.rect.topleft)
-                            else:
-                                self.surface.blit(child.surface.subsurface(
-                                    (collision.left - child.rect.left, collision.top - child.rect.top)
-                                    + collision.size), collision.topleft
-                                )
-                        except pygame.error:
-                            # can be raised from a child.surface who is a subsurface from self.surface
-                            assert child.surface.get_parent() is self.surface
+                # Only inside the updated rects : outside of them, the children may cover the border
+                for rect in rects:
+                    self.surface.set_clip(rect)
+                    pygame.draw.rect(self.surface, self._border_color, (0, 0) + self.rect.size,
+                                     self._border_width * 2 - 1)
+                self.surface.set_clip(None)
+
+            flipped = set()
+            for rect, children in children_to_blit:
+                for child in children:
+                    try:
+                        # collision is relative to self
+                        collision = child.hitbox.clip(rect)
+                        child._paint_procedurally(self.surface, collision)
+                    except pygame.error:
+                        # can be raised from a child.surface who is a subsurface from self.surface
+                        assert child.surface.get_parent() is self.surface
+                        if child not in flipped:
+                            flipped.add(child)
                             child._flip_without_update()  # overdraw child.hitbox
 
-            return rect
+            if fills is not None:
+                paint_diagnostics.add_update(self, rects, fills, children_to_blit)
+            return rects
 
     def _warn_change(self, rect):
         """Request updates at rects referenced by self"""
@@ -336,10 +417,14 @@ class Container(ContainerDoc, Widget):
             rect = self.auto_hitbox.clip(rect)
             if rect.size == (0, 0):
                 return
-            if self._rect_to_update is not None:
-                self._rect_to_update.union_ip(rect)
-            else:
-                self._rect_to_update = pygame.Rect(rect)  # from ProtectedHitbox to pygame.Rect
+            self._dirty_region.add(rect)
+        self._warn_scene()
+
+    def _warn_scene(self):
+        """Register self in the scene's dirty containers, so the painter visits it at the next frame"""
+
+        self.scene._dirty_containers.add(self)
+        self._application._handle_paint_request()
 
     def _warn_parent(self, rect):
         """Request updates at rects referenced by self"""
@@ -389,6 +474,7 @@ class Container(ContainerDoc, Widget):
     def set_background_color(self, *args, **kwargs):
 
         self._background_color = Color(*args, **kwargs)
+        self._update_surface_format()
         self._warn_change(self.auto_hitbox)
 
     def set_background_image(self, surf, background_adapt=True):
@@ -419,9 +505,11 @@ class Container(ContainerDoc, Widget):
             self._border_color = Color(color)
         if width is not None:
             self._border_width = int(width)
+        self._update_surface_format()
         self._warn_change(self.auto_hitbox)
 
     def set_window(self, *args, **kwargs):
 
         super().set_window(*args, **kwargs)
-        self._rect_to_update = pygame.Rect(self.auto_rect)
+        self._dirty_region.clear()
+        self._dirty_region.add(self.auto_rect)
@@ -0,0 +1,221 @@
+import pygame
+from .utilities import paint_lock
+
+
+# Color of a pixel drawn 1, 2, 3, 4 and 5+ times during a frame
+HEAT_COLORS = ((0, 0, 0), (40, 80, 255), (40, 220, 40), (255, 220, 0), (255, 120, 0), (255, 0, 0))
+
+
+class PaintDiagnostics:
+    """
+    PaintDiagnostics shows what the painter does at each frame, on top of the display
+
+    When it is enabled :
+        - every rect updated by a container (see Container._update_rect) is outlined
+        - every drawn pixel is colored by the number of times it was drawn during the frame,
+          from blue (once) to red (5 times or more) : the overdraw heat map
+        - the counters of the frame are written in the top right corner
+
+    The overlay is drawn after the frame and erased before the next one : it never goes
+    into the surfaces of the widgets, nor in the recordings. When it is disabled, the
+    painter only reads is_enabled, once per container update.
+
+        paint_diagnostics.enable()
+        paint_diagnostics.get_stats()  # -> {'paints': 3, 'updates': 4, 'blits': 12, ...}
+    """
+
+    def __init__(self):
+
+        self._is_enabled = False
+        self._show_overlay = True
+        self._stats = None
+        self._frame = None
+
+        self._scene = None
+        self._count_surface = None  # the red channel counts the draws of each pixel
+        self._heat_surface = None
+        self._saved_area = None  # the part of the scene covered by the overlay
+        self._saved_pixels = None  # what the scene looks like under the overlay
+        self._font = None
+
+    is_enabled = property(lambda self: self._is_enabled)
+    show_overlay = property(lambda self: self._show_overlay)
+
+    def _colorize(self, area):
+        """Paint the heat map of area into _heat_surface, from _count_surface"""
+
+        try:
+            import numpy
+        except ImportError:
+            # Without numpy, the heat map is red only : 1 draw -> 64, 4 draws or more -> 255
+            self._heat_surface.blit(self._count_surface, area.topleft, area)
+            for _ in range(6):
+                self._heat_surface.blit(self._heat_surface, area.topleft, area, special_flags=pygame.BLEND_RGB_ADD)
+            return
+
+        counts = pygame.surfarray.pixels_red(self._count_surface)[area.left:area.right, area.top:area.bottom]
+        colors = numpy.array(HEAT_COLORS, dtype=numpy.uint8)[numpy.minimum(counts, len(HEAT_COLORS) - 1)]
+        del counts  # unlocks the surface
+        self._heat_surface.subsurface(area).blit(pygame.surfarray.make_surface(colors), (0, 0))
+
+    def _draw_overlay(self, scene, frame):
+        """Draw the overlay on the scene surface, after saving the pixels it covers, and return its area"""
+
+        surface = scene.surface
+        drawn = frame["drawn"]
+
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        renders = [self._font.render(f"{key} : {value}", True, (255, 255, 255)) for key, value in self._stats.items()]
+        box = pygame.Rect(0, 0, max(render.get_width() for render in renders) + 10,
+                          sum(render.get_height() for render in renders) + 10)
+        box.topright = scene.rect.w - 5, 5
+
+        rects = drawn + frame["rects"]
+        heat_area = rects[0].unionall(rects).clip(scene.rect) if rects else None
+        if heat_area is not None and not heat_area.w * heat_area.h:
+            heat_area = None
+        area = box if heat_area is None else box.union(heat_area)
+        area = area.clip(scene.rect)  # scene.rect is also the size of the display
+        self._saved_area = area
+        self._saved_pixels = surface.subsurface(area).copy()
+
+        if heat_area is not None:
+            self._colorize(heat_area)
+            surface.blit(self._heat_surface, heat_area.topleft, heat_area)
+            for rect in frame["rects"]:
+                pygame.draw.rect(surface, (255, 255, 255), rect, 1)
+
+        surface.fill((0, 0, 0), box)
+        y = box.top + 5
+        for render in renders:
+            surface.blit(render, (box.left + 5, y))
+            y += render.get_height()
+
+        return area
+
+    def _restore(self):
+        """Erase the overlay, and return the rect of the scene to update"""
+
+        area = self._saved_area
+        if area is None:
+            return None
+        scene = self._scene
+        if scene.is_alive and scene.surface.get_size() == self._count_surface.get_size():
+            scene.surface.blit(self._saved_pixels, area.topleft)
+        self._saved_area = self._saved_pixels = None
+        return area
+
+    def add_paints(self, count):
+
+        self._frame["paints"] += count
+
+    def add_update(self, container, rects, fills, children_to_blit):
+        """Called by Container._update_rect(), with the rects it updated and the parts filled by its background"""
+
+        frame = self._frame
+        if frame is None:
+            return  # the update doesn't come from the painter
+        frame["updates"] += 1
+
+        # The part of the container who reaches the scene, in scene coordinates
+        offset_x, offset_y = container.abs_rect.topleft
+        visible = container.abs_hitbox
+        count_surface = self._count_surface
+        drawn = frame["drawn"]
+
+        def draw(rect):
+            rect = visible.clip(rect.move(offset_x, offset_y))
+            if rect.w and rect.h:
+                count_surface.fill((1, 0, 0), rect, special_flags=pygame.BLEND_RGB_ADD)
+                drawn.append(rect)
+            return rect.w * rect.h
+
+        for rect in rects:
+            frame["updated_pixels"] += rect.w * rect.h
+            rect = visible.clip(rect.move(offset_x, offset_y))
+            if rect.w and rect.h:
+                frame["rects"].append(rect)
+        for part in fills:
+            frame["fills"] += 1
+            frame["drawn_pixels"] += draw(part)
+        for rect, children in children_to_blit:
+            for child in children:
+                frame["blits"] += 1
+                frame["drawn_pixels"] += draw(child.hitbox.clip(rect))
+
+    def disable(self):
+
+        with paint_lock:
+            if not self._is_enabled:
+                return
+            self._is_enabled = False
+            area = self._restore()
+            if area is not None and self._scene.is_alive:
+                self._scene._warn_parent(area)
+            self._scene = self._count_surface = self._heat_surface = None
+
+    def enable(self, show_overlay=True):
+        """Start to count the paints, if show_overlay is False, the overlay isn't drawn"""
+
+        with paint_lock:
+            self._show_overlay = bool(show_overlay)
+            self._is_enabled = True
+
+    def end_frame(self, scene):
+        """Called by the painter after the frame is painted, before the display is updated"""
+
+        frame = self._frame
+        self._frame = None
+        display_pixels = scene._display_region.area
+        self._stats = {
+            "paints": frame["paints"],
+            "updates": frame["updates"],
+            "blits": frame["blits"],
+            "fills": frame["fills"],
+            "updated_pixels": frame["updated_pixels"],
+            "drawn_pixels": frame["drawn_pixels"],
+            "display_pixels": display_pixels,
+            "overdraw": round(frame["drawn_pixels"] / display_pixels, 2) if display_pixels else 0.,
+        }
+        restored = frame["restored"]
+        if restored is not None:
+            scene._display_region.add(restored)
+
+        # Nothing was painted and there is no overlay to replace
+        if not self._show_overlay or (not frame["drawn"] and restored is None):
+            return
+        scene._display_region.add(self._draw_overlay(scene, frame))
+
+    def get_stats(self):
+        """Return the counters of the last frame, or None if no frame was painted since enable()"""
+
+        return None if self._stats is None else dict(self._stats)
+
+    def start_frame(self, scene):
+        """Called by the painter before the frame is painted"""
+
+        if scene is not self._scene or scene.surface.get_size() != self._count_surface.get_size():
+            self._scene = scene
+            self._count_surface = pygame.Surface(scene.surface.get_size())
+            self._heat_surface = pygame.Surface(scene.surface.get_size())
+            self._heat_surface.set_colorkey((0, 0, 0))
+            self._heat_surface.set_alpha(150)
+            self._saved_area = self._saved_pixels = None
+        else:
+            self._count_surface.fill((0, 0, 0))
+
+        self._frame = {
+            "paints": 0,
+            "updates": 0,
+            "blits": 0,
+            "fills": 0,
+            "updated_pixels": 0,
+            "drawn_pixels": 0,
+            "rects": [],
+            "drawn": [],
+            "restored": self._restore(),
+        }
+
+
+paint_diagnostics = PaintDiagnostics()
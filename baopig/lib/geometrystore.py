@@ -0,0 +1,319 @@
+import pygame
+from .utilities import paint_lock
+
+
+class GeometryStore:
+    """
+    A GeometryStore keeps the geometry of every widget of a scene in numpy arrays, one row per widget
+
+    For each widget, it stores the row of its parent, its rect, its hitbox, and if it is visible
+    and touchable by the mouse. From these columns, it computes the absolute rects, and what the
+    mouse and the painter really see : the abs_hitbox clipped by the ones of the parents, and
+    the visibility of the parents. Then, a question about the whole scene is answered by a few
+    operations on the arrays, instead of a walk through the widgets :
+
+        scene.set_geometry_store(True)
+        scene.geometry_store.get_widgets_at(mouse.pos)
+        scene.geometry_store.get_colliding((0, 0, 100, 100))
+        scene.geometry_store.get_visible_widgets()
+
+    The store follows the scene : the widgets report their movements, resizes, visibility and
+    touchability changes, and the layers report the widgets they gain and lose. The clipped
+    columns are computed again at the first question after a change.
+
+    It needs numpy, see Scene.set_geometry_store()
+    """
+
+    def __init__(self, scene, capacity=256):
+
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("The GeometryStore needs numpy, install it with : pip install baopig[numpy]") from e
+        self._numpy = numpy
+
+        self._scene = scene
+        self._rows = {}  # widget -> row
+        self._widgets = [None] * capacity  # row -> widget
+        self._free_rows = list(range(capacity - 1, -1, -1))
+        self._parents = numpy.full(capacity, -1, dtype=numpy.int32)  # -1 : no parent in the store
+        self._rects = numpy.zeros((capacity, 4), dtype=numpy.int32)  # left, top, right, bottom, relative to the parent
+        self._hitboxes = numpy.zeros((capacity, 4), dtype=numpy.int32)
+        self._visible = numpy.zeros(capacity, dtype=bool)
+        self._touchable = numpy.zeros(capacity, dtype=bool)
+        self._in_touchable_layer = numpy.zeros(capacity, dtype=bool)
+
+        # Computed from the columns above by _sync()
+        self._attached = numpy.zeros(capacity, dtype=bool)  # the widget and all its parents are in the scene
+        self._abs_rects = numpy.zeros((capacity, 4), dtype=numpy.int32)
+        self._clipped_hitboxes = numpy.zeros((capacity, 4), dtype=numpy.int32)
+        self._shown = numpy.zeros(capacity, dtype=bool)  # the widget and all its parents are visible
+        self._reachable = numpy.zeros(capacity, dtype=bool)  # the widget and all its parents are touchable
+        self._is_dirty = True
+        self._ranks = {}  # widget -> its place among its siblings, see _rank()
+        self._ranks_epoch = None
+
+        with paint_lock:
+            self._add_tree(scene, None)
+
+    def __contains__(self, widget):
+        return widget in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    scene = property(lambda self: self._scene)
+
+    def _add_tree(self, widget, layer):
+
+        self.add(widget, layer)
+        for layer in getattr(widget, "layers", ()):
+            for child in layer:
+                self._add_tree(child, layer)
+
+    def _grow(self):
+
+        numpy = self._numpy
+        capacity = len(self._widgets)
+        self._widgets.extend([None] * capacity)
+        self._free_rows.extend(range(2 * capacity - 1, capacity - 1, -1))
+        self._parents = numpy.concatenate((self._parents, numpy.full(capacity, -1, dtype=numpy.int32)))
+        for name in ("_rects", "_hitboxes", "_visible", "_touchable", "_in_touchable_layer",
+                     "_attached", "_abs_rects", "_clipped_hitboxes", "_shown", "_reachable"):
+            array = getattr(self, name)
+            setattr(self, name, numpy.concatenate((array, numpy.zeros_like(array))))
+
+    def _rank(self, widget):
+        """
+        The place of a widget among its siblings, the greatest is in front
+        The places of all the widgets of a layer are computed at once, and kept until the
+        next layout change (see Scene._layout_epoch), who can reorder the layers
+        """
+
+        epoch = self._scene._layout_epoch
+        if epoch != self._ranks_epoch:
+            self._ranks.clear()
+            self._ranks_epoch = epoch
+        rank = self._ranks.get(widget)
+        if rank is None:
+            layer = widget.layer
+            layer_index = widget.parent.layers_manager.touchable_layers.index(layer)
+            for index, sibling in enumerate(layer):
+                self._ranks[sibling] = layer_index, index
+            rank = self._ranks[widget]
+        return rank
+
+    def _select(self, mask):
+        """Return the widgets of the rows where mask is True"""
+
+        widgets = self._widgets
+        return [widgets[row] for row in self._numpy.flatnonzero(mask)]
+
+    def _sync(self):
+        """Compute the absolute rects, the clipped hitboxes and the inherited flags, one level of parents at a time"""
+
+        if not self._is_dirty:
+            return
+        numpy = self._numpy
+        root = self._rows[self._scene]
+        parents = self._parents.copy()
+        has_parent = parents >= 0
+        parents[~has_parent] = root
+        parents[root] = root
+
+        # The topleft of the parent's abs_rect, the scene is at (0, 0)
+        rects = self._rects
+        offsets = numpy.zeros((len(parents), 2), dtype=numpy.int32)
+        while True:
+            new_offsets = offsets[parents] + rects[parents, :2]
+            new_offsets[root] = 0
+            if numpy.array_equal(new_offsets, offsets):
+                break
+            offsets = new_offsets
+        offsets = numpy.tile(offsets, 2)
+        self._abs_rects = rects + offsets
+
+        hitboxes = self._hitboxes + offsets
+        clipped = hitboxes.copy()
+        attached = has_parent
+        shown = self._visible & has_parent
+        reachable = self._touchable & self._in_touchable_layer & has_parent
+        shown[root] = reachable[root] = True  # the mouse always looks into the scene
+        while True:
+            parent_boxes = clipped[parents]
+            new_clipped = numpy.concatenate((numpy.maximum(hitboxes[:, :2], parent_boxes[:, :2]),
+                                             numpy.minimum(hitboxes[:, 2:], parent_boxes[:, 2:])), axis=1)
+            new_attached = attached & attached[parents]
+            new_shown = shown & shown[parents]
+            new_reachable = reachable & reachable[parents]
+            if numpy.array_equal(new_clipped, clipped) and numpy.array_equal(new_attached, attached) and \
+                    numpy.array_equal(new_shown, shown) and numpy.array_equal(new_reachable, reachable):
+                break
+            clipped, attached, shown, reachable = new_clipped, new_attached, new_shown, new_reachable
+
+        self._attached = attached
+        self._clipped_hitboxes = clipped
+        self._shown = shown
+        self._reachable = reachable
+        self._is_dirty = False
+
+    def add(self, widget, layer):
+        """Called by Layer.add(), when the widget enters the scene"""
+
+        rows = self._rows
+        row = rows.get(widget)
+        if row is None:
+            if not self._free_rows:
+                self._grow()
+            row = rows[widget] = self._free_rows.pop()
+            self._widgets[row] = widget
+        self._parents[row] = rows.get(widget.parent, -1) if widget is not self._scene else row
+        self._in_touchable_layer[row] = layer is None or layer.touchable
+        self.update(widget)
+
+        # A container who wakes up gets its children back
+        for child_layer in getattr(widget, "layers", ()):
+            for child in child_layer:
+                child_row = rows.get(child)
+                if child_row is not None:
+                    self._parents[child_row] = row
+
+    def get_colliding(self, rect, only_visible=True):
+        """
+        Return the widgets who collide with rect, an absolute rect
+        If only_visible is True, a widget must be visible and collide with its clipped abs_hitbox,
+        else every widget of the scene colliding with its abs_rect is returned
+        """
+
+        self._sync()
+        left, top, width, height = rect
+        boxes = self._clipped_hitboxes if only_visible else self._abs_rects
+        mask = (boxes[:, 0] < left + width) & (boxes[:, 2] > left) & \
+               (boxes[:, 1] < top + height) & (boxes[:, 3] > top) & \
+               (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+        mask &= self._shown if only_visible else self._attached
+        return self._select(mask)
+
+    def get_free_area(self, widget):
+        """
+        Return the part of the widget's clipped abs_hitbox where the mouse can only touch the
+        widget or its children, or None if another touchable widget is in front of it
+        """
+
+        row = self._rows.get(widget)
+        if row is None:
+            return None
+        self._sync()
+        if not (self._shown[row] and self._reachable[row]):
+            return None
+        left, top, right, bottom = (int(value) for value in self._clipped_hitboxes[row])
+        if left >= right or top >= bottom:
+            return None
+
+        # The ancestors of the widget, with their child who leads to the widget
+        path = {widget: None}
+        child = widget
+        while child is not self._scene:
+            path[child.parent] = child
+            child = child.parent
+
+        boxes = self._clipped_hitboxes
+        mask = self._shown & self._reachable & (boxes[:, 0] < right) & (boxes[:, 2] > left) & \
+            (boxes[:, 1] < bottom) & (boxes[:, 3] > top) & (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+        for other in self._select(mask):
+            if other in path:
+                continue  # the widget or one of its parents, behind it
+            branch = other
+            while branch.parent not in path:
+                branch = branch.parent
+            sibling = path[branch.parent]
+            if sibling is None:
+                continue  # a child of the widget
+            if branch.layer.touchable and self._rank(branch) > self._rank(sibling):
+                return None
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def get_topmost_at(self, pos, touchable=True, exclude=()):
+        """
+        Return the youngest widget at pos, an absolute position, like the mouse would find it :
+        from the scene, the front-most child at pos, then its front-most child at pos...
+        If touchable is True, only the widgets touchable by the mouse are accepted
+        The excluded widgets and their children are ignored
+        """
+
+        numpy = self._numpy
+        self._sync()
+        x, y = pos
+        boxes = self._clipped_hitboxes
+        mask = self._shown & (boxes[:, 0] <= x) & (boxes[:, 2] > x) & (boxes[:, 1] <= y) & (boxes[:, 3] > y)
+        if touchable:
+            mask &= self._reachable
+
+        # The candidates, grouped by parent
+        candidates = {}
+        widgets = self._widgets
+        for row, parent_row in zip(numpy.flatnonzero(mask), self._parents[mask]):
+            widget = widgets[row]
+            if widget is not self._scene and widget not in exclude:
+                candidates.setdefault(widgets[parent_row], []).append(widget)
+
+        cont = self._scene
+        while True:
+            children = [child for child in candidates.get(cont, ()) if child.layer.touchable]
+            if not children:
+                break
+            cont = children[0] if len(children) == 1 else max(children, key=self._rank)
+        if cont is self._scene and touchable and not cont.is_touchable_by_mouse:
+            return None
+        return cont
+
+    def get_visible_widgets(self):
+        """Return the widgets who can be seen in the scene"""
+
+        scene = self._scene
+        return self.get_colliding((0, 0) + scene.rect.size)
+
+    def get_widgets_at(self, pos, touchable=False):
+        """Return the visible widgets at pos, an absolute position, in no particular order"""
+
+        self._sync()
+        x, y = pos
+        boxes = self._clipped_hitboxes
+        mask = self._shown & (boxes[:, 0] <= x) & (boxes[:, 2] > x) & (boxes[:, 1] <= y) & (boxes[:, 3] > y)
+        if touchable:
+            mask &= self._reachable
+        return self._select(mask)
+
+    def remove(self, widget):
+        """Called by Layer.remove(), when the widget leaves the scene"""
+
+        row = self._rows.pop(widget, None)
+        if row is None:
+            return
+        self._widgets[row] = None
+        self._parents[row] = -1
+        self._visible[row] = self._touchable[row] = self._in_touchable_layer[row] = False
+        self._free_rows.append(row)
+
+        # The children of an asleep container stay in the store, without parent
+        rows = self._rows
+        for layer in getattr(widget, "layers", ()):
+            for child in layer:
+                child_row = rows.get(child)
+                if child_row is not None:
+                    self._parents[child_row] = -1
+        self._is_dirty = True
+
+    def update(self, widget):
+        """Called when the widget moves, is resized, hidden, shown or changes its touchability"""
+
+        row = self._rows.get(widget)
+        if row is None:
+            return
+        rect = widget.rect
+        hitbox = widget.hitbox
+        self._rects[row] = rect.left, rect.top, rect.right, rect.bottom
+        self._hitboxes[row] = hitbox.left, hitbox.top, hitbox.right, hitbox.bottom
+        self._visible[row] = widget.is_visible
+        self._touchable[row] = widget.is_touchable_by_mouse
+        self._is_dirty = True
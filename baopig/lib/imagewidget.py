@@ -40,6 +40,15 @@ class Image(Widget):
         self._tiled = tiled
         self._smoothscale = smoothscale
 
+    def _get_is_opaque(self):
+
+        surface = self.surface
+        if surface.get_flags() & pygame.SRCALPHA or surface.get_colorkey() is not None:
+            return False
+        return surface.get_alpha() in (None, 255)
+
+    is_opaque = property(_get_is_opaque)
+
     def _update_surface_from_resize(self, asked_size):
 
         if self._tiled:
@@ -1,6 +1,7 @@
 
 from baopig.pybao.objectutilities import WeakTypedList
-from .utilities import MarginType
+from .utilities import MarginType, paint_lock
+from .spatialindex import SpatialIndex
 from .widget import Widget, Communicative
 
 
@@ -14,8 +15,11 @@ class Layer(Communicative):
     to stand behind a layer with weight 6. The default weight is 2.
     """
 
+    # From this number of children, a layer who doesn't choose keeps a spatial index (see set_indexed)
+    INDEX_THRESHOLD = 128
+
     def __init__(self, container, *filter_cls, name=None, level=None, weight=None, padding=None, spacing=None,
-                 default_sortkey=None, sort_by_pos=False, touchable=True, maxlen=None, adaptable=False):
+                 default_sortkey=None, sort_by_pos=False, touchable=True, maxlen=None, adaptable=False, indexed=None):
         """
         :param container: the Container who owns the layer
         :param name: an unic identifier for the layer
@@ -28,6 +32,9 @@ class Layer(Communicative):
         :param sort_by_pos: if set, the default sortkey will be a function who sort children by y then x
         :param touchable: children of non-touchable layer are not hoverable
         :param maxlen: the maximum numbers of children the layer can contain
+        :param indexed: if set, the layer keeps a spatial index of its visible children, so compositing
+                        and mouse picking stay fast with thousands of children. If None, the index
+                        is built when the layer reaches INDEX_THRESHOLD children
         """  # TODO : start_pos
 
         if name is None:
@@ -81,6 +88,8 @@ class Layer(Communicative):
         self._layers_manager = container.layers_manager
         self._maxlen = maxlen
         self._touchable = bool(touchable)
+        self._index = SpatialIndex() if indexed else None
+        self._is_auto_indexed = indexed is None
 
         self.layers_manager._add_layer(self)
 
@@ -111,6 +120,7 @@ class Layer(Communicative):
     spacing = property(lambda self: self._spacing)
     container = property(lambda self: self._container)
     is_adaptable = property(lambda self: self._is_adaptable)
+    is_indexed = property(lambda self: self._index is not None)
     layer_index = property(lambda self: self._layer_index)
     layers_manager = property(lambda self: self._layers_manager)
     level = property(lambda self: self._level)
@@ -135,6 +145,14 @@ class Layer(Communicative):
             raise PermissionError("The layer is full (maxlen:{})".format(self.maxlen))
 
         self._widgets.append(widget)
+        scene = self.container.scene
+        scene._layout_epoch += 1
+        if scene._geometry_store is not None:
+            scene._geometry_store.add(widget, self)
+        if self._index is not None:
+            self._index.add(widget)
+        elif self._is_auto_indexed and len(self._widgets) >= self.INDEX_THRESHOLD:
+            self.set_indexed(None)
         if self.default_sortkey:
             self.sort()
 
@@ -146,6 +164,29 @@ class Layer(Communicative):
         for widget in tuple(self._widgets):
             widget.kill()
 
+    def get_topmost_at(self, pos, key=None):
+        """
+        Return the front-most visible widget whose hitbox contains pos, or None
+        pos is relative to the container
+        If key is set, only the widgets for which key(widget) is True are accepted
+        """
+
+        if self._index is not None:
+            return self._index.get_topmost_at(pos, key)
+        for widget in reversed(self._widgets):
+            if widget.is_visible and widget.hitbox.collidepoint(pos) and (key is None or key(widget)):
+                return widget
+
+    def get_visible_colliding(self, rect):
+        """
+        Return the visible widgets whose hitbox collides with rect, from behind to front
+        rect is relative to the container
+        """
+
+        if self._index is not None:
+            return self._index.get_colliding(rect)
+        return [widget for widget in self._widgets if widget.is_visible and widget.hitbox.colliderect(rect)]
+
     def get_visible_widgets(self):
         for widget in self._widgets:
             if widget.is_visible:
@@ -197,6 +238,9 @@ class Layer(Communicative):
         assert widget in self._widgets, f"{widget} not in {self}"
         self._widgets.remove(widget)
         self._widgets.insert(index, widget)
+        self.container.scene._layout_epoch += 1
+        if self._index is not None:
+            self._index.reorder(self._widgets)
         self.container._warn_change(widget.hitbox)
 
     def pack(self, key=None, axis="vertical", spacing=None, padding=None, start_pos=(0, 0)):
@@ -237,6 +281,12 @@ class Layer(Communicative):
         You can override this function in order to define special behaviors
         """
         self._widgets.remove(widget)
+        scene = self.container.scene
+        scene._layout_epoch += 1
+        if scene._geometry_store is not None:
+            scene._geometry_store.remove(widget)
+        if self._index is not None:
+            self._index.remove(widget)
 
         if self.is_adaptable:
             self.container.adapt(self)
@@ -245,6 +295,25 @@ class Layer(Communicative):
 
         self._widgets.set_ItemsClass(filter_cls)
 
+    def set_indexed(self, indexed):
+        """
+        Build or drop the spatial index of the visible children
+        If indexed is None, the index is built when the layer reaches INDEX_THRESHOLD children
+        """
+
+        with paint_lock:
+            self._is_auto_indexed = indexed is None
+            if indexed is None:
+                indexed = len(self._widgets) >= self.INDEX_THRESHOLD
+            if bool(indexed) is self.is_indexed:
+                return
+            if indexed:
+                self._index = SpatialIndex()
+                for widget in self._widgets:
+                    self._index.add(widget)
+            else:
+                self._index = None
+
     def set_maxlen(self, maxlen):
 
         assert isinstance(maxlen, int) and len(self._widgets) <= maxlen
@@ -267,3 +336,6 @@ class Layer(Communicative):
         if key is None:  # No sort key defined
             return
         self._widgets.sort(key=key)
+        self.container.scene._layout_epoch += 1
+        if self._index is not None:
+            self._index.reorder(self._widgets)
@@ -54,6 +54,7 @@ class LayersManager:
 
         assert len(layer) == 0
         self._layers.remove(layer)
+        self._container.scene._layout_epoch += 1
         if layer.touchable:
             self._touchable_layers.remove(layer)
         if layer == self.default_layer:
@@ -67,6 +68,7 @@ class LayersManager:
                 layer._layer_index = layer_index
                 layer_index += 1
         self._layers.sort(key=lambda layer: layer.layer_index)
+        self._container.scene._layout_epoch += 1
 
     @staticmethod
     def accept(child):
@@ -1,3 +1,6 @@
+import heapq
+from baopig.time.utilities import clock
+from weakref import WeakSet
 from baopig.io import LOGGER
 from .utilities import *
 from .style import Theme
@@ -36,6 +39,13 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
             theme = application.theme.subtheme()
 
         self._theme = theme
+        self._dirty_containers = WeakSet()  # containers with paint requests or a dirty region
+        self._running_runables = WeakSet()  # awake Runables whose is_running is True
+        # Incremented at every change of the hitboxes, visibility or overlay of the widgets,
+        # so the mouse knows when the widget it points can have changed (see mouse._get_touched_widget)
+        # and the widgets know when their abs_rect can have changed (see Widget._update_abs_rects)
+        self._layout_epoch = 0
+        self._geometry_store = None
         Zone.__init__(self, parent=self, pos=(0, 0), size=application.default_size if size is None else size,
                       **kwargs)
         Selector.__init__(self, parent=self, can_select=can_select)
@@ -46,6 +56,7 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
         self._mode_before_fullscreen = None
         self._size_before_fullscreen = None
         self._focused_widget_ref = lambda: None
+        self._display_region = DirtyRegion()
 
     def __str__(self):
 
@@ -53,6 +64,7 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
 
     asked_size = property(lambda self: self._asked_size)
     focused_widget = property(lambda self: self._focused_widget_ref())
+    geometry_store = property(lambda self: self._geometry_store)
     # mode = property(lambda self: self._mode)
     painter = property(lambda self: self.application._painter)
     scene = property(lambda self: self)  # End of recursive call
@@ -72,20 +84,116 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
         self._container_close()
         self.handle_scene_close()
         Widget.set_surface(self, pygame.Surface(self.rect.size))  # not pygame.display anymore
+        self._display_region.clear()
         self.focus(None)
         self.application._focused_scene = None
 
         # LOGGER.debug("Close scene : {}".format(self))
 
-    def _warn_parent(self, rect):
+    def _get_runables_timeout(self):
+        """Return how long, in seconds, until a running Runable needs to run, None if none is running"""
+
+        if not self._running_runables:
+            return None
+        now = clock.get_time()
+        timeout = None
+        for runable in tuple(self._running_runables):
+            if runable._min_interval == 0 or runable._last_run_time is None:
+                return 0
+            left = max(runable._last_run_time + runable._min_interval - now, 0)
+            if timeout is None or left < timeout:
+                timeout = left
+        return timeout
+
+    def _run_runables(self):
+        """Run the running Runables, except the ones who ran less than their min_interval ago"""
+
+        now = clock.get_time()
+        for runable in tuple(self._running_runables):  # a Runable can stop during a run()
+            if runable._min_interval:
+                if runable._last_run_time is not None and now - runable._last_run_time < runable._min_interval:
+                    continue
+                runable._last_run_time = now
+            # A Runable inside an asleep container is out of the tree : its parents chain stops before the scene
+            parent = runable.parent
+            while parent is not None and parent is not self:
+                parent = parent.parent
+            if parent is self:
+                runable.run()
+
+    def _paint_dirty_containers(self):
+        """
+        Executes the paint requests of the dirty containers only, from the deepest to the scene
+
+        A container's update warns its parent, so the parent is painted later in the same frame
+
+        The paint_lock is yielded between two containers to the threads waiting for it, like
+        the main loop : their changes join the dirty containers of this frame or the next one
+        """
+
+        with paint_lock:
+            heap = []
+            queued = set()
+            count = 0  # keeps the heap order stable, containers are not comparable
+            still_dirty = []
+            while True:
+                for cont in self._dirty_containers:
+                    if cont not in queued:
+                        queued.add(cont)
+                        heapq.heappush(heap, (-cont._depth, count, cont))
+                        count += 1
+                self._dirty_containers.clear()
+                if not heap:
+                    break
+                cont = heapq.heappop(heap)[2]
+                queued.remove(cont)
+                if cont.is_dead:
+                    continue
+                if cont.is_asleep or cont.is_hidden:  # its work is done after it wakes up or is shown
+                    still_dirty.append(cont)
+                    continue
+                if cont._container_paint():  # some children are always dirty
+                    still_dirty.append(cont)
+                paint_lock.yield_to_waiters()
+            self._dirty_containers.update(still_dirty)
+
+    def _flush_display(self, flip_threshold=1):
+        """
+        Update the display at every rect that reached the scene since the last flush
+        If the rects cover more than flip_threshold of the scene, the whole display is flipped
+        Return the updated rects
+
+        The paint_lock is only held to collect the rects : the display update itself
+        doesn't touch any widget, so it doesn't block the other threads
+        """
+
+        with paint_lock:
+            if not self._display_region:
+                return ()
+            area = self._display_region.area
+            rects = self._display_region.pop_all()
+        if area >= flip_threshold * self.rect.w * self.rect.h:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        return rects
+
+    def _update_layout(self, widget):
+        """Called when the hitbox, the visibility or the touchability of a widget changes"""
 
-        pygame.display.update(rect)
+        self._layout_epoch += 1
+        layer = widget.layer
+        if layer is not None and layer.is_indexed:
+            layer._index.update(widget)
+        if self._geometry_store is not None:
+            self._geometry_store.update(widget)
 
-        if self.painter.is_recording and self.painter.is_recording.only_at_change:
-            pygame.image.save(self.surface,
-                              self.painter.out_directory + "record_{:0>3}.png".format(
-                                  self.painter.record_index))
-            self.painter.record_index += 1
+    def _warn_parent(self, rect):
+
+        # The display is updated once per frame, by the painter (see _flush_display)
+        with paint_lock:
+            self._display_region.add(rect)
+        self.application._handle_paint_request()
 
     def divide(self, side, width):
         raise PermissionError("Cannot divide a Scene")  # TODO : rework Zone.divide
@@ -152,6 +260,7 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
             if scene_to_close:
                 scene_to_close._close()
             app._update_display()
+            self._container_convert_surfaces()
             self._container_open()
             self.handle_scene_open()
             self._container_refresh(recursive=True)
@@ -165,6 +274,11 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
 
         self.application._update_display()
 
+    def _update_surface_format(self):
+        """The scene's surface is the display, its format is managed by the application"""
+
+    has_run = property(lambda self: type(self).run is not Scene.run)  # True if run() is overriden
+
     def run(self):
         """Stuff to repeat endlessly while this scene is focused"""
 
@@ -185,6 +299,21 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
         self._mode = mode
         self.application._update_display()"""
 
+    def set_geometry_store(self, enabled):
+        """
+        Keep the geometry of every widget in a GeometryStore, so the mouse, the selections and the
+        debug zone search the widgets with numpy instead of walking through the scene
+        It needs numpy (pip install baopig[numpy]), and is worth it for the scenes with thousands of widgets
+        Without numpy, enabling it raises an ImportError
+        """
+
+        if bool(enabled) is (self._geometry_store is not None):
+            return
+        from .geometrystore import GeometryStore
+        with paint_lock:
+            self._geometry_store = GeometryStore(self) if enabled else None
+            self._layout_epoch += 1
+
     def toggle_debugging(self):
 
         if not hasattr(self, "debug_layer"):
@@ -194,6 +323,13 @@ class Scene(Zone, Selector, Handler_SceneOpen, Handler_SceneClose):
         else:
             self.debug_zone.toggle_debugging()
 
+    def toggle_render_diagnostics(self):
+        """Show or hide the render diagnostics over the scene, see PaintDiagnostics"""
+
+        if not hasattr(self, "debug_layer"):
+            self.toggle_debugging()
+        self.debug_zone.toggle_render_diagnostics()
+
     # TODO : fullscreen
     """def toggle_fullscreen(self):  
 
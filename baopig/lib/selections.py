@@ -105,13 +105,18 @@ class SelectionRect(Rectangle):
                            name=parent.name + ".selection_rect", **kwargs)
         self.set_color(tuple(self.color)[:3] + (40,))
 
-        self.abs_start = pygame.Vector2(abs_start)
-        self.abs_end = None
-        self.set_end(self.abs_start)
+        # The ends are stored relative to the parent, so they follow it when it or one of its
+        # parents moves (the children don't receive the MOTION of their parents)
+        self._start = pygame.Vector2(abs_start) - self.parent.abs_rect.topleft
+        self._end = None
+        self.set_end(abs_start)
 
         self._can_handle_motion = True
         self.signal.MOTION.connect(self.handle_motion, owner=None)
 
+    abs_start = property(lambda self: self._start + self.parent.abs_rect.topleft)
+    abs_end = property(lambda self: self._end + self.parent.abs_rect.topleft)
+
     def clip(self, rect):
         """
         Clip the rectangle inside another (wich are both relative to the parent)
@@ -124,17 +129,17 @@ class SelectionRect(Rectangle):
 
     def handle_motion(self, dx, dy):
 
-        # This is used, for example, when a TextEdit is scrolled while some of its text is selected
+        # When the selection_rect itself is moved, the selection moves with it
         if self._can_handle_motion:
-            self.abs_start += (dx, dy)
-            self.abs_end += (dx, dy)
+            self._start += (dx, dy)
+            self._end += (dx, dy)
 
     def set_end(self, abs_pos):
 
-        self.abs_end = pygame.Vector2(abs_pos)
+        self._end = pygame.Vector2(abs_pos) - self.parent.abs_rect.topleft
 
-        start = self.abs_start - self.parent.abs_rect.topleft
-        end = self.abs_end - self.parent.abs_rect.topleft
+        start = self._start
+        end = self._end
         rect = pygame.Rect(start, end - start)
         rect.normalize()
 
@@ -207,7 +212,17 @@ class Selector(SelectorDoc, Container, Focusable):
         else:
             self.selection_rect.set_visibility(self._selectionrect_visibility)
         self.selection_rect.set_end(abs_pos)
-        for selectable in self.selectables:
+
+        selectables = self.selectables
+        store = self.scene.geometry_store
+        if store is not None:
+            # A selectable can only be selected if its rows are crossed by the selection_rect (a
+            # line of text is selected from the side of its parent), or unselected if it is selected
+            rect = self.selection_rect.abs_rect
+            crossed = store.get_colliding((-2 ** 30, rect.top, 2 ** 31, rect.h), only_visible=False)
+            selectables = selectables.intersection(crossed).union(
+                selectable for selectable in selectables if selectable.is_selected or selectable not in store)
+        for selectable in selectables:
             selectable.check_select(self.selection_rect)
 
     def get_selection_data(self):
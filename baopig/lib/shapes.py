@@ -2,10 +2,36 @@
 
 import pygame
 
-from .utilities import Color
+from .style import HasStyle
+from .utilities import Color, paint_lock
 from .widget import Widget
 
 
+# color -> surface filled with this color, shared by the translucent procedural rectangles
+_solid_surfaces = {}
+
+
+def _fill(surface, color, rect):
+    """Fill rect with color, blending it over the surface like a blit would do"""
+
+    if color.a == 0 or rect.w <= 0 or rect.h <= 0:
+        return
+    if color.a == 255:
+        surface.fill(color, rect)
+        return
+
+    key = tuple(color)
+    solid = _solid_surfaces.get(key)
+    if solid is None or solid.get_width() < rect.w or solid.get_height() < rect.h:
+        if solid is None and len(_solid_surfaces) >= 32:
+            _solid_surfaces.clear()
+        size = rect.size if solid is None else (max(rect.w, solid.get_width()), max(rect.h, solid.get_height()))
+        solid = pygame.Surface(size, pygame.SRCALPHA)
+        solid.fill(color)
+        _solid_surfaces[key] = solid
+    surface.blit(solid, rect.topleft, area=(0, 0) + rect.size)
+
+
 class Rectangle(Widget):
     """
     A Widget who is just a rectangle filled with one color
@@ -13,6 +39,10 @@ class Rectangle(Widget):
     If the border_width parameter is filled, the rectangle will not be filled, only its borders
     The border_width is given in pixels
     The border only goes inside the rect, not outside
+
+    If the procedural style attribute is True, the rectangle has no surface : its parent
+    fills it directly on its own surface, so a rectangle costs no pixel memory and no
+    extra blit. The surface attribute is then None.
     """
 
     STYLE = Widget.STYLE.substyle()
@@ -24,6 +54,7 @@ class Rectangle(Widget):
         color="theme-color-content",
         border_color="theme-color-border",
         border_width=0,
+        procedural=False,
     )
     STYLE.set_type("color", Color)
     STYLE.set_type("border_color", Color)
@@ -32,6 +63,9 @@ class Rectangle(Widget):
 
     def __init__(self, parent, **kwargs):
 
+        HasStyle.__init__(self, parent, options=kwargs)  # the style is needed before the surface creation
+        self._is_procedural = bool(self.style["procedural"])
+
         Widget.__init__(self, parent, **kwargs)
 
         self._color = self.style["color"]
@@ -43,8 +77,33 @@ class Rectangle(Widget):
     color = property(lambda self: self._color)
     border_color = property(lambda self: self._border_color)
     border_width = property(lambda self: self._border_width)
+    is_opaque = property(lambda self: self._color.a == 255 and
+                         (not self._border_width or self._border_color is None or self._border_color.a == 255))
+    is_procedural = property(lambda self: self._is_procedural)
+
+    def _paint_procedurally(self, surface, clip):
+
+        rect = self.rect
+        thickness = self.border_width * 2 - 1 if self.border_color is not None else 0
+        if thickness <= 0:
+            _fill(surface, self.color, rect.clip(clip))
+            return
+
+        if thickness * 2 >= rect.w or thickness * 2 >= rect.h:
+            _fill(surface, self.border_color, rect.clip(clip))  # the border covers the whole rect
+            return
+        _fill(surface, self.color, rect.inflate(-2 * thickness, -2 * thickness).clip(clip))
+        for border in (
+            (rect.left, rect.top, rect.w, thickness),
+            (rect.left, rect.bottom - thickness, rect.w, thickness),
+            (rect.left, rect.top + thickness, thickness, rect.h - 2 * thickness),
+            (rect.right - thickness, rect.top + thickness, thickness, rect.h - 2 * thickness),
+        ):
+            _fill(surface, self.border_color, pygame.Rect(border).clip(clip))
 
     def paint(self):
+        if self.surface is None:
+            return  # procedural, the parent draws it
         self.surface.fill(self.color)
         if self.border_color is not None:
             pygame.draw.rect(self.surface, self.border_color, (0, 0) + self.rect.size, self.border_width * 2 - 1)
@@ -70,6 +129,20 @@ class Rectangle(Widget):
 
         self.send_paint_request()
 
+    def set_procedural(self, procedural):
+        """Switch between a procedural rectangle (without surface) and a classic one"""
+
+        procedural = bool(procedural)
+        if procedural is self._is_procedural:
+            return
+        with paint_lock:
+            self._is_procedural = procedural
+            if procedural:
+                self._set_surface(None, self.rect.size)
+            else:
+                self.set_surface(self._create_surface(self.rect.size))
+                self.paint()
+
 
 class Highlighter(Rectangle):
     """
@@ -83,6 +156,7 @@ class Highlighter(Rectangle):
         color=(0, 0, 0, 0),
         border_color="green",
         border_width=1,
+        procedural=True,
     )
 
     def __init__(self, parent, target, **kwargs):
@@ -0,0 +1,136 @@
+class SpatialIndex:
+    """
+    A SpatialIndex is a uniform grid referencing the visible widgets of a layer
+
+    Each widget is stored in every cell its hitbox touches, so finding the widgets
+    colliding with a rect or a point only needs to look at a few cells, instead of
+    every widget of the layer. Widgets covering too many cells are stored apart,
+    and always tested.
+
+    The index also remembers the overlay of the widgets, so the results come in the
+    layer order : first behind, last in front.
+
+    The hitboxes are relative to the layer's container, like widget.hitbox
+    """
+
+    # Above this number of cells, a widget is stored apart
+    MAX_CELLS_PER_WIDGET = 64
+
+    def __init__(self, cell_size=64):
+
+        assert isinstance(cell_size, int) and cell_size > 0, cell_size
+
+        self._cell_size = cell_size
+        self._cells = {}  # (col, row) -> set of widgets
+        self._large = set()  # widgets covering more than MAX_CELLS_PER_WIDGET cells
+        self._keys = {}  # widget -> (hitbox, cells) at the time it was indexed
+        self._order = {}  # widget -> overlay rank
+        self._next_rank = 0
+
+    def __contains__(self, widget):
+        return widget in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    cell_size = property(lambda self: self._cell_size)
+
+    def _get_cells(self, rect):
+
+        size = self._cell_size
+        left, top, width, height = rect
+        if width <= 0 or height <= 0:
+            return ()
+        return tuple((col, row)
+                     for col in range(left // size, (left + width - 1) // size + 1)
+                     for row in range(top // size, (top + height - 1) // size + 1))
+
+    def _insert(self, widget):
+
+        hitbox = tuple(widget.hitbox)
+        cells = self._get_cells(hitbox)
+        if len(cells) > self.MAX_CELLS_PER_WIDGET:
+            self._large.add(widget)
+            cells = None
+        else:
+            for cell in cells:
+                try:
+                    self._cells[cell].add(widget)
+                except KeyError:
+                    self._cells[cell] = {widget}
+        self._keys[widget] = hitbox, cells
+
+    def _pop(self, widget):
+
+        hitbox, cells = self._keys.pop(widget)
+        if cells is None:
+            self._large.remove(widget)
+        else:
+            for cell in cells:
+                cell_widgets = self._cells[cell]
+                cell_widgets.remove(widget)
+                if not cell_widgets:
+                    del self._cells[cell]
+
+    def add(self, widget):
+        """Set the widget on top of the overlay, and index it if it is visible"""
+
+        self._order[widget] = self._next_rank
+        self._next_rank += 1
+        if widget.is_visible:
+            self._insert(widget)
+
+    def get_colliding(self, rect):
+        """Return the indexed widgets whose hitbox collides with rect, from behind to front"""
+
+        candidates = set(self._large)
+        for cell in self._get_cells(tuple(rect)):
+            try:
+                candidates.update(self._cells[cell])
+            except KeyError:
+                pass
+        colliding = [widget for widget in candidates if widget.hitbox.colliderect(rect)]
+        colliding.sort(key=self._order.__getitem__)
+        return colliding
+
+    def get_topmost_at(self, pos, key=None):
+        """
+        Return the front-most indexed widget whose hitbox contains pos, or None
+        If key is set, only the widgets for which key(widget) is True are accepted
+        """
+
+        size = self._cell_size
+        candidates = self._cells.get((pos[0] // size, pos[1] // size), set()).union(self._large)
+        touched = None
+        touched_rank = -1
+        for widget in candidates:
+            rank = self._order[widget]
+            if rank > touched_rank and widget.hitbox.collidepoint(pos) and (key is None or key(widget)):
+                touched, touched_rank = widget, rank
+        return touched
+
+    def remove(self, widget):
+
+        del self._order[widget]
+        if widget in self._keys:
+            self._pop(widget)
+
+    def reorder(self, widgets):
+        """Reset the overlay from a sequence of widgets, sorted from behind to front"""
+
+        self._order = {widget: rank for rank, widget in enumerate(widgets)}
+        self._next_rank = len(self._order)
+
+    def update(self, widget):
+        """Called when the hitbox or the visibility of the widget has changed (see Scene._update_layout)"""
+
+        if widget not in self._order:
+            return  # not added yet, or removed
+        if widget.is_visible:
+            if widget in self._keys:
+                if self._keys[widget][0] == tuple(widget.hitbox):
+                    return
+                self._pop(widget)
+            self._insert(widget)
+        elif widget in self._keys:
+            self._pop(widget)
@@ -1,5 +1,6 @@
 
 import threading
+from time import perf_counter as _perf_counter, sleep as _sleep
 import pygame
 
 
@@ -9,7 +10,14 @@ import pygame
 class MetaPaintLocker(type):
     def __call__(cls, *args, **kwargs):
         with paint_lock:
+            pool = getattr(cls, "widget_pool", None)  # see Poolable
+            if pool is not None:
+                widget = pool.acquire(args, kwargs)
+                if widget is not None:
+                    return widget
             widget = super().__call__(*args, **kwargs)
+            if pool is not None:
+                pool.prepare(widget)
             if widget.is_awake:
                 widget.parent._add_child(widget)
             return widget
@@ -127,6 +135,153 @@ class MarginType:
     top = property(lambda self: self._top)
 
 
+class DirtyRegion:
+    """
+    A DirtyRegion is a bounded list of disjoint rects waiting for an update
+
+    When a rect is added, it is merged with the rects it is close to, if the merge costs
+    less pixels than an extra fill and blit call would cost (see BLIT_COST). Otherwise,
+    the parts of the rect that are already dirty are cut off, so the rects stay disjoint.
+    When there are more than maxlen rects, the two rects whose union wastes the least
+    pixels are merged.
+
+    Example :
+
+        region = DirtyRegion()
+        region.add((0, 0, 10, 10))
+        region.add((300, 200, 10, 10))  # too far, the region now contains two rects
+        region.add((5, 5, 10, 10))      # merged with the first rect -> (0, 0, 15, 15)
+    """
+
+    # The cost of an extra fill & blit call, expressed in pixels
+    BLIT_COST = 2048
+
+    def __init__(self, maxlen=16):
+
+        assert isinstance(maxlen, int) and maxlen > 0, maxlen
+
+        self._rects = []
+        self._maxlen = maxlen
+
+    def __bool__(self):
+        return bool(self._rects)
+
+    def __iter__(self):
+        return self._rects.__iter__()
+
+    def __len__(self):
+        return self._rects.__len__()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._rects})"
+
+    area = property(lambda self: sum(rect.w * rect.h for rect in self._rects))
+    maxlen = property(lambda self: self._maxlen)
+
+    def _is_worth_merging(self, rect1, rect2):
+
+        union = rect1.union(rect2)
+        overlap = rect1.clip(rect2)
+        separated_cost = rect1.w * rect1.h + rect2.w * rect2.h - overlap.w * overlap.h + self.BLIT_COST
+        return union.w * union.h <= separated_cost
+
+    def _merge_cheapest(self):
+
+        best = None
+        best_waste = None
+        rects = self._rects
+        for i, rect1 in enumerate(rects):
+            for rect2 in rects[i + 1:]:
+                union = rect1.union(rect2)
+                waste = union.w * union.h - rect1.w * rect1.h - rect2.w * rect2.h
+                if best_waste is None or waste < best_waste:
+                    best, best_waste = (rect1, rect2), waste
+
+        rect1, rect2 = best
+        rects.remove(rect1)
+        rects.remove(rect2)
+        union = rect1.union(rect2)
+
+        # The union absorbs every rect it touches, so the length always decreases
+        absorbed = True
+        while absorbed:
+            absorbed = False
+            for rect in tuple(rects):
+                if union.colliderect(rect):
+                    rects.remove(rect)
+                    union.union_ip(rect)
+                    absorbed = True
+        rects.append(union)
+
+    def add(self, rect):
+        """Add a rect to the region, merging or cutting it with the rects already there"""
+
+        rect = pygame.Rect(rect)
+        if rect.w <= 0 or rect.h <= 0:
+            return
+
+        rects = self._rects
+        for other in rects:
+            if other.contains(rect):
+                return
+
+        # The rect grows with every rect worth merging
+        merged = True
+        while merged:
+            merged = False
+            for other in tuple(rects):
+                if self._is_worth_merging(rect, other):
+                    rects.remove(other)
+                    rect.union_ip(other)
+                    merged = True
+
+        # Then, the parts that are already dirty are cut off
+        pieces = [rect]
+        for other in rects:
+            if rect.colliderect(other):
+                pieces = [piece for old_piece in pieces for piece in _subtract_rect(old_piece, other)]
+        rects.extend(pieces)
+
+        while len(rects) > self._maxlen:
+            self._merge_cheapest()
+
+    def clear(self):
+
+        self._rects.clear()
+
+    def get_bounding_rect(self):
+        """Return the smallest rect containing all the region, or None if the region is empty"""
+
+        if not self._rects:
+            return None
+        return self._rects[0].unionall(self._rects[1:])
+
+    def pop_all(self):
+        """Empty the region and return its rects"""
+
+        rects, self._rects = self._rects, []
+        return rects
+
+
+def _subtract_rect(rect, hole):
+    """Return up to 4 disjoint rects covering the parts of rect outside hole"""
+
+    clip = rect.clip(hole)
+    if clip.w == 0 or clip.h == 0:
+        return [rect]
+
+    pieces = []
+    if clip.top > rect.top:
+        pieces.append(pygame.Rect(rect.left, rect.top, rect.w, clip.top - rect.top))
+    if clip.bottom < rect.bottom:
+        pieces.append(pygame.Rect(rect.left, clip.bottom, rect.w, rect.bottom - clip.bottom))
+    if clip.left > rect.left:
+        pieces.append(pygame.Rect(rect.left, clip.top, clip.left - rect.left, clip.h))
+    if clip.right < rect.right:
+        pieces.append(pygame.Rect(clip.right, clip.top, rect.right - clip.right, clip.h))
+    return pieces
+
+
 class Handler_SceneOpen:
     """
     A Handler_SceneOpen is a widget whose 'handle_scene_open' function is called when its scene gets open
@@ -144,4 +299,117 @@ class Handler_SceneClose:
         """Stuff to do when the widget'scene is closed"""
 
 
-paint_lock = threading.RLock()
+class PaintLock:
+    """
+    A PaintLock is a reentrant lock who counts how often, and how long, each thread
+    had to wait for it
+
+    The counters tell if a thread stalls because of another one, for example if the
+    main loop waits for the painter to finish a frame :
+
+        stats = paint_lock.get_stats()
+        stats["MainThread"]  # -> {'acquisitions': 5120, 'contentions': 3, 'wait': 0.0012, 'max_wait': 0.0008}
+
+    Only the outermost acquisitions are counted, the reentrant ones are free
+
+    A thread doing a long work under the lock, like the painter, calls yield_to_waiters()
+    between two steps, so the waiting threads don't wait for the whole work
+    """
+
+    # The longest time yield_to_waiters() waits for a waiting thread to take the lock
+    YIELD_TIMEOUT = .005
+
+    def __init__(self):
+
+        self._lock = threading.RLock()
+        self._owner = None  # identifier of the owner thread
+        self._depth = 0  # reentrance level of the owner thread
+        self._acquisitions = 0  # number of outermost acquisitions, by any thread
+        self._waiters = 0  # number of threads blocked in acquire()
+        self._waiters_lock = threading.Lock()
+        self._stats = {}  # thread name -> counters
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self, blocking=True, timeout=-1):
+
+        if self._lock.acquire(blocking=False):
+            wait = None
+        elif not blocking:
+            return False
+        else:
+            start = _perf_counter()
+            with self._waiters_lock:
+                self._waiters += 1
+            try:
+                if not self._lock.acquire(timeout=timeout):
+                    return False
+            finally:
+                with self._waiters_lock:
+                    self._waiters -= 1
+            wait = _perf_counter() - start
+
+        self._depth += 1
+        if self._depth == 1:
+            self._owner = threading.get_ident()
+            self._acquisitions += 1
+            name = threading.current_thread().name
+            try:
+                stats = self._stats[name]
+            except KeyError:
+                stats = self._stats[name] = {"acquisitions": 0, "contentions": 0, "wait": 0., "max_wait": 0.}
+            stats["acquisitions"] += 1
+            if wait is not None:
+                stats["contentions"] += 1
+                stats["wait"] += wait
+                if wait > stats["max_wait"]:
+                    stats["max_wait"] = wait
+        return True
+
+    def get_stats(self):
+        """Return a copy of the counters, by thread name"""
+
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def release(self):
+
+        # Only the owner can touch _depth, the other threads get the error of RLock.release()
+        if self._owner != threading.get_ident():
+            raise RuntimeError("cannot release un-acquired lock")
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+        self._lock.release()
+
+    def reset_stats(self):
+
+        with self._lock:
+            self._stats.clear()
+
+    def yield_to_waiters(self):
+        """
+        If other threads wait for the lock, release it until one of them took it, then acquire it again
+        Nothing happens if the current thread holds the lock more than once : the outer holders
+        expect the state they locked to stay unchanged
+        """
+
+        if self._owner != threading.get_ident():
+            raise RuntimeError("cannot yield un-acquired lock")
+        if not self._waiters or self._depth > 1:
+            return
+        acquisitions = self._acquisitions
+        self.release()
+        # The lock isn't fair : without this wait, this thread would take it back at once
+        deadline = _perf_counter() + self.YIELD_TIMEOUT
+        while self._acquisitions == acquisitions and self._waiters and _perf_counter() < deadline:
+            _sleep(0)
+        self.acquire()
+
+
+paint_lock = PaintLock()
@@ -1,6 +1,7 @@
 
 # TODO : smart to use static, interactive, dynamic ?
 
+import inspect
 import pygame
 from baopig.io import mouse
 from baopig.documentation import Widget as WidgetDoc
@@ -9,6 +10,25 @@ from .utilities import paint_lock, MetaPaintLocker
 from .style import HasStyle
 
 
+def _convert_to_display_format(surface):
+    """
+    Return surface in the display pixel format, so the blits take the fast same-format path
+    Opaque surfaces are converted with convert(), translucent ones with convert_alpha()
+    The display surface, subsurfaces and already converted surfaces are returned as they are
+    """
+
+    display = pygame.display.get_surface()
+    if display is None or surface is display or surface.get_parent() is not None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        if surface.get_bitsize() == 32 and surface.get_masks()[:3] == display.get_masks()[:3]:
+            return surface
+        return surface.convert_alpha()
+    if surface.get_bitsize() == display.get_bitsize() and surface.get_masks() == display.get_masks():
+        return surface
+    return surface.convert()
+
+
 class WeakRef:
     def __init__(self, ref):
         self._ref = ref
@@ -303,6 +323,7 @@ class WidgetCore(WidgetDoc, Communicative):
         """
         A weakref is a reference to an object
         callback is a function called when the widget die
+        If callback is a bound method, its object is not kept alive by the widget
 
         Example :
             weak_ref = my_widget.get_weakref()
@@ -313,7 +334,7 @@ class WidgetCore(WidgetDoc, Communicative):
         """
         if callback is not None:
             assert callable(callback)
-            self.signal.KILL.connect(callback, owner=None)
+            self.signal.KILL.connect(callback, owner=None, weak=inspect.ismethod(callback))
         return self._weakref
 
     def kill(self):
@@ -405,6 +426,7 @@ class Widget_VisibleSleepy(WidgetCore, HasLock):
             return
 
         self._is_visible = False
+        self.scene._update_layout(self)
 
         self.send_display_request()
         self.signal.HIDE.emit()
@@ -417,6 +439,7 @@ class Widget_VisibleSleepy(WidgetCore, HasLock):
             return
 
         self._is_visible = True
+        self.scene._update_layout(self)
         self.send_display_request()
         self.signal.SHOW.emit()
 
@@ -457,6 +480,7 @@ class TouchableByMouse:
 
     def set_touchable_by_mouse(self, val):
         self._is_touchable_by_mouse = bool(val)
+        self.scene._update_layout(self)
 
 
 class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
@@ -505,12 +529,11 @@ class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
             raise ValueError(f"Unused options : {kwargs}")
 
         """
-        MOTION is emitted when the absolute position of the widget.rect moves
+        MOTION is emitted when the widget.rect moves, relatively to the parent
         It sends two parameters : dx and dy
-        WARNING : the dx and dy are the motion of the widget.rect ! This means, when the
-                  widget's parent moves, a MOTION.emit(dx=0, dy=0) is probalby raised.
-                  In facts, if the widget.pos_manager.reference is not the parent, the motion
-                  won't be dx=0, dy=0
+        NOTE : when the widget's parent moves, the children don't receive any MOTION, their
+               abs_rect just follows the parent's one. If the widget.pos_manager.reference is
+               not the parent, the widget moves when the reference moves relatively to it
         NOTE : an hitbox cannot move and be resized in the same time
         """
         self.create_signal("MOTION")
@@ -544,47 +567,107 @@ class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
         self._abs_hitbox = ProtectedHitbox((0, 0), size)
         self._auto_hitbox = ProtectedHitbox((0, 0), size)
 
+        # abs_rect and abs_hitbox are computed from the parent's abs_rect when they are read
+        self._abs_offset = None  # the topleft of the parent's abs_rect, when they were computed
+        self._abs_version = 0  # incremented each time abs_rect moves, compared by the children
+        self._abs_parent_version = -1  # the parent's _abs_version, when they were computed
+        self._abs_epoch = -1  # the scene._layout_epoch, when they were checked
+
         # SETUP
         pygame.Rect.__setattr__(self.rect, self._pos_manager.location, self._pos_manager.pos)
-        pygame.Rect.__setattr__(self.abs_rect, "topleft",
-                                (self.parent.abs_rect.left + self.rect.left, self.parent.abs_rect.top + self.rect.top))
         pygame.Rect.__setattr__(self.hitbox, "topleft", self.rect.topleft)
-        pygame.Rect.__setattr__(self.abs_hitbox, "topleft", self.abs_rect.topleft)
 
         # Connections
+        def follow_parent_from_wake():
+            # The absolute rects didn't follow the parent during the sleep, so the widgets
+            # following this one are warned if it has moved in the meantime
+            old_offset = self._abs_offset
+            self._update_abs_rects()
+            if self._abs_offset != old_offset:
+                self.signal.MOTION.emit(0, 0)
+
+        self.signal.WAKE.connect(follow_parent_from_wake, owner=self)
         self.signal.WAKE.connect(self._update_pos, owner=self)
         pos_ref = self._pos_manager.reference
         pos_ref.signal.RESIZE.connect(self._update_pos, owner=self)
-        if pos_ref != self.parent:
+        if pos_ref is not self.parent:
             pos_ref.signal.MOTION.connect(self._update_pos, owner=self)
 
-        def update_pos_from_parent_movement():
-            # Code from _update_pos(), without these two lines:
-            #     if new_pos == old_pos:
-            #       return
-            # This allows the MOTION.emit() even if no movement has been made
-            # This way, widgets referenced by this widget can update their positions
-            if self.is_asleep:  # the widget has no parent
-                return
-            new_pos = self._pos_manager.get_pos_relative_to_owner_parent()
-            rect = self.hitbox if self._pos_manager.referenced_by_hitbox else self.rect
-            old_pos = getattr(rect, self._pos_manager.location)
-            self._move(dx=new_pos[0] - old_pos[0], dy=new_pos[1] - old_pos[1])
-
-        self.parent.signal.MOTION.connect(update_pos_from_parent_movement, owner=self)
+            # A moving container doesn't move its children, they just follow it when they read
+            # their absolute rects. So this widget listens to the containers whose movements
+            # change its position relative to its parent : the parents of its reference and
+            # the ones of the widget, up to their first common parent
+            def get_lineage(widget):
+                lineage = [widget]
+                while widget is not widget.scene and widget.parent is not None:
+                    widget = widget.parent
+                    lineage.append(widget)
+                return lineage
+
+            own_lineage = get_lineage(self.parent)
+            ref_lineage = get_lineage(pos_ref)
+            common = set(own_lineage).intersection(ref_lineage)
+            for widget in own_lineage + ref_lineage[1:]:
+                if widget not in common:
+                    widget.signal.MOTION.connect(self._update_pos, owner=self)
 
     # ORIGIN
     pos_manager = property(lambda self: self._pos_manager)
 
     # HITBOX
+    def _get_abs_hitbox(self):
+
+        if self._abs_epoch != self.scene._layout_epoch:
+            self._update_abs_rects()
+        return self._abs_hitbox
+
+    def _get_abs_rect(self):
+
+        if self._abs_epoch != self.scene._layout_epoch:
+            self._update_abs_rects()
+        return self._abs_rect
+
     rect = property(lambda self: self._rect)
-    abs_rect = property(lambda self: self._abs_rect)
+    abs_rect = property(_get_abs_rect)
     auto_rect = property(lambda self: self._auto_rect)
     window = property(lambda self: self._window)
     hitbox = property(lambda self: self._hitbox)
-    abs_hitbox = property(lambda self: self._abs_hitbox)
+    abs_hitbox = property(_get_abs_hitbox)
     auto_hitbox = property(lambda self: self._auto_hitbox)
 
+    def _update_abs_rects(self):
+        """
+        Move abs_rect and abs_hitbox with the parent, if it moved since they were computed
+
+        Each widget counts the movements of its abs_rect in _abs_version, so a widget only
+        follows its parent when the parent's version changed : the movement of a container
+        only concerns its own subtree. The versions of the parents are compared once per
+        scene._layout_epoch, incremented by every movement in the scene
+        """
+
+        parent = self._parent
+        if parent is None:  # asleep, the absolute rects stay where they were
+            return
+        epoch = self.scene._layout_epoch
+        if parent is self:  # a scene
+            offset = (0, 0)
+        else:
+            if parent._abs_epoch != epoch:
+                parent._update_abs_rects()
+            if parent._abs_version == self._abs_parent_version:
+                self._abs_epoch = epoch
+                return
+            self._abs_parent_version = parent._abs_version
+            offset = parent._abs_rect.topleft
+        if offset != self._abs_offset:
+            self._abs_offset = offset
+            pygame.Rect.__setattr__(self._abs_rect, "topleft",
+                                    (offset[0] + self._rect.left, offset[1] + self._rect.top))
+            pygame.Rect.__setattr__(self._abs_hitbox, "topleft",
+                                    (offset[0] + self._hitbox.left, offset[1] + self._hitbox.top))
+            self._abs_version += 1
+        self._abs_epoch = epoch
+
     def _move(self, dx, dy):
 
         if self.is_asleep:
@@ -593,10 +676,13 @@ class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
         old_hitbox = tuple(self.hitbox)
         with paint_lock:
 
+            self._update_abs_rects()
+
             pygame.Rect.__setattr__(self.rect, "left", self.rect.left + dx)
             pygame.Rect.__setattr__(self.rect, "top", self.rect.top + dy)
             pygame.Rect.__setattr__(self.abs_rect, "topleft", (self.parent.abs_rect.left + self.rect.left,
                                                                self.parent.abs_rect.top + self.rect.top))
+            self._abs_version += 1  # the children will follow, see _update_abs_rects()
 
             if self.window.is_set:
 
@@ -617,6 +703,7 @@ class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
             else:
                 pygame.Rect.__setattr__(self.hitbox, "topleft", self.rect.topleft)
                 pygame.Rect.__setattr__(self.abs_hitbox, "topleft", self.abs_rect.topleft)
+            self.scene._update_layout(self)
 
             # We reset the asked_pos after the MOTION in order to allow cycles of pos referecing  TODO
             self._pos_manager._reset_asked_pos()
@@ -702,6 +789,7 @@ class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
 
         follow_movements default to False"""
 
+        self._update_abs_rects()
         self.window._is_set = window is not None
         if window is None:
             self.window.config(offset=(0, 0), size=self.rect.size)
@@ -731,6 +819,7 @@ class HasProtectedHitbox(Widget_VisibleSleepy, HasStyle, TouchableByMouse):
             if old_size != self.rect.size:
                 self.signal.RESIZE.emit(old_size)
 
+        self.scene._update_layout(self)
         self.send_display_request(rect=self.rect)  # rect covers all possibilities
 
 
@@ -757,11 +846,16 @@ class HasProtectedSurface(HasProtectedHitbox):
             self._asked_size = size
 
         if surface is None:
-            surface = pygame.Surface(self._get_asked_size(), pygame.SRCALPHA)
-
-        assert isinstance(surface, pygame.Surface)
+            if self.is_procedural:
+                surface_size = self._get_asked_size()
+            else:
+                surface = pygame.Surface(self._get_asked_size(), pygame.SRCALPHA)
+        if surface is not None:
+            assert isinstance(surface, pygame.Surface)
+            surface = _convert_to_display_format(surface)
+            surface_size = surface.get_size()
 
-        HasProtectedHitbox.__init__(self, parent, surface.get_size(), **kwargs)
+        HasProtectedHitbox.__init__(self, parent, surface_size, **kwargs)
 
         """
         surface is the widget's image
@@ -770,6 +864,13 @@ class HasProtectedSurface(HasProtectedHitbox):
         the size of the hitbox, it is protected thanks to this classe methods and ProtectedSurface
         
         NEW_SURFACE is emitted right after set_surface()
+
+        surface can be None : it is a public state, not only a construction option
+        A procedural widget has no surface, its parent draws it directly through
+        _paint_procedurally(), and a widget can switch between both states during
+        its life, like a Rectangle with set_procedural() (the hover sail of a Button
+        gets a surface when its pixels are masked by the button's ones)
+        Code reading the surface of another widget must expect None
         """
         self._surface = surface
         self.create_signal("NEW_SURFACE")
@@ -798,44 +899,68 @@ class HasProtectedSurface(HasProtectedHitbox):
         def check_dirty():
             if self.dirty:
                 self._waiting_line.add(self)
+                self._parent._warn_scene()
 
         self.signal.WAKE.connect(check_dirty, owner=self)
 
     surface = property(lambda self: self._surface)
 
+    # An opaque widget has no transparent pixel, so it hides everything behind its hitbox
+    is_opaque = property(lambda self: False)
+    # A procedural widget has no surface, it is drawn by its parent at update time
+    is_procedural = property(lambda self: False)
+
     # HAS_SURFACE
-    def _update_size_from_newsurface(self, size):
+    def _convert_surface(self):
+        """Convert the surface to the display format, if it isn't already"""
 
+        if self._surface is None:
+            return
         with paint_lock:
-            pygame.Rect.__setattr__(self.rect, "size", size)
-            pygame.Rect.__setattr__(self.abs_rect, "size", size)
-            pygame.Rect.__setattr__(self.auto_rect, "size", size)
-            if self.window.is_set:
-                size = self.window.get_hitbox().size
-            pygame.Rect.__setattr__(self.hitbox, "size", size)
-            pygame.Rect.__setattr__(self.abs_hitbox, "size", size)
-            pygame.Rect.__setattr__(self.auto_hitbox, "size", size)
-            self._update_pos()
+            surface = _convert_to_display_format(self._surface)
+            if surface is not self._surface:
+                self._surface = surface
+                self.signal.NEW_SURFACE.emit()
 
-    def set_surface(self, surface):
+    def _create_surface(self, size):
+        """Return a new blank surface for this widget, with per-pixel alpha"""
 
-        assert isinstance(surface, pygame.Surface), surface
+        return pygame.Surface(size, pygame.SRCALPHA)
+
+    def _paint_procedurally(self, surface, clip):
+        """
+        Draw the widget on its parent's surface, only inside clip (relative to the parent)
+        The parent calls it for each child to update : by default, the part of the widget's
+        surface inside clip is blitted, a procedural widget draws itself instead
+        """
+
+        if self._surface is None:
+            return  # a procedural widget who doesn't override this method is invisible
+        if clip == self.rect:
+            surface.blit(self._surface, clip.topleft)
+        else:
+            surface.blit(self._surface.subsurface(
+                (clip.left - self.rect.left, clip.top - self.rect.top) + clip.size), clip.topleft
+            )
 
-        if self._has_locked.height and self.rect.height != surface.get_height():
+    def _set_surface(self, surface, size):
+        """Change the surface and the size - surface is None for a procedural widget"""
+
+        if self._has_locked.height and self.rect.height != size[1]:
             raise PermissionError(
                 f"Wrong surface : {surface} (this widget's surface height is locked at {self.rect.h})")
 
-        if self._has_locked.width and self.rect.width != surface.get_width():
+        if self._has_locked.width and self.rect.width != size[0]:
             raise PermissionError(
                 f"Wrong surface : {surface} (this widget's surface width is locked at {self.rect.w})")
 
         with paint_lock:
-            if self.rect.size != surface.get_size():
+            if self.rect.size != tuple(size):
 
                 old_hitbox = tuple(self.hitbox)
                 old_size = self.rect.size
                 self._surface = surface
-                self._update_size_from_newsurface(surface.get_size())
+                self._update_size_from_newsurface(size)
                 self.signal.RESIZE.emit(old_size)
 
                 if self.is_visible:
@@ -849,6 +974,27 @@ class HasProtectedSurface(HasProtectedHitbox):
 
             self.signal.NEW_SURFACE.emit()
 
+    def _update_size_from_newsurface(self, size):
+
+        with paint_lock:
+            pygame.Rect.__setattr__(self.rect, "size", size)
+            pygame.Rect.__setattr__(self.abs_rect, "size", size)
+            pygame.Rect.__setattr__(self.auto_rect, "size", size)
+            if self.window.is_set:
+                size = self.window.get_hitbox().size
+            pygame.Rect.__setattr__(self.hitbox, "size", size)
+            pygame.Rect.__setattr__(self.abs_hitbox, "size", size)
+            pygame.Rect.__setattr__(self.auto_hitbox, "size", size)
+            self.scene._update_layout(self)
+            self._update_pos()
+
+    def set_surface(self, surface):
+
+        assert isinstance(surface, pygame.Surface), surface
+        surface = _convert_to_display_format(surface)
+
+        self._set_surface(surface, surface.get_size())
+
     # RESIZABLE
     def _get_asked_size(self):
 
@@ -895,8 +1041,11 @@ class HasProtectedSurface(HasProtectedHitbox):
     def _update_surface_from_resize(self, asked_size):
         """ Update the surface from the asked size - Only called by resize()"""
 
-        self.set_surface(pygame.Surface(asked_size, pygame.SRCALPHA))
-        self.send_paint_request()
+        if self.is_procedural:
+            self._set_surface(None, asked_size)
+        else:
+            self.set_surface(self._create_surface(asked_size))
+            self.send_paint_request()
 
     def resize(self, width, height):
         """Sets up the new widget's surface"""
@@ -938,6 +1087,7 @@ class HasProtectedSurface(HasProtectedHitbox):
 
             if self.is_awake:
                 self._waiting_line.add(self)
+                self._parent._warn_scene()
 
     def set_dirty(self, val):
 
@@ -948,6 +1098,7 @@ class HasProtectedSurface(HasProtectedHitbox):
         if self.is_awake:
             if val:
                 self._waiting_line.add(self)
+                self._parent._warn_scene()
             elif self in self._waiting_line:
                 self._waiting_line.remove(self)
 
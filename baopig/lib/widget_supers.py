@@ -39,11 +39,38 @@ class Runable(RunableDoc, Widget):
         Widget.__init__(self, parent, **kwargs)
 
         self._is_running = False
+        self._min_interval = 0
+        self._last_run_time = None
+
+        # The scene only knows the awake running Runables
+        def handle_sleep():
+            self.scene._running_runables.discard(self)
+
+        def handle_wake():
+            if self._is_running:
+                self.scene._running_runables.add(self)
+
+        self.signal.SLEEP.connect(handle_sleep, owner=self)
+        self.signal.WAKE.connect(handle_wake, owner=self)
+        self.signal.KILL.connect(handle_sleep, owner=None)
 
     is_running = property(lambda self: self._is_running)
+    min_interval = property(lambda self: self._min_interval)
+
+    def set_min_interval(self, interval):
+        """run() will be called at most once every interval seconds (0 means as much as possible)"""
+
+        assert interval >= 0, interval
+        self._min_interval = interval
 
     def set_running(self, val):
+
         self._is_running = bool(val)
+        if self._is_running and self.is_awake and self.is_alive:
+            self.scene._running_runables.add(self)
+            self._application._wake()
+        else:
+            self.scene._running_runables.discard(self)
 
 
 class HoverableByMouse(HoverableByMouseDoc, Widget):  # TODO : auomatic update when scroll
@@ -102,6 +129,10 @@ class HoverableByMouse(HoverableByMouseDoc, Widget):  # TODO : auomatic update w
 
 class LinkableByMouse(LinkableByMouseDoc, HoverableByMouse):
 
+    # While the widget is linked, the mouse motions of a frame are merged into one
+    # handle_link_motion() call, unless the widget needs every motion, like a drawing zone
+    needs_every_motion = False
+
     def __init__(self, parent, **kwargs):
         HoverableByMouse.__init__(self, parent, **kwargs)
 
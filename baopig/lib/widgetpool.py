@@ -0,0 +1,186 @@
+import functools
+from .utilities import paint_lock
+
+
+class WidgetPool:
+    """
+    A WidgetPool keeps the killed widgets of a Poolable class, to give them back to its constructor
+
+    A released widget is asleep : it isn't a child of its parent anymore, but it keeps its
+    surface, its rects, its style and the connections made during its construction. When a
+    widget of the same class is created with the same parent, the pool wakes a released
+    widget up and resets it with Poolable._recycle(), instead of building a new one.
+
+    For the rest of the application, a released widget is dead : its KILL signal is emitted,
+    its old weakref returns None, is_alive is False, kill() does nothing, and the connections
+    made after its construction are killed
+
+    The stats count the constructions served by the pool (hits), the ones who built a new
+    widget (misses), and the killed widgets who didn't fit in the pool (drops)
+    """
+
+    def __init__(self, widget_class, maxsize=256):
+
+        self._widget_class = widget_class
+        self._maxsize = maxsize
+        self._is_enabled = True
+        self._widgets = {}  # parent -> released widgets
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._releases = 0
+        self._drops = 0
+
+    def __len__(self):
+        return self._size
+
+    is_enabled = property(lambda self: self._is_enabled)
+    maxsize = property(lambda self: self._maxsize)
+    widget_class = property(lambda self: self._widget_class)
+
+    def _handle_parent_kill(self, parent):
+
+        for widget in self._widgets.pop(parent, ()):
+            self._size -= 1
+            widget._is_pooled = False
+            widget.kill()
+
+    def acquire(self, args, kwargs):
+        """Return a released widget, reset with the construction parameters, or None if there is no one"""
+
+        parent = kwargs["parent"] if "parent" in kwargs else args[0]
+        widgets = self._widgets.get(parent)
+        if not widgets:
+            self._misses += 1
+            return None
+
+        with paint_lock:
+            widget = widgets.pop()
+            widget._is_pooled = False
+            self._size -= 1
+            self._hits += 1
+            widget._recycle(*args, **kwargs)
+            widget.wake()
+        return widget
+
+    def clear(self):
+        """Kill the released widgets"""
+
+        with paint_lock:
+            for parent, widgets in self._widgets.items():
+                while widgets:
+                    widget = widgets.pop()
+                    widget._is_pooled = False
+                    widget.kill()
+            self._size = 0
+
+    def get_stats(self):
+
+        return {
+            "size": self._size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "releases": self._releases,
+            "drops": self._drops,
+        }
+
+    def prepare(self, widget):
+        """Remember the connections made during the construction of the widget, see release()"""
+
+        widget._pool_connections = frozenset(widget._connections).union(
+            *(signal._connections for signal in vars(widget.signal).values()))
+
+    def release(self, widget):
+        """
+        Put a killed widget in the pool, instead of destroying it
+        Return False if the widget cannot be released, then it must really be killed
+        """
+
+        if widget.is_asleep:  # already out of its parent, like a released widget
+            return False
+        if not self._is_enabled or self._size >= self._maxsize:
+            self._drops += 1
+            return False
+
+        with paint_lock:
+            parent = widget.parent
+            widget.sleep()
+            widget.signal.KILL.emit(widget._weakref)
+            widget._weakref._ref = None
+            widget._weakref = widget._weakref.__class__(widget)
+            widget._pos_manager._owner_ref = widget._weakref
+
+            # Only the connections made during the construction stay
+            for connection in tuple(widget._connections):
+                if connection not in widget._pool_connections:
+                    connection.kill()
+            for signal in vars(widget.signal).values():
+                for connection in tuple(signal._connections):
+                    if connection not in widget._pool_connections:
+                        connection.kill()
+
+            widgets = self._widgets.get(parent)
+            if widgets is None:
+                # The released widgets die with their parent
+                widgets = self._widgets[parent] = []
+                parent.signal.KILL.connect(functools.partial(self._handle_parent_kill, parent), owner=None)
+            widgets.append(widget)
+            widget._is_pooled = True
+            self._size += 1
+            self._releases += 1
+        return True
+
+    def reset_stats(self):
+
+        self._hits = self._misses = self._releases = self._drops = 0
+
+    def set_enabled(self, enabled):
+        """A disabled pool doesn't keep the killed widgets anymore, and forgets the released ones"""
+
+        self._is_enabled = bool(enabled)
+        if not self._is_enabled:
+            self.clear()
+
+    def set_maxsize(self, maxsize):
+
+        assert isinstance(maxsize, int) and maxsize >= 0, maxsize
+        self._maxsize = maxsize
+
+
+class Poolable:
+    """
+    A Poolable widget is recycled when it is killed : it waits in the WidgetPool of its class,
+    and the next construction of a widget of this class with the same parent gives it back
+
+    Each Poolable class has its own pool, widget_pool. The parent must be the first parameter
+    of the constructor. A Poolable class implements _recycle(), who receives the parameters
+    of the construction and gives the widget a new state, like __init__() would. It is called
+    while the widget is asleep, just before it wakes up in its parent. Poolable must come
+    before Widget in the bases :
+
+        class _Line(Poolable, Widget):
+            def _recycle(self, parent, text):
+                ...
+
+        print(_Line.widget_pool.get_stats())
+    """
+
+    widget_pool = None
+    _is_pooled = False  # True while the widget waits in the pool
+
+    def __init_subclass__(cls, **kwargs):
+
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, "_recycle", None)):
+            raise TypeError(f"The Poolable class {cls.__name__} must implement _recycle()")
+        cls.widget_pool = WidgetPool(cls)
+
+    is_alive = property(lambda self: not self._is_pooled and self._weakref() is not None)
+    is_dead = property(lambda self: self._is_pooled or self._weakref() is None)
+
+    def kill(self):
+
+        if not self.is_alive:
+            return
+        if not self.widget_pool.release(self):
+            super().kill()
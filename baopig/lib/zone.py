@@ -62,7 +62,7 @@ class SubZone(Zone):  # TODO : SubScene ? with rects_to_update ?
 
             # optimization
             if self.parent is self.scene:
-                pygame.display.update(self.hitbox)
+                self.scene._warn_parent(self.hitbox)
             else:
                 self.parent.send_display_request(
                     rect=(self.parent.left + self.hitbox.left, self.parent.top + self.hitbox.top) + self.hitbox.size
@@ -84,7 +84,4 @@ class SubZone(Zone):  # TODO : SubScene ? with rects_to_update ?
         rect = (self.rect.left + rect[0], self.rect.top + rect[1]) + tuple(rect[2:])
 
         # because of subsurface, we can skip self.parent._update_rect()
-        if self.parent is self.scene:
-            pygame.display.update(rect)
-        else:
-            self.parent._warn_parent(rect)
+        self.parent._warn_parent(rect)
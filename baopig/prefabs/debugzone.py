@@ -1,5 +1,5 @@
 from baopig import mouse
-from baopig import Zone, Handler_SceneClose, Text, DynamicText, Highlighter
+from baopig import Zone, Handler_SceneClose, Text, DynamicText, Highlighter, paint_diagnostics
 
 
 # --- DEBUG ---
@@ -69,6 +69,10 @@ class DebugZone(Zone, Handler_SceneClose):
             Text(presentators_zone, text="- parent : ")
             DynamicText(trackers_zone, get_text=lambda: self._pointed.parent if self._pointed else None)
 
+            # RENDER DIAGNOSTICS TRACKER
+            Text(presentators_zone, text="Diagnostics : ")
+            DynamicText(trackers_zone, get_text=lambda: ("on" if self.is_diagnosing else "off") + " (Cmd + Alt + E)")
+
         presentators_zone.pack()
         trackers_zone.pack()
 
@@ -86,9 +90,11 @@ class DebugZone(Zone, Handler_SceneClose):
         self.debug_zone.adapt(self.debug_zone.default_layer, horizontally=False)
 
     is_debugging = property(lambda self: self.is_awake)
+    is_diagnosing = property(lambda self: paint_diagnostics.is_enabled)
 
     def handle_scene_close(self):
 
+        self.stop_render_diagnostics()
         self.kill()  # TODO : not kill
 
     def handle_scene_resize(self):
@@ -102,6 +108,15 @@ class DebugZone(Zone, Handler_SceneClose):
         self.print_text.set_text(str(obj))
         self.debug_zone.adapt(self.debug_zone.default_layer, horizontally=False)
 
+    def start_render_diagnostics(self):
+        """
+        Show what the painter does at each frame : the updated rects, the overdraw heat map
+        and the counters of the frame, see PaintDiagnostics
+        """
+
+        self.start_debugging()
+        paint_diagnostics.enable()
+
     def start_debugging(self):
 
         if self.is_debugging:
@@ -114,8 +129,13 @@ class DebugZone(Zone, Handler_SceneClose):
         if not self.is_debugging:
             return
 
+        self.stop_render_diagnostics()
         self.sleep()
 
+    def stop_render_diagnostics(self):
+
+        paint_diagnostics.disable()
+
     def toggle_debugging(self):
 
         if self.is_debugging:
@@ -123,6 +143,13 @@ class DebugZone(Zone, Handler_SceneClose):
         else:
             self.start_debugging()
 
+    def toggle_render_diagnostics(self):
+
+        if self.is_diagnosing:
+            self.stop_render_diagnostics()
+        else:
+            self.start_render_diagnostics()
+
     def update_pointed_outline(self):
 
         def collidemouse(widget):
@@ -144,7 +171,11 @@ class DebugZone(Zone, Handler_SceneClose):
         if self.is_asleep:
             return
 
-        pointed = get_pointed_widget(self.scene)
+        store = self.scene.geometry_store
+        if store is None:
+            pointed = get_pointed_widget(self.scene)
+        else:
+            pointed = store.get_topmost_at(mouse.pos, touchable=False, exclude=(self,))
         if pointed:
             if self._pointed == pointed:
                 return
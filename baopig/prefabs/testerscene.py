@@ -105,10 +105,28 @@ app.launch()"""
         for i, v in enumerate(tests):
             cb = CheckBox(self.sections_zone, text=f"TEST {i + 1} : {v}",  # {:0>2} for 01, 02...
                           row=len(self.sections_zone.children), width=self.sections_zone.rect.w)
-            if v.startswith("TODO"):
+            if v.startswith(("TODO", "FAILED")):
                 cb.text_widget.font.config(color="red3")
         Text(self.sections_zone, "", row=len(self.sections_zone.children))
 
+    def add_checks(self, title, checks):
+        """
+        Like add_section(), for the tests who check themselves : each check is a function
+        receiving the tested zone, who raises an AssertionError if it fails
+        Its docstring describes the test
+        """
+
+        tests = []
+        for check in checks:
+            try:
+                check(self.content)
+                result = "PASSED"
+            except Exception as e:
+                LOGGER.warning(f"{check.__name__} failed : {e!r}")
+                result = f"FAILED ({e.__class__.__name__})"
+            tests.append(f"{result} : {check.__doc__.strip()}")
+        self.add_section(title, tests)
+
     def handle_scene_close(self):
 
         self.kill()
@@ -1,3 +1,4 @@
 
 from .issomething import *
 from .objectutilities import *
+from .statistics import *
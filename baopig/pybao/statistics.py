@@ -0,0 +1,5 @@
+def percentile(sorted_values, share):
+    """Nearest-rank percentile of a sorted list, share is between 0 and 1"""
+
+    index = max(int(share * len(sorted_values) + .5) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
@@ -5,10 +5,11 @@ import os
 import time
 import threading
 import pygame
-from baopig.pybao.objectutilities import History, Object
+from baopig.pybao.objectutilities import History
 from baopig.time.timer import RepeatingTimer
-from baopig.lib import paint_lock
+from baopig.lib import paint_lock, paint_diagnostics
 from .thread import ExtraThread, LOGGER
+from .recorder import DeltaRecorder, FrameRecorder
 
 
 class PainterThread(ExtraThread):
@@ -19,11 +20,15 @@ class PainterThread(ExtraThread):
 
         basename = os.path.splitext(os.path.basename(sys.argv[0]))[0]
         self.out_directory = os.path.abspath("out") + os.path.sep + basename + os.path.sep
-        self._is_recording = False
+        self._recorder = None
+        self._record_format = "png"
         self.record_index = 1
 
         self._required_fps = None
 
+        # When the dirty rects cover this share of the window, the whole display is flipped
+        self._flip_threshold = .5
+
         # if self.app._debug_averagefps:
         def _tick_fps():
             # being a deque, it manages its data itself
@@ -38,12 +43,21 @@ class PainterThread(ExtraThread):
         self.clock = pygame.time.Clock()
         self._can_draw = threading.Event()
 
+        # Time spent waiting for something to draw, and time spent drawing, in seconds
+        self._idle_time = 0.
+        self._busy_time = 0.
+
     def __del__(self):
 
         # if self.app._debug_averagefps:
         self.fps_history_updater.cancel()
 
-    is_recording = property(lambda self: self._is_recording)
+    busy_time = property(lambda self: self._busy_time)
+    flip_threshold = property(lambda self: self._flip_threshold)
+    idle_time = property(lambda self: self._idle_time)
+    is_recording = property(lambda self: self._recorder is not None)
+    record_format = property(lambda self: self._record_format)
+    recorder = property(lambda self: self._recorder)
     required_fps = property(lambda self: self._required_fps)
 
     def get_current_fps(self):
@@ -64,6 +78,35 @@ class PainterThread(ExtraThread):
         # if self.app._debug_averagefps:
         self.fps_history_updater.start()
 
+    def paint(self):
+        """
+        Paint the dirty containers of the focused scene, then update the display
+        Return the rects of the display who changed
+
+        Called by update() in the painter thread, or directly by Application.step() in headless mode
+        """
+
+        scene = self.app.focused_scene
+        diagnostics = paint_diagnostics if paint_diagnostics.is_enabled else None
+        if diagnostics is not None:
+            with paint_lock:
+                diagnostics.start_frame(scene)  # erases the overlay of the last frame
+
+        # Not under the paint_lock : it is yielded between two containers, see Scene._paint_dirty_containers()
+        scene._paint_dirty_containers()
+
+        with paint_lock:
+            # record : only the raw pixels are copied here, the encoding is done in the background
+            recorder = self._recorder
+            if recorder is not None and (not recorder.only_at_change or scene._display_region):
+                recorder.capture(scene.surface, scene._display_region)
+
+            if diagnostics is not None:
+                diagnostics.end_frame(scene)  # draws the overlay, see PaintDiagnostics
+        # All the rects that reached the scene are sent to the display at once,
+        # after the paint_lock is released, so the main thread can go on meanwhile
+        return scene._flush_display(self._flip_threshold)
+
     def screenshot(self):
 
         os.makedirs(self.out_directory, exist_ok=True)
@@ -77,36 +120,81 @@ class PainterThread(ExtraThread):
         assert isinstance(fps, int) and fps > 0 or fps is None
         self._required_fps = fps
 
+    def set_flip_threshold(self, share):
+        """
+        Set the share of the window (between 0 and 1) from which a frame is displayed
+        with a single pygame.display.flip() instead of pygame.display.update(rects)
+        """
+
+        assert 0 <= share <= 1, share
+        self._flip_threshold = share
+
     def stop(self):
 
+        self.stop_recording(wait=True)  # the queued frames are saved before the application exits
         with paint_lock:
             super().stop()
             # if self.app._debug_averagefps:
             self.fps_history_updater.cancel()
 
+    def set_record_format(self, record_format):
+        """
+        'png' : one image per frame, see FrameRecorder
+        'delta' : a single file containing only the changes of each frame, see DeltaRecorder
+        """
+
+        assert record_format in ("png", "delta"), record_format
+        self._record_format = record_format
+
     def start_recording(self, only_at_change=False):
+        """
+        Start to save the frames in out_directory
+        The frames are encoded in the background, see FrameRecorder and DeltaRecorder
+        A delta recording always ignores the frames without change
+        """
 
+        if self._recorder is not None:
+            raise PermissionError("Already recording")
         os.makedirs(self.out_directory, exist_ok=True)
-        self._is_recording = Object(only_at_change=only_at_change)
+        if self._record_format == "delta":
+            name = time.strftime("record_%Y.%m.%d-%Hh%M-%S.bpd", time.localtime())
+            recorder = DeltaRecorder(self.out_directory + name)
+        else:
+            recorder = FrameRecorder(self.out_directory, only_at_change=only_at_change,
+                                     first_index=self.record_index)
+        recorder.start()
+        self._recorder = recorder
         LOGGER.info("Start recording" + (" (only at display updates)" if only_at_change else ""))
 
-    def stop_recording(self):
+    def stop_recording(self, wait=False):
+        """Stop to record, if wait is True, returns once every captured frame is saved"""
 
-        self._is_recording = False
-        LOGGER.info("Stop recording")
+        recorder = self._recorder
+        if recorder is None:
+            return
+        self._recorder = None
+        recorder.stop(wait=wait)
+        if isinstance(recorder, FrameRecorder):
+            self.record_index = recorder.next_index
+        LOGGER.info(f"Stop recording ({recorder.captured_frames} frames captured, "
+                    f"{recorder.dropped_frames} dropped)")
 
     def update(self):
 
+        start = time.perf_counter()
         self._can_draw.wait()
+        # Cleared before painting, so a request made during this frame is kept for the next one
+        self._can_draw.clear()
+        self._idle_time += time.perf_counter() - start
+        start = time.perf_counter()
 
         try:
 
             # Drawings
-            with paint_lock:
-                try:
-                    self.app.focused_scene._container_paint()
-                except Exception as e:
-                    LOGGER.exception(e)
+            try:
+                self.paint()
+            except Exception as e:
+                LOGGER.exception(e)
 
             # FPS Tracer
             """if self.fps_label.is_visible:
@@ -119,23 +207,16 @@ class PainterThread(ExtraThread):
 
             # launch time
             if self.app._debug_launchtime and self.app.launch_time is not None:
-                import time
                 LOGGER.info("{} launched in {} seconds".format(self.app.name, time.time() - self.app.launch_time))
                 self.app.launch_time = None
 
-            # record
-            if self.is_recording:
-                if not self.is_recording.only_at_change:
-                    pygame.image.save(self.app.display, self.out_directory + f"record_{self.record_index:0>3}.png")
-                    self.record_index += 1
-
             # FPS
             # if self.app._debug_averagefps:
             self.screenupdates_during_current_second += 1
             # NOTE : Pour mieux tester les FPS, on ne fait pas ticker l'horloge
+            self._busy_time += time.perf_counter() - start
             if self.required_fps is not None:
                 self.clock.tick(self.required_fps)  # keep the game running slower than the given FPS
-            self._can_draw.clear()
 
         except pygame.error as e:
             if e.__str__() == "video system not initialized":
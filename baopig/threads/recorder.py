@@ -0,0 +1,405 @@
+import bisect
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import zlib
+import pygame
+from baopig.time.utilities import clock
+from .thread import LOGGER
+
+
+def _encode_frame(raw, size, path):
+    """Executed in a worker process : save a raw RGB frame as an image file"""
+
+    pygame.image.save(pygame.image.frombuffer(raw, size, "RGB"), path)
+
+
+class FrameRecorder:
+    """
+    A FrameRecorder saves the frames of the application without slowing down the painter
+
+    The painter only copies the raw pixels of a frame (see capture()) into a bounded queue.
+    A feeder thread sends the queued frames to a pool of processes, who encode them as
+    PNG files. When the encoders fall behind and the queue is full, the new frames are
+    dropped and counted in dropped_frames.
+
+    The workers are started with forkserver, or spawn where it doesn't exist : like with any
+    multiprocessing, the main script of the application must be protected by
+    if __name__ == "__main__"
+
+    If only_at_change is True, the painter only captures the frames who updated the display
+
+    Example :
+        recorder = FrameRecorder("out/my_app/", only_at_change=True)
+        recorder.start()
+        recorder.capture(surface)  # called by the painter, once per frame
+        recorder.stop()            # the queued frames are still encoded
+    """
+
+    def __init__(self, out_directory, only_at_change=False, maxsize=32, max_workers=None, first_index=1):
+
+        assert isinstance(maxsize, int) and maxsize > 0, maxsize
+
+        self._out_directory = out_directory
+        self._only_at_change = bool(only_at_change)
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._max_workers = max_workers
+        self._next_index = first_index
+        self._pool = None
+        self._feeder = None
+        self._is_recording = False
+
+        # Counters
+        self._captured_frames = 0
+        self._dropped_frames = 0
+        self._encoded_frames = 0
+        self._failed_frames = 0
+
+    captured_frames = property(lambda self: self._captured_frames)
+    dropped_frames = property(lambda self: self._dropped_frames)
+    encoded_frames = property(lambda self: self._encoded_frames)
+    failed_frames = property(lambda self: self._failed_frames)
+    is_recording = property(lambda self: self._is_recording)
+    next_index = property(lambda self: self._next_index)
+    only_at_change = property(lambda self: self._only_at_change)
+    pending_frames = property(lambda self: self._queue.qsize())
+
+    def _create_pool(self):
+
+        # A fork would copy the locks held by the other threads at that moment (paint_lock,
+        # logging, SDL...), and the workers could wait for them forever
+        try:
+            context = multiprocessing.get_context("forkserver")
+        except ValueError:  # not available on this platform
+            context = multiprocessing.get_context("spawn")
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self._max_workers, mp_context=context)
+
+    def _feed(self):
+        """Executed in the feeder thread : send the queued frames to the pool"""
+
+        max_pending = (self._max_workers or multiprocessing.cpu_count()) * 2
+        pending = set()
+
+        def handle_done(future):
+            if future.exception() is None:
+                self._encoded_frames += 1
+            else:
+                self._failed_frames += 1
+                LOGGER.warning(f"Cannot encode a frame : {future.exception()}")
+
+        while True:
+            frame = self._queue.get()
+            if frame is None:  # sent by stop()
+                break
+            if len(pending) >= max_pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            future = self._pool.submit(_encode_frame, *frame)
+            future.add_done_callback(handle_done)
+            pending.add(future)
+
+        self._pool.shutdown(wait=True)
+        LOGGER.info(f"Recording finished : {self._encoded_frames} frames saved, "
+                    f"{self._dropped_frames} dropped, {self._failed_frames} failed")
+
+    def capture(self, surface, rects=()):
+        """
+        Queue a copy of the surface pixels, without encoding them
+        rects is ignored, every frame is saved entirely
+        Return False if the frame has been dropped because the queue is full
+        """
+
+        if not self._is_recording:
+            return False
+
+        path = self._out_directory + f"record_{self._next_index:0>3}.png"
+        frame = pygame.image.tobytes(surface, "RGB"), surface.get_size(), path
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self._dropped_frames += 1
+            return False
+        self._next_index += 1
+        self._captured_frames += 1
+        return True
+
+    def start(self):
+
+        if self._is_recording:
+            raise PermissionError("The recorder is already recording")
+        self._pool = self._create_pool()
+        self._feeder = threading.Thread(target=self._feed, name=self.__class__.__name__, daemon=True)
+        self._feeder.start()
+        self._is_recording = True
+
+    def stop(self, wait=False):
+        """Stop capturing frames, the queued frames are encoded in the background unless wait is True"""
+
+        if not self._is_recording:
+            return
+        self._is_recording = False
+        self._queue.put(None)
+        if wait:
+            self._feeder.join()
+
+
+# Delta format
+#
+#   file header :  magic (8s) version (B)
+#   frame :        index (I) time (d) is_keyframe (B) width (H) height (H) rects count (H)
+#                  then, for each rect : left (H) top (H) width (H) height (H) data length (I) zlib(RGB pixels)
+#
+#   index file :   magic (8s) version (B), then for each frame : index (I) time (d) offset (Q) is_keyframe (B)
+_DELTA_MAGIC = b"BAOPIGDF"
+_DELTA_VERSION = 1
+_DELTA_HEADER = struct.Struct("<8sB")
+_DELTA_FRAME = struct.Struct("<IdBHHH")
+_DELTA_RECT = struct.Struct("<HHHHI")
+_DELTA_INDEX = struct.Struct("<IdQB")
+
+
+class DeltaRecorder:
+    """
+    A DeltaRecorder saves a recording in a single file, where each frame only contains
+    the pixels of the rects who changed since the previous frame
+
+    The first frame, and one frame every keyframe_interval frames, are keyframes : they
+    contain the whole surface, so a reader can seek without decoding from the start.
+    The rects are compressed with zlib in a writer thread. If the writer falls behind and
+    the queue is full, the frame is dropped and the next captured frame is a keyframe, so
+    no change is lost in the file.
+
+    An index file (path + ".idx") lists the offset of each frame, see DeltaReader
+    """
+
+    def __init__(self, path, keyframe_interval=300, maxsize=256, level=1):
+
+        assert isinstance(keyframe_interval, int) and keyframe_interval > 0, keyframe_interval
+        assert isinstance(maxsize, int) and maxsize > 0, maxsize
+
+        self._path = path
+        self._keyframe_interval = keyframe_interval
+        self._level = level
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._writer = None
+        self._is_recording = False
+        self._next_index = 0
+        self._frames_since_keyframe = None  # None means the next frame must be a keyframe
+        self._size = None
+        self._start_time = None
+
+        # Counters
+        self._captured_frames = 0
+        self._dropped_frames = 0
+        self._written_bytes = 0
+
+    captured_frames = property(lambda self: self._captured_frames)
+    dropped_frames = property(lambda self: self._dropped_frames)
+    is_recording = property(lambda self: self._is_recording)
+    next_index = property(lambda self: self._next_index)
+    only_at_change = property(lambda self: True)  # a frame without change is not stored
+    path = property(lambda self: self._path)
+    pending_frames = property(lambda self: self._queue.qsize())
+    written_bytes = property(lambda self: self._written_bytes)
+
+    def _write(self):
+        """Executed in the writer thread : compress the queued frames and write them"""
+
+        with open(self._path, "wb") as file, open(self._path + ".idx", "wb") as index_file:
+            file.write(_DELTA_HEADER.pack(_DELTA_MAGIC, _DELTA_VERSION))
+            index_file.write(_DELTA_HEADER.pack(_DELTA_MAGIC, _DELTA_VERSION))
+            while True:
+                frame = self._queue.get()
+                if frame is None:  # sent by stop()
+                    break
+                index, frame_time, is_keyframe, size, chunks = frame
+                offset = file.tell()
+                file.write(_DELTA_FRAME.pack(index, frame_time, is_keyframe, *size, len(chunks)))
+                for rect, raw in chunks:
+                    data = zlib.compress(raw, self._level)
+                    file.write(_DELTA_RECT.pack(*rect, len(data)))
+                    file.write(data)
+                index_file.write(_DELTA_INDEX.pack(index, frame_time, offset, is_keyframe))
+                self._written_bytes = file.tell()
+
+        LOGGER.info(f"Recording finished : {self._next_index} frames saved in {self._path} "
+                    f"({self._written_bytes} bytes, {self._dropped_frames} dropped)")
+
+    def capture(self, surface, rects=()):
+        """
+        Queue a copy of the pixels of the rects, or of the whole surface for a keyframe
+        Return False if the frame has been dropped because the queue is full
+        """
+
+        if not self._is_recording:
+            return False
+
+        size = surface.get_size()
+        if not rects and size == self._size:
+            return True  # nothing changed, even a due keyframe waits for the next change
+        surface_rect = pygame.Rect((0, 0), size)
+        is_keyframe = self._frames_since_keyframe is None or size != self._size or \
+            self._frames_since_keyframe >= self._keyframe_interval
+        if is_keyframe:
+            rects = (surface_rect,)
+        else:
+            rects = tuple(rect for rect in (surface_rect.clip(rect) for rect in rects) if rect.w and rect.h)
+            if not rects:
+                return True
+
+        chunks = tuple((tuple(rect), pygame.image.tobytes(surface.subsurface(rect), "RGB")) for rect in rects)
+        frame = self._next_index, clock.get_time() - self._start_time, is_keyframe, size, chunks
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self._dropped_frames += 1
+            self._frames_since_keyframe = None  # the dropped changes are in the next keyframe
+            return False
+        self._next_index += 1
+        self._captured_frames += 1
+        self._size = size
+        self._frames_since_keyframe = 0 if is_keyframe else self._frames_since_keyframe + 1
+        return True
+
+    def start(self):
+
+        if self._is_recording:
+            raise PermissionError("The recorder is already recording")
+        self._start_time = clock.get_time()
+        self._writer = threading.Thread(target=self._write, name=self.__class__.__name__, daemon=True)
+        self._writer.start()
+        self._is_recording = True
+
+    def stop(self, wait=False):
+        """Stop capturing frames, the queued frames are written in the background unless wait is True"""
+
+        if not self._is_recording:
+            return
+        self._is_recording = False
+        self._queue.put(None)
+        if wait:
+            self._writer.join()
+
+
+class DeltaReader:
+    """
+    A DeltaReader rebuilds the full frames of a file written by a DeltaRecorder
+
+    Example :
+        reader = DeltaReader("out/my_app/record.bpd")
+        len(reader)                 # number of frames
+        surface = reader.get_frame(42)
+        for frame_time, surface in reader:
+            ...
+        reader.export_frames("out/my_app/frames/")
+        reader.export_video("out/my_app/record.mp4", fps=30)  # needs ffmpeg
+    """
+
+    def __init__(self, path):
+
+        self._path = path
+        self._times = []
+        self._offsets = []
+        self._keyframes = []  # indexes of the keyframes, sorted
+        with open(path + ".idx", "rb") as index_file:
+            self._check_header(index_file)
+            data = index_file.read()
+        for index, frame_time, offset, is_keyframe in _DELTA_INDEX.iter_unpack(data):
+            assert index == len(self._offsets), "Corrupted index file"
+            self._times.append(frame_time)
+            self._offsets.append(offset)
+            if is_keyframe:
+                self._keyframes.append(index)
+
+    def __iter__(self):
+
+        surface = None
+        with open(self._path, "rb") as file:
+            for index, offset in enumerate(self._offsets):
+                file.seek(offset)
+                surface = self._read_frame(file, surface)
+                yield self._times[index], surface
+
+    def __len__(self):
+        return len(self._offsets)
+
+    duration = property(lambda self: self._times[-1] if self._times else 0)
+    times = property(lambda self: tuple(self._times))
+
+    @staticmethod
+    def _check_header(file):
+
+        magic, version = _DELTA_HEADER.unpack(file.read(_DELTA_HEADER.size))
+        if magic != _DELTA_MAGIC:
+            raise ValueError(f"Not a baopig delta recording : {file.name}")
+        if version != _DELTA_VERSION:
+            raise ValueError(f"Unsupported delta recording version : {version}")
+
+    @staticmethod
+    def _read_frame(file, surface):
+        """Apply the frame at the current file position on surface, return the surface"""
+
+        index, frame_time, is_keyframe, width, height, rects_count = _DELTA_FRAME.unpack(
+            file.read(_DELTA_FRAME.size))
+        if is_keyframe and (surface is None or surface.get_size() != (width, height)):
+            surface = pygame.Surface((width, height))
+        assert surface is not None, "A recording must start with a keyframe"
+        for _ in range(rects_count):
+            left, top, w, h, length = _DELTA_RECT.unpack(file.read(_DELTA_RECT.size))
+            raw = zlib.decompress(file.read(length))
+            surface.blit(pygame.image.frombuffer(raw, (w, h), "RGB"), (left, top))
+        return surface
+
+    def export_frames(self, out_directory, name="frame_{:0>5}.png"):
+        """Save every frame as an image file"""
+
+        os.makedirs(out_directory, exist_ok=True)
+        for index, (frame_time, surface) in enumerate(self):
+            pygame.image.save(surface, os.path.join(out_directory, name.format(index)))
+
+    def export_video(self, path, fps=30):
+        """
+        Encode the recording as a video with constant frame rate, using ffmpeg
+        A frame is repeated until the next one, following the recorded times
+        """
+
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise PermissionError("export_video() needs ffmpeg to be installed")
+        if not self._offsets:
+            raise PermissionError("Empty recording")
+
+        process = None
+        written = 0
+        for frame_time, surface in self:
+            if process is None:
+                process = subprocess.Popen(
+                    [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                     "-s", "{}x{}".format(*surface.get_size()), "-r", str(fps), "-i", "-",
+                     "-pix_fmt", "yuv420p", path], stdin=subprocess.PIPE)
+                size = surface.get_size()
+            elif surface.get_size() != size:
+                surface = pygame.transform.scale(surface, size)  # a video has a fixed size
+            raw = pygame.image.tobytes(surface, "RGB")
+            while written <= frame_time * fps:
+                process.stdin.write(raw)
+                written += 1
+        process.stdin.close()
+        process.wait()
+
+    def get_frame(self, index):
+        """Return the frame at index as a new surface, decoding from the previous keyframe"""
+
+        if not 0 <= index < len(self._offsets):
+            raise IndexError(index)
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, index) - 1]
+        surface = None
+        with open(self._path, "rb") as file:
+            for i in range(keyframe, index + 1):
+                file.seek(self._offsets[i])
+                surface = self._read_frame(file, surface)
+        return surface
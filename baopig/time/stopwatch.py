@@ -1,8 +1,7 @@
 
-import time
 
 from baopig.communicative import Communicative
-from .utilities import present_time
+from .utilities import clock, present_time
 
 
 class Stopwatch(Communicative):
@@ -38,7 +37,7 @@ class Stopwatch(Communicative):
         if self._start_time is None:
             return 0
         if self._stop_time is None:
-            return time.time() - self._start_time
+            return clock.get_time() - self._start_time
         return self._stop_time - self._start_time
 
     def reset(self):
@@ -66,9 +65,9 @@ class Stopwatch(Communicative):
             raise PermissionError("The stopwatch has already stared")
 
         if self._start_time is None:
-            self._start_time = time.time()
+            self._start_time = clock.get_time()
         else:
-            self._start_time = time.time() - self.get_time()
+            self._start_time = clock.get_time() - self.get_time()
             self._stop_time = None
         _running_stopwatches.add(self)
         self.signal.START.emit()
@@ -80,7 +79,7 @@ class Stopwatch(Communicative):
         if not self.is_running:
             raise PermissionError("The stopwatch is not running")
 
-        self._stop_time = time.time()
+        self._stop_time = clock.get_time()
         _running_stopwatches.remove(self)
         self.signal.STOP.emit()
 
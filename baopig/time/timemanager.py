@@ -1,4 +1,4 @@
-import time
+from baopig.time.utilities import clock
 from baopig.time.stopwatch import _running_stopwatches
 from baopig.time.timer import _running_timers, timer_lock, RepeatingTimer
 
@@ -41,7 +41,7 @@ class _TimeManager:
     @staticmethod
     def update():
 
-        current_time = time.time()
+        current_time = clock.get_time()
 
         with timer_lock:
             for timer in tuple(_running_timers):
@@ -1,6 +1,5 @@
 
 
-import time
 import threading
 from baopig.pybao.objectutilities import PrefilledFunction
 from baopig.communicative import Communicative, LOGGER
@@ -72,7 +71,7 @@ class Timer(Communicative):
         if self.is_paused:
             return self.interval - (self._pause_time - self._start_time)
 
-        return max(self._end_time - time.time(), 0)
+        return max(self._end_time - clock.get_time(), 0)
 
     def pause(self):
 
@@ -80,7 +79,7 @@ class Timer(Communicative):
             return
 
         with timer_lock:
-            self._pause_time = time.time()
+            self._pause_time = clock.get_time()
             _running_timers.remove(self)
 
     def resume(self):
@@ -89,7 +88,7 @@ class Timer(Communicative):
             return
 
         with timer_lock:
-            self._start_time = self._start_time + (time.time() - self._pause_time)
+            self._start_time = self._start_time + (clock.get_time() - self._pause_time)
             self._end_time = self._start_time + self.interval
             self._pause_time = None
             _running_timers.add(self)
@@ -108,7 +107,7 @@ class Timer(Communicative):
             # raise PermissionError("Must launch an Application before starting a Timer")
 
         with timer_lock:
-            self._start_time = time.time()
+            self._start_time = clock.get_time()
             self._pause_time = None
             self._end_time = self._start_time + self.interval
             _running_timers.add(self)
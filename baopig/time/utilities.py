@@ -1,5 +1,6 @@
 
 import math
+from time import time as _real_time
 
 
 MILLISECONDS = .001
@@ -124,6 +125,43 @@ def present_time(time, max_unit=SECONDS, min_unit=MILLISECONDS):
     return res + "{:0>3}".format(milliseconds)
 
 
+class _Clock:
+    """
+    The clock read by the timers, the stopwatches, the Runables and the mouse clicks
+
+    By default, it gives the real time. In a headless application, it gives a virtual
+    time, who only moves when the application steps (see Application.step())
+    """
+
+    def __init__(self):
+
+        self._virtual_time = None
+
+    is_virtual = property(lambda self: self._virtual_time is not None)
+
+    def advance(self, dt):
+        """Move the virtual time forward by dt seconds"""
+
+        if self._virtual_time is None:
+            raise PermissionError("Only a virtual clock can be advanced")
+        assert dt >= 0, dt
+        self._virtual_time += dt
+
+    def get_time(self):
+
+        if self._virtual_time is None:
+            return _real_time()
+        return self._virtual_time
+
+    def set_virtual(self, start=None):
+        """From now on, the time only moves with advance(), starting from start (default : now)"""
+
+        self._virtual_time = _real_time() if start is None else start
+
+
+clock = _Clock()
+
+
 # TESTS UNITAIRES
 """
 time = 400 * 60 + .8
@@ -0,0 +1,125 @@
+import random
+from baopig import *
+
+
+def _get_walked_rects(widget):
+    """The absolute rect and hitbox of the widget, computed from the rects of its parents"""
+
+    rect = pygame.Rect(widget.rect)
+    hitbox = pygame.Rect(widget.hitbox)
+    parent = widget.parent
+    while parent is not widget.scene:
+        rect.move_ip(parent.rect.topleft)
+        hitbox.move_ip(parent.rect.topleft)
+        parent = parent.parent
+    return rect, hitbox
+
+
+def _build_tree(zone):
+    """A Zone containing 3 levels of nested Zones, with a Rectangle in each one"""
+
+    root = Zone(zone, size=(300, 200), pos=(10, 60), background_color=(200, 200, 200))
+    containers = [root]
+    for i in range(3):
+        child = Zone(containers[-1], size=(200 - 40 * i, 120 - 20 * i), pos=(15, 20), background_color=(150, 150, 250))
+        containers.append(child)
+    widgets = containers + [Rectangle(cont, size=(8, 8), pos=(4, 4), color="red") for cont in containers]
+    return root, containers, widgets
+
+
+def _check_tree(widgets):
+
+    for widget in widgets:
+        rect, hitbox = _get_walked_rects(widget)
+        assert widget.abs_rect == rect, (widget, widget.abs_rect, rect)
+        assert widget.abs_hitbox == hitbox, (widget, widget.abs_hitbox, hitbox)
+
+
+def check_nested_moves(zone):
+    """After the moves of nested containers, every abs_rect follows its parents"""
+
+    root, containers, widgets = _build_tree(zone)
+    rnd = random.Random(0)
+    for i in range(40):
+        rnd.choice(containers).move(rnd.randint(-5, 5), rnd.randint(-5, 5))
+        if i % 3 == 0:
+            _check_tree(widgets)
+        if i % 7 == 0:
+            rnd.choice(widgets).set_pos(topleft=(rnd.randint(0, 20), rnd.randint(0, 20)))
+    _check_tree(widgets)
+    root.kill()
+
+
+def check_move_while_asleep(zone):
+    """A widget who sleeps while its parent moves finds its place back when it wakes up"""
+
+    root, containers, widgets = _build_tree(zone)
+    sleeper = containers[2]
+    sleeper.sleep()
+    containers[1].move(7, 3)
+    root.move(-4, 11)
+    sleeper.wake()
+    _check_tree(widgets)
+    root.kill()
+
+
+def check_reference(zone):
+    """A widget placed from a reference who is not its parent follows the moves of the reference"""
+
+    root, containers, widgets = _build_tree(zone)
+    follower = Rectangle(zone, size=(10, 10), pos=(2, 2), ref=containers[3], refloc="bottomright", color="blue")
+    for dx, dy in ((5, 0), (0, -3), (-8, 6)):
+        containers[2].move(dx, dy)
+        root.move(dy, dx)
+        expected = containers[3].abs_rect.right + 2, containers[3].abs_rect.bottom + 2
+        assert tuple(follower.abs_rect.topleft) == expected, (follower.abs_rect, expected)
+    follower.kill()
+    root.kill()
+
+
+def check_children_motion(zone):
+    """A moving container emits MOTION, its children don't, and a SubZone keeps its place in its parent"""
+
+    root, containers, widgets = _build_tree(zone)
+    subzone = SubZone(containers[1], size=(30, 20), pos=(40, 5), background_color="green")
+    moved = []
+    for widget in widgets + [subzone]:
+        widget.signal.MOTION.connect(lambda dx, dy, widget=widget: moved.append(widget), owner=None)
+    containers[1].move(3, 4)
+    assert moved == [containers[1]], moved
+    subzone.move(2, 0)
+    for widget in subzone, containers[1]:
+        widget.move(1, 1)
+        assert subzone.surface.get_parent() is containers[1].surface
+        assert subzone.surface.get_offset() == tuple(subzone.rect.topleft), subzone.surface.get_offset()
+    _check_tree(widgets + [subzone])
+    root.kill()
+
+
+class UT_AbsRect_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The absolute rects are checked automatically after nested moves,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="Widget.abs_rect",
+            checks=[
+                check_nested_moves,
+                check_move_while_asleep,
+                check_reference,
+                check_children_motion,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_AbsRect_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
@@ -0,0 +1,124 @@
+import random
+import sys
+from baopig import *
+from baopig.widgets.datagrid import _argsort
+
+
+def _shown_cells(grid):
+    """The texts of the visible cells, as {(display_index, col): text}"""
+
+    return {(display_index, col): cell.text
+            for display_index, row in grid._rows.items() if row.is_visible
+            for col, cell in row.cells.items() if cell.is_visible}
+
+
+def _expected_cells(grid, columns, order):
+    """The texts the visible cells should show, if the rows are displayed in order"""
+
+    return {(display_index, col): str(columns[col][order[display_index]])
+            for display_index, col in _shown_cells(grid)}
+
+
+def check_argsort(zone):
+    """_argsort() sorts in a stable way, in both orders, with or without numpy"""
+
+    rnd = random.Random(0)
+    column = [rnd.randrange(10) for _ in range(200)]
+    for reverse in (False, True):
+        expected = sorted(range(len(column)), key=column.__getitem__, reverse=reverse)
+        assert [int(index) for index in _argsort(column, reverse=reverse)] == expected, reverse
+
+        numpy = sys.modules.get("numpy")
+        sys.modules["numpy"] = None  # import numpy raises an ImportError
+        try:
+            assert list(_argsort(column, reverse=reverse)) == expected, reverse
+        finally:
+            if numpy is None:
+                del sys.modules["numpy"]
+            else:
+                sys.modules["numpy"] = numpy
+
+
+def check_grid_sort(zone):
+    """A DataGrid sorts its rows by a column, reverses with a second click on the header, and restores the order"""
+
+    rnd = random.Random(1)
+    ages = [rnd.randrange(20, 30) for _ in range(300)]
+    names = [f"name {i}" for i in range(300)]
+    columns = names, ages
+    grid = DataGrid(zone, columns=columns, headers=("Name", "Age"), size=(300, 150), pos=(10, 300))
+    try:
+        order = list(range(300))
+        assert _shown_cells(grid) == _expected_cells(grid, columns, order) != {}
+
+        grid._handle_header_click(1)
+        order = sorted(range(300), key=ages.__getitem__)
+        assert grid.sort_col == 1 and not grid.sort_reverse
+        assert grid._headers[1].text_widget.text == "Age ^"
+        assert [grid.get_row_index(i) for i in range(300)] == order
+        assert _shown_cells(grid) == _expected_cells(grid, columns, order)
+
+        grid._handle_header_click(1)
+        order = sorted(range(300), key=ages.__getitem__, reverse=True)
+        assert grid.sort_reverse and grid._headers[1].text_widget.text == "Age v"
+        grid.scroll_to(150)
+        assert [grid.get_row_index(i) for i in range(300)] == order
+        assert _shown_cells(grid) == _expected_cells(grid, columns, order)
+
+        grid.sort(None)
+        order = list(range(300))
+        assert grid.sort_col is None and grid._headers[1].text_widget.text == "Age"
+        assert _shown_cells(grid) == _expected_cells(grid, columns, order)
+    finally:
+        grid.kill()
+
+
+def check_grid_virtual_cells(zone):
+    """A DataGrid only creates the cells near the viewport, in both directions"""
+
+    columns = [range(col, col + 100000) for col in range(30)]
+    grid = DataGrid(zone, columns=columns, size=(300, 150), pos=(10, 300), col_width=60, row_height=20, overscan=2)
+    try:
+        order = range(100000)
+        max_rows = (150 - 25) // 20 + 1 + 2 * 2 + 1
+        max_cols = 300 // 60 + 1
+        for display_index, scroll_x in (0, 0), (50000, 200), (50001, 1000), (99999, 0), (10, 30 * 60):
+            grid.scroll_to(display_index)
+            grid.x_scroller.set_val(min(scroll_x, grid.x_scroller.maxval))
+            shown = _shown_cells(grid)
+            assert shown == _expected_cells(grid, columns, order), (display_index, scroll_x)
+            first = min(display_index, 100000 - (150 - 25) // 20)
+            assert grid.get_cell(first, grid._visible_cols[0]) is not None
+            assert len({display_index for display_index, col in shown}) <= max_rows
+            assert len({col for display_index, col in shown}) <= max_cols
+            assert grid.get_cell(first - 10, grid._visible_cols[0]) is None
+    finally:
+        grid.kill()
+
+
+class UT_DataGrid_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The DataGrid is checked automatically with a few tables,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="DataGrid",
+            checks=[
+                check_argsort,
+                check_grid_sort,
+                check_grid_virtual_cells,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_DataGrid_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
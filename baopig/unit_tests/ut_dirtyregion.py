@@ -0,0 +1,126 @@
+import random
+import threading
+from baopig import *
+from baopig.lib.utilities import _subtract_rect
+
+
+def _pixels(rects):
+    """The set of the pixels covered by rects"""
+
+    return {(x, y) for rect in rects for x in range(rect.left, rect.right) for y in range(rect.top, rect.bottom)}
+
+
+def check_subtract_rect(zone):
+    """_subtract_rect() returns disjoint pieces, covering exactly the rect outside the hole"""
+
+    rnd = random.Random(0)
+    for _ in range(200):
+        rect = pygame.Rect(rnd.randrange(20), rnd.randrange(20), rnd.randint(1, 20), rnd.randint(1, 20))
+        hole = pygame.Rect(rnd.randrange(30), rnd.randrange(30), rnd.randint(0, 20), rnd.randint(0, 20))
+        pieces = _subtract_rect(rect, hole)
+        assert len(pieces) <= 4, pieces
+        assert sum(piece.w * piece.h for piece in pieces) == len(_pixels(pieces)), pieces  # disjoint
+        assert _pixels(pieces) == _pixels([rect]) - _pixels([hole]), (rect, hole, pieces)
+
+
+def check_region_covers(zone):
+    """A DirtyRegion keeps at most maxlen disjoint rects, covering every added rect"""
+
+    rnd = random.Random(1)
+    for maxlen in (1, 4, 16):
+        region = DirtyRegion(maxlen=maxlen)
+        added = []
+        for _ in range(60):
+            rect = pygame.Rect(rnd.randrange(300), rnd.randrange(300), rnd.randint(1, 40), rnd.randint(1, 40))
+            region.add(rect)
+            added.append(rect)
+            assert len(region) <= maxlen, region
+            assert region.area == len(_pixels(region)), region  # disjoint
+        assert _pixels(added) <= _pixels(region)
+
+
+def check_region_merge(zone):
+    """A DirtyRegion merges the close rects and keeps the far ones apart"""
+
+    region = DirtyRegion()
+    region.add((0, 0, 10, 10))
+    region.add((300, 200, 10, 10))
+    assert len(region) == 2, region
+    region.add((5, 5, 10, 10))
+    assert len(region) == 2 and pygame.Rect(0, 0, 15, 15) in list(region), region
+    region.add((0, 0, 0, 10))  # empty
+    region.add((1, 1, 2, 2))  # already dirty
+    assert len(region) == 2 and region.area == 15 * 15 + 10 * 10, region
+    assert region.get_bounding_rect() == (0, 0, 310, 210)
+    assert len(region.pop_all()) == 2 and not region and region.get_bounding_rect() is None
+
+
+def check_flush_display(zone):
+    """Scene._flush_display() sends the merged rects in one update, or flips the display above the threshold"""
+
+    scene = zone.scene
+    calls = []
+    thread = threading.current_thread()
+    update, flip = pygame.display.update, pygame.display.flip
+
+    def record(name, function):
+        def recorder(*args):
+            if threading.current_thread() is not thread:  # the painter
+                return function(*args)
+            calls.append((name,) + args)
+        return recorder
+
+    pygame.display.update, pygame.display.flip = record("update", update), record("flip", flip)
+    try:
+        with paint_lock:
+            scene._flush_display()
+            calls.clear()
+            assert scene._flush_display() == () and not calls  # nothing to update
+
+            for rect in (0, 0, 10, 10), (5, 5, 10, 10), (300, 200, 10, 10):
+                scene._display_region.add(rect)
+            rects = scene._flush_display()
+            assert len(rects) == 2 and pygame.Rect(0, 0, 15, 15) in rects, rects
+            assert calls == [("update", rects)], calls
+            assert not scene._display_region
+
+            calls.clear()
+            scene._display_region.add((0, 0, scene.rect.w, scene.rect.h // 2 + 1))
+            rects = scene._flush_display(flip_threshold=.5)
+            assert len(rects) == 1 and calls == [("flip",)], calls
+
+            calls.clear()
+            scene._display_region.add((0, 0, scene.rect.w, scene.rect.h // 2 - 1))
+            scene._flush_display(flip_threshold=.5)
+            assert [call[0] for call in calls] == ["update"], calls
+    finally:
+        pygame.display.update, pygame.display.flip = update, flip
+
+
+class UT_DirtyRegion_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The DirtyRegion, _subtract_rect() and the display flush are checked automatically,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="DirtyRegion",
+            checks=[
+                check_subtract_rect,
+                check_region_covers,
+                check_region_merge,
+                check_flush_display,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_DirtyRegion_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
@@ -0,0 +1,97 @@
+import random
+from baopig import *
+
+
+def _walk(widget, clip, shown, found):
+    """Collect the widgets of the tree with their clipped abs_hitbox, and if they and their parents are visible"""
+
+    shown = shown and widget.is_visible
+    clip = pygame.Rect(widget.abs_hitbox).clip(clip)
+    found[widget] = pygame.Rect(widget.abs_rect), clip, shown
+    for child in getattr(widget, "children", ()):
+        _walk(child, clip, shown, found)
+    return found
+
+
+def _compare(store, root, rnd):
+
+    parent = root.parent
+    walked = _walk(root, pygame.Rect(parent.abs_hitbox), parent.is_visible, {})
+    for _ in range(30):
+        pos = rnd.randint(root.abs_rect.left - 10, root.abs_rect.right + 10), \
+              rnd.randint(root.abs_rect.top - 10, root.abs_rect.bottom + 10)
+        expected = {widget for widget, (rect, clip, shown) in walked.items() if shown and clip.collidepoint(pos)}
+        assert set(store.get_widgets_at(pos)).intersection(walked) == expected, pos
+
+        area = pygame.Rect(pos, (rnd.randint(1, 80), rnd.randint(1, 80)))
+        expected = {widget for widget, (rect, clip, shown) in walked.items() if rect.colliderect(area)}
+        assert set(store.get_colliding(area, only_visible=False)).intersection(walked) == expected, area
+        expected = {widget for widget, (rect, clip, shown) in walked.items() if shown and clip.colliderect(area)}
+        assert set(store.get_colliding(area)).intersection(walked) == expected, area
+
+
+def check_store_matches_tree(zone):
+    """The GeometryStore finds the same widgets as a walk through the tree, after moves, hides and sleeps"""
+
+    scene = zone.scene
+    was_enabled = scene.geometry_store is not None
+    try:
+        scene.set_geometry_store(True)
+    except ImportError:
+        return  # the store needs numpy
+
+    root = Zone(zone, size=(300, 200), pos=(10, 60), background_color=(200, 200, 200))
+    containers = [root]
+    rnd = random.Random(0)
+    for i in range(6):
+        cont = Zone(rnd.choice(containers), size=(rnd.randint(40, 160), rnd.randint(30, 100)),
+                    pos=(rnd.randint(-20, 120), rnd.randint(-20, 80)), background_color=(150, 150, 250))
+        containers.append(cont)
+    widgets = [Rectangle(rnd.choice(containers), size=(rnd.randint(4, 40), rnd.randint(4, 40)),
+                         pos=(rnd.randint(-10, 100), rnd.randint(-10, 80)), color="red") for _ in range(30)]
+    store = scene.geometry_store
+    try:
+        _compare(store, root, rnd)
+        for i in range(20):
+            widget = rnd.choice(containers[1:] + widgets)
+            action = i % 4
+            if action == 0:
+                widget.move(rnd.randint(-15, 15), rnd.randint(-15, 15))
+            elif action == 1:
+                widget.hide() if widget.is_visible else widget.show()
+            elif action == 2:
+                widget.sleep()
+                root.move(rnd.randint(-5, 5), rnd.randint(-5, 5))
+                widget.wake()
+            else:
+                widget.resize(rnd.randint(4, 60), rnd.randint(4, 60))
+            _compare(store, root, rnd)
+    finally:
+        root.kill()
+        scene.set_geometry_store(was_enabled)
+
+
+class UT_GeometryStore_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The GeometryStore is compared with a walk through the widgets,\n"
+                        "see the results on the left (needs numpy)", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="GeometryStore",
+            checks=[
+                check_store_matches_tree,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_GeometryStore_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
@@ -1,3 +1,5 @@
+import random
+import types
 from baopig import *
 
 
@@ -92,6 +94,147 @@ class TestingZone(Zone, Focusable):
             self.controlled.set_touchable_by_mouse(False)  # TODO : tests
 
 
+def _motion(pos, rel=(1, 1)):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel, buttons=(0, 0, 0), touch=False)
+
+
+class _Focusing:
+    """Give the focus to the scene of the zone during a check, the checks run before the scene is opened"""
+
+    def __init__(self, zone):
+        self._application = zone.application
+        self._scene = zone.scene
+        self._focused_scene = None
+
+    def __enter__(self):
+        self._focused_scene = self._application._focused_scene
+        self._application._focused_scene = self._scene
+
+    def __exit__(self, *args):
+        self._application._focused_scene = self._focused_scene
+
+
+def check_merge_motions(zone):
+    """The mouse motions following each other in a frame are received as one, unless the merge is disabled"""
+
+    merged = mouse.merge_motions(_motion((5, 5), rel=(2, 3)), _motion((9, 4), rel=(4, -1)))
+    assert merged.type == pygame.MOUSEMOTION and merged.pos == (9, 4) and merged.rel == (6, 2)
+
+    events = [_motion((i, i)) for i in range(5)]
+    click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(2, 2), button=1)
+    events.insert(2, click)
+    received = []
+    mouse.receive = received.append  # the events don't reach the widgets
+    with _Focusing(zone):
+        try:
+            zone.application._handle_events(events)
+            expected_types = [pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION]
+            assert [event.type for event in received] == expected_types, received
+            assert received[0].pos == (1, 1) and received[0].rel == (2, 2)
+            assert received[2].pos == (4, 4) and received[2].rel == (3, 3)
+
+            received.clear()
+            mouse.set_motion_merging(False)
+            zone.application._handle_events(events)
+            assert received == events, received
+
+            received.clear()
+            mouse.set_motion_merging(True)
+            linked_widget = mouse._linked_widget
+            mouse._linked_widget = types.SimpleNamespace(needs_every_motion=True)  # like a drawing zone
+            try:
+                zone.application._handle_events(events)
+            finally:
+                mouse._linked_widget = linked_widget
+            assert received == events, received
+        finally:
+            mouse.set_motion_merging(True)
+            del mouse.receive
+
+
+def check_touched_widget_cache(zone):
+    """The touched widget found without hit-test, while nothing moves, is the one a full search finds"""
+
+    rnd = random.Random(2)
+    container = Zone(zone, size=(300, 200), pos=(10, 300), background_color=(200, 200, 200))
+    inner = Zone(container, size=(120, 90), pos=(150, 90), background_color=(200, 200, 250))
+    widgets = [Button(rnd.choice((container, inner)), str(i), pos=(rnd.randrange(250), rnd.randrange(180)))
+               for i in range(25)]
+    view = ScrollView(container, size=(100, 100), pos=(0, 100))
+    content = Zone(view, size=(90, 400))
+    for i in range(10):
+        Button(content, f"s{i}", pos=(0, i * 40))
+
+    def full_search():
+        mouse._last_touch = None
+        return mouse._get_touched_widget()
+
+    pos, last_touch = mouse._pos, mouse._last_touch
+    left, top = container.abs_rect.topleft
+    cached = 0
+    try:
+        with _Focusing(zone):
+            for step in range(600):
+                if rnd.random() < .3:
+                    mouse._pos = left + rnd.randrange(300), top + rnd.randrange(200)
+                else:
+                    mouse._pos = mouse.pos[0] + rnd.randint(-4, 4), mouse.pos[1] + rnd.randint(-4, 4)
+                action = rnd.random()
+                widget = rnd.choice(widgets)
+                if action < .03:
+                    widget.move(rnd.randint(-20, 20), rnd.randint(-20, 20))
+                elif action < .05:
+                    widget.hide() if widget.is_visible else widget.show()
+                elif action < .07:
+                    widget.layer.move_on_top(widget)
+                elif action < .08:
+                    widget.set_touchable_by_mouse(not widget.is_touchable_by_mouse)
+                elif action < .09:
+                    view.y_scroller.set_val(rnd.randint(0, view.y_scroller.maxval))
+                elif action < .1:
+                    inner.move(rnd.randint(-10, 10), rnd.randint(-10, 10))
+
+                last = mouse._last_touch
+                touched = mouse._get_touched_widget()
+                if last is not None and mouse._last_touch is last:
+                    cached += 1
+                assert touched is full_search(), (step, mouse.pos, touched)
+        assert cached > 100, cached  # the fast path has been used
+    finally:
+        mouse._pos, mouse._last_touch = pos, last_touch
+        container.kill()
+
+
+def check_touched_widget_changes(zone):
+    """Every layout change under a still mouse gives the touched widget again"""
+
+    container = Zone(zone, size=(300, 200), pos=(10, 300), background_color=(200, 200, 200))
+    below = HoverableRectangle(container, size=(60, 60), pos=(20, 20))
+    above = HoverableRectangle(container, size=(60, 60), pos=(150, 20))
+    pos, last_touch = mouse._pos, mouse._last_touch
+    mouse._pos = container.abs_rect.left + 50, container.abs_rect.top + 50
+    try:
+        with _Focusing(zone):
+            assert mouse._get_touched_widget() is mouse._get_touched_widget() is below
+            above.set_pos(center=(50, 50))
+            assert mouse._get_touched_widget() is above
+            below.layer.move_on_top(below)
+            assert mouse._get_touched_widget() is below
+            below.set_touchable_by_mouse(False)
+            assert mouse._get_touched_widget() is above
+            above.hide()
+            assert mouse._get_touched_widget() is container
+            below.set_touchable_by_mouse(True)
+            assert mouse._get_touched_widget() is below
+            below.move(100, 0)
+            assert mouse._get_touched_widget() is container
+            container.move(-80, 0)  # the mouse is in below again
+            assert mouse._get_touched_widget() is below
+    finally:
+        mouse._pos, mouse._last_touch = pos, last_touch
+        container.kill()
+
+
 class UT_Hoverable_Zone(Zone):
     def __init__(self, *args, **kwargs):
         Zone.__init__(self, *args, **kwargs)
@@ -148,6 +291,14 @@ class UT_Hoverable_Zone(Zone):
                 "When a hovered HoverableByMouse is unhovered, the signal UNHOVER is emitted",
             ]
         )
+        self.parent.add_checks(
+            title="mouse motions",
+            checks=[
+                check_merge_motions,
+                check_touched_widget_cache,
+                check_touched_widget_changes,
+            ]
+        )
 
 
 # For the PresentationScene import
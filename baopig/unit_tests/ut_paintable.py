@@ -1,3 +1,4 @@
+import random
 from baopig import *
 
 
@@ -12,6 +13,125 @@ class RainbowRect(Rectangle):
         super().paint()
 
 
+class _CountingRect(Rectangle):
+    """A Rectangle counting the times its parent draws it"""
+
+    def __init__(self, parent, **kwargs):
+        self.draws = 0
+        Rectangle.__init__(self, parent, **kwargs)
+
+    def _paint_procedurally(self, surface, clip):
+        self.draws += 1
+        super()._paint_procedurally(surface, clip)
+
+
+def _build_rects(zone, pos, procedural):
+    """A Zone with overlapping Rectangles, some with a border, some out of the zone"""
+
+    container = Zone(zone, size=(120, 80), pos=pos, background_color=(150, 150, 150))
+    rects = [Rectangle(container, size=(40, 30), pos=rect_pos, color=color, procedural=procedural,
+                       border_width=i % 3, border_color=(0, 0, 0) if i % 2 else (255, 255, 255, 100))
+             for i, (rect_pos, color) in enumerate((((-10, 5), (255, 0, 0)), ((20, 20), (0, 0, 255, 128)),
+                                                    ((60, 50), (0, 255, 0)), ((100, -5), (250, 250, 0, 60))))]
+    return container, rects
+
+
+def _paint(zone):
+
+    with paint_lock:
+        zone.scene._paint_dirty_containers()
+
+
+def check_procedural_pixels(zone):
+    """Procedural Rectangles are drawn with the same pixels as Rectangles with a surface"""
+
+    classic, classic_rects = _build_rects(zone, (10, 300), procedural=False)
+    procedural, procedural_rects = _build_rects(zone, (140, 300), procedural=True)
+    try:
+        assert all(rect.surface is None for rect in procedural_rects)
+        _paint(zone)
+        assert pygame.image.tostring(classic.surface, "RGBA") == pygame.image.tostring(procedural.surface, "RGBA")
+
+        for rect in procedural_rects[::2]:
+            rect.set_procedural(False)  # back to a surface
+        for rects in classic_rects, procedural_rects:
+            rects[1].move(7, 3)
+            rects[2].set_color((0, 0, 0, 200))
+        _paint(zone)
+        assert pygame.image.tostring(classic.surface, "RGBA") == pygame.image.tostring(procedural.surface, "RGBA")
+    finally:
+        classic.kill()
+        procedural.kill()
+
+
+def check_paint_hook(zone):
+    """The parent draws every child through _paint_procedurally(), with or without surface"""
+
+    container = Zone(zone, size=(120, 80), pos=(10, 300), background_color=(150, 150, 150))
+    rects = [_CountingRect(container, size=(40, 30), pos=(10 + 50 * i, 10), color="red", procedural=bool(i))
+             for i in range(2)]
+    try:
+        _paint(zone)
+        for rect in rects:
+            rect.draws = 0
+            rect.set_color("blue")
+        _paint(zone)
+        for rect in rects:
+            assert rect.draws >= 1, (rect, rect.surface)
+            assert container.surface.get_at(rect.rect.center) == (0, 0, 255), rect
+    finally:
+        container.kill()
+
+
+def check_occlusion_pixels(zone):
+    """The occlusion culling draws the same pixels as when it is disabled, even when it stops early"""
+
+    containers = []
+    for i, max_uncovered in enumerate((Container.MAX_UNCOVERED, 2, -1)):  # -1 : no culling at all
+        rnd = random.Random(0)
+        container = Zone(zone, size=(120, 80), pos=(10 + 130 * i, 300), background_color=(150, 150, 150))
+        container.MAX_UNCOVERED = max_uncovered
+        for _ in range(30):
+            alpha = rnd.choice((255, 255, 120))
+            Rectangle(container, size=(rnd.randint(5, 50), rnd.randint(5, 50)),
+                      pos=(rnd.randrange(-10, 110), rnd.randrange(-10, 70)),
+                      color=(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256), alpha),
+                      border_width=rnd.choice((0, 0, 2)), border_color=(0, 0, 0, alpha))
+        containers.append(container)
+    try:
+        _paint(zone)
+        for step in range(3):
+            pixels = {pygame.image.tostring(container.surface, "RGBA") for container in containers}
+            assert len(pixels) == 1, step
+            for container in containers:
+                rnd = random.Random(step)
+                for child in list(container.default_layer)[::3]:
+                    child.move(rnd.randint(-5, 5), rnd.randint(-5, 5))
+            _paint(zone)
+    finally:
+        for container in containers:
+            container.kill()
+
+
+def check_occluded_child(zone):
+    """A child fully covered by an opaque sibling is not drawn, a child behind a translucent one is"""
+
+    container = Zone(zone, size=(120, 80), pos=(10, 300), background_color=(150, 150, 150))
+    behind = [_CountingRect(container, size=(20, 20), pos=(10 + 50 * i, 10), color="red") for i in range(2)]
+    Rectangle(container, size=(40, 40), pos=(0, 0), color="blue")
+    Rectangle(container, size=(40, 40), pos=(50, 0), color=(0, 0, 255, 100))
+    try:
+        _paint(zone)
+        for rect in behind:
+            rect.draws = 0
+            rect.set_color("green")
+        _paint(zone)
+        assert behind[0].draws == 0 and behind[1].draws >= 1, [rect.draws for rect in behind]
+        assert container.surface.get_at(behind[0].rect.center) == (0, 0, 255)
+    finally:
+        container.kill()
+
+
 class UT_Paintable_Zone(Zone):
     def __init__(self, *args, **kwargs):
         Zone.__init__(self, *args, **kwargs)
@@ -45,6 +165,20 @@ class UT_Paintable_Zone(Zone):
                 "if dirty was 0, paint() is called at next frame rendering, then dirty will be set to 0 again",
             ]
         )
+        self.parent.add_checks(
+            title="Widget._paint_procedurally()",
+            checks=[
+                check_procedural_pixels,
+                check_paint_hook,
+            ]
+        )
+        self.parent.add_checks(
+            title="Occlusion culling",
+            checks=[
+                check_occlusion_pixels,
+                check_occluded_child,
+            ]
+        )
 
 
 # For the PresentationScene import
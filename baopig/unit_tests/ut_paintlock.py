@@ -0,0 +1,106 @@
+from baopig import *
+from baopig.lib.utilities import PaintLock
+import threading
+import time  # after baopig, who has its own time package
+
+
+def _hold(lock, started, stop, duration=None, yielding=False):
+    """Target of a thread who holds the lock until stop is set, or for duration seconds"""
+
+    with lock:
+        started.set()
+        end = None if duration is None else time.perf_counter() + duration
+        while not stop.is_set() and (end is None or time.perf_counter() < end):
+            if yielding:
+                lock.yield_to_waiters()
+            time.sleep(.001)
+
+
+def check_release_by_other_thread(zone):
+    """Only the owner can release the lock, a wrong release doesn't change the reentrance level"""
+
+    lock = PaintLock()
+    errors = []
+
+    def release():
+        try:
+            lock.release()
+        except RuntimeError as e:
+            errors.append(e)
+
+    with lock:
+        with lock:
+            thread = threading.Thread(target=release)
+            thread.start()
+            thread.join()
+            assert len(errors) == 1, errors
+        assert lock._depth == 1, lock._depth
+    assert lock._depth == 0 and lock.acquire(blocking=False)
+    lock.release()
+
+
+def check_contention_stats(zone):
+    """A thread who waits for the lock counts a contention, with its waiting time"""
+
+    lock = PaintLock()
+    started, stop = threading.Event(), threading.Event()
+    thread = threading.Thread(target=_hold, args=(lock, started, stop, .03), name="Holder")
+    thread.start()
+    started.wait()
+    with lock:
+        with lock:  # reentrant, not counted
+            pass
+    thread.join()
+    stats = lock.get_stats()[threading.current_thread().name]
+    assert stats["acquisitions"] == 1 and stats["contentions"] == 1, stats
+    assert .01 < stats["wait"] == stats["max_wait"], stats
+    assert lock.get_stats()["Holder"]["contentions"] == 0
+
+
+def check_yield_to_waiters(zone):
+    """A thread holding the lock for a long time lets the waiting threads take it with yield_to_waiters()"""
+
+    lock = PaintLock()
+    started, stop = threading.Event(), threading.Event()
+    thread = threading.Thread(target=_hold, args=(lock, started, stop, 2, True))
+    thread.start()
+    started.wait()
+    start = time.perf_counter()
+    with lock:
+        wait = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    assert wait < .5, wait
+
+    with lock:
+        with lock:
+            lock.yield_to_waiters()  # reentrant : nothing to do
+        assert lock._depth == 1
+
+
+class UT_PaintLock_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The PaintLock is checked automatically with a few threads,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="PaintLock",
+            checks=[
+                check_release_by_other_thread,
+                check_contention_stats,
+                check_yield_to_waiters,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_PaintLock_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
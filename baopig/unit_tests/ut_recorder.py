@@ -0,0 +1,110 @@
+import os
+import tempfile
+from baopig import *
+from baopig.threads.recorder import DeltaReader, DeltaRecorder, FrameRecorder
+from baopig.time.utilities import clock
+
+
+def _colored_surfaces(count, size=(40, 30)):
+    """count surfaces of different colors, with a small square moving on them"""
+
+    surfaces = []
+    for i in range(count):
+        surface = pygame.Surface(size)
+        surface.fill((40 * i % 256, 100, 200))
+        surface.fill((255, 255, 255), (3 * i, 2 * i, 5, 5))
+        surfaces.append(surface)
+    return surfaces
+
+
+def check_frame_recorder(zone):
+    """A FrameRecorder saves every captured frame as record_XXX.png, the queued frames are saved after stop()"""
+
+    surfaces = _colored_surfaces(5)
+    with tempfile.TemporaryDirectory() as directory:
+        directory += os.sep
+        recorder = FrameRecorder(directory, max_workers=2, first_index=7)
+        assert not recorder.capture(surfaces[0])  # not recording yet
+        recorder.start()
+        try:
+            for surface in surfaces:
+                assert recorder.capture(surface)
+        finally:
+            recorder.stop(wait=True)
+        assert not recorder.capture(surfaces[0])  # not recording anymore
+
+        assert recorder.captured_frames == recorder.encoded_frames == 5, recorder.encoded_frames
+        assert recorder.dropped_frames == recorder.failed_frames == 0
+        assert recorder.next_index == 12
+        assert sorted(os.listdir(directory)) == [f"record_{index:0>3}.png" for index in range(7, 12)]
+        for index, surface in enumerate(surfaces, start=7):
+            saved = pygame.image.load(directory + f"record_{index:0>3}.png")
+            assert pygame.image.tobytes(saved, "RGB") == pygame.image.tobytes(surface, "RGB"), index
+
+
+def check_delta_round_trip(zone):
+    """A DeltaReader rebuilds the frames captured by a DeltaRecorder, at the times of the application clock"""
+
+    surface = pygame.Surface((40, 30))
+    surface.fill((0, 100, 200))
+    expected = []  # the frames, as stored
+    expected_times = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "record.bpd")
+        recorder = DeltaRecorder(path, keyframe_interval=3)
+        recorder.start()
+        try:
+            for i in range(10):
+                if i == 6:  # a new size makes a keyframe
+                    surface = pygame.Surface((50, 20))
+                    surface.fill((255, 0, 0))
+                rect = pygame.Rect(4 * i, 2 * i, 6, 6)
+                surface.fill((25 * i, 255 - 25 * i, 0), rect)
+                assert recorder.capture(surface, [rect, (-5, -5, 3, 3)])  # a rect out of the surface is ignored
+                expected.append(pygame.image.tobytes(surface, "RGB"))
+                expected_times.append(clock.get_time())
+                assert recorder.capture(surface, ())  # nothing changed, nothing stored
+                if clock.is_virtual:
+                    clock.advance(.25)
+        finally:
+            recorder.stop(wait=True)
+        assert recorder.captured_frames == recorder.next_index == 10 and recorder.dropped_frames == 0
+
+        reader = DeltaReader(path)
+        assert len(reader) == 10
+        if clock.is_virtual:  # headless application
+            expected_times = [expected_time - expected_times[0] for expected_time in expected_times]
+            assert all(abs(a - b) < 1e-6 for a, b in zip(reader.times, expected_times)), reader.times
+        assert list(reader.times) == sorted(reader.times), reader.times
+        for index, (frame_time, frame) in enumerate(reader):
+            assert frame_time == reader.times[index]
+            assert pygame.image.tobytes(frame, "RGB") == expected[index], index
+        for index in 9, 4, 0, 7:  # random access
+            assert pygame.image.tobytes(reader.get_frame(index), "RGB") == expected[index], index
+
+
+class UT_Recorder_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The recorders are checked automatically with small surfaces,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="Recorders",
+            checks=[
+                check_frame_recorder,
+                check_delta_round_trip,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_Recorder_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
@@ -3,6 +3,100 @@
 from baopig import *
 
 
+def _is_up_to_date(container):
+    """Paint the dirty containers, and compare the pixels of container with a full repaint"""
+
+    with paint_lock:
+        container.scene._paint_dirty_containers()
+        painted = pygame.image.tostring(container.surface, "RGBA")
+        container._container_refresh(recursive=True, only_containers=False)
+        return painted == pygame.image.tostring(container.surface, "RGBA")
+
+
+def check_scroll_pixels(zone):
+    """After a scroll, the shifted pixels of a ScrollView match a full repaint"""
+
+    view = ScrollView(zone, size=(200, 150), pos=(10, 320), background_color=(40, 40, 90))
+    content = Zone(view, size=(400, 1000), background_color=(200, 200, 200))
+    for i in range(40):
+        Rectangle(content, size=(50, 8), pos=(i % 5 * 70, i * 25), color=(i * 6, 100, 100))
+    try:
+        assert _is_up_to_date(view)
+        for val in (13, 40, 41, 200, 150, 0):
+            view.y_scroller.set_val(min(val, view.y_scroller.maxval))
+            view.x_scroller.set_val(min(val // 2, view.x_scroller.maxval))
+            assert _is_up_to_date(view), val
+    finally:
+        view.kill()
+
+
+def check_scroll_moves_sibling(zone):
+    """A widget moved by the motion of the scrolled widget is painted at its new position"""
+
+    view = ScrollView(zone, size=(200, 150), pos=(10, 320), background_color=(40, 40, 90))
+    content = Zone(view, size=(400, 1000), background_color=(200, 200, 200))
+    Layer(view, name="over", level=LayersManager.FOREGROUND)
+    label = Rectangle(view, layer="over", size=(40, 20), pos=(100, 10), color="red")
+    content.signal.MOTION.connect(lambda: label.move(3, 0), owner=None)
+    try:
+        assert _is_up_to_date(view)
+        for val in (13, 26, 80):
+            view.y_scroller.set_val(val)
+            assert _is_up_to_date(view), val
+    finally:
+        view.kill()
+
+
+def _shown_rows(view):
+    """The visible rows of a VirtualListView, as {index: text}"""
+
+    return {index: row.text for index, row in view._rows.items() if row.is_visible}
+
+
+def check_virtual_rows(zone):
+    """A VirtualListView only creates the rows near the viewport, and recycles them while scrolling"""
+
+    view = VirtualListView(zone, source=range(100000), size=(200, 100), pos=(10, 320), row_height=20, overscan=2)
+    content = view.main_widget
+    try:
+        assert view.y_scroller.maxval == 100000 * 20 - content.rect.h
+        assert _shown_rows(view) == {index: str(index) for index in range(0, 8)}, _shown_rows(view)
+        max_rows = 100 // 20 + 1 + 2 * 2 + 1
+        for index in (3, 5000, 4999, 70000, 99999, 0):
+            view.scroll_to(index)
+            first = min(index, 100000 - 100 // 20)
+            row = view.get_row(first)
+            assert row is not None and row.text == str(first) and row.rect.top == 0, (index, row)
+            assert view.get_row(first - 10) is None
+            assert len(content.children) <= max_rows, len(content.children)
+            for shown_index, text in _shown_rows(view).items():
+                assert text == str(shown_index)
+                assert view.get_row(shown_index).rect.top == (shown_index - first) * 20
+            assert _is_up_to_date(view), index
+    finally:
+        view.kill()
+
+
+def check_virtual_source(zone):
+    """A VirtualListView follows a new or modified source after refresh()"""
+
+    items = ["a", "b", "c"]
+    view = VirtualListView(zone, source=range(1000), size=(200, 100), pos=(10, 320), row_height=20)
+    try:
+        view.scroll_to(500)
+        view.set_source(items)
+        assert view.y_scroller.maxval == 0 and view.get_row(500) is None
+        assert _shown_rows(view) == {0: "a", 1: "b", 2: "c"}, _shown_rows(view)
+
+        items[1] = "B"
+        items.append("d")
+        view.refresh()
+        assert _shown_rows(view) == {0: "a", 1: "B", 2: "c", 3: "d"}, _shown_rows(view)
+        assert _is_up_to_date(view)
+    finally:
+        view.kill()
+
+
 class UT_Scrollable_Zone(Zone):
     def __init__(self, *args, **kwargs):
         Zone.__init__(self, *args, padding=10, spacing=10, **kwargs)
@@ -15,6 +109,22 @@ class UT_Scrollable_Zone(Zone):
 
         self.pack()
 
+    def load_sections(self):
+        self.parent.add_checks(
+            title="ScrollView",
+            checks=[
+                check_scroll_pixels,
+                check_scroll_moves_sibling,
+            ]
+        )
+        self.parent.add_checks(
+            title="VirtualListView",
+            checks=[
+                check_virtual_rows,
+                check_virtual_source,
+            ]
+        )
+
 
 # For the PresentationScene import
 ut_zone_class = UT_Scrollable_Zone
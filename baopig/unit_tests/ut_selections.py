@@ -36,6 +36,21 @@ class SelectorZone(Zone, Selector):
         Selector.__init__(self, parent, can_select)
 
 
+def check_selection_follows_parent(zone):
+    """A selection started before a movement of the Selector's parent keeps its start on the Selector"""
+
+    holder = Zone(zone, size=(200, 150), pos=(10, 300))
+    selector = SelectorZone(holder, size=(150, 100), pos=(10, 10))
+    try:
+        selector.start_selection((selector.abs_rect.left + 10, selector.abs_rect.top + 10))
+        holder.move(20, 5)
+        selector.end_selection((selector.abs_rect.left + 60, selector.abs_rect.top + 40))
+        assert tuple(selector.selection_rect.rect) == (10, 10, 51, 31), selector.selection_rect.rect
+        assert selector.selection_rect.abs_start == (selector.abs_rect.left + 10, selector.abs_rect.top + 10)
+    finally:
+        holder.kill()
+
+
 class UT_Selections_Zone(SelectorZone):
 
     def __init__(self, *args, **kwargs):
@@ -116,6 +131,12 @@ class UT_Selections_Zone(SelectorZone):
                 "The middle zone's selection rect is red",
             ]
         )
+        self.parent.add_checks(
+            title="SelectionRect",
+            checks=[
+                check_selection_follows_parent,
+            ]
+        )
 
 
 # For the PresentationScene import
@@ -0,0 +1,143 @@
+import gc
+from baopig import *
+
+
+class _Receiver(Communicative):
+
+    def __init__(self, log):
+
+        Communicative.__init__(self)
+        self.create_signal("PING")
+        self.log = log
+
+    def handle(self):
+        self.log.append("handle")
+
+    def handle_value(self, value):
+        self.log.append(value)
+
+
+def check_connect(zone):
+    """The commands are executed in the order of connection, with the arguments they need"""
+
+    log = []
+    emitter = _Receiver(log)
+    emitter.signal.PING.connect(emitter.handle_value, owner=emitter)
+    emitter.signal.PING.connect(emitter.handle, owner=emitter)
+    emitter.signal.PING.connect(lambda: log.append("lambda"), owner=None)
+    emitter.signal.PING.emit(7)
+    assert log == [7, "handle", "lambda"], log
+
+    command = emitter.handle
+    emitter.signal.PING.connect(command, owner=None)
+    try:
+        emitter.signal.PING.connect(command, owner=None)
+    except PermissionError:
+        pass
+    else:
+        raise AssertionError("The same command was connected twice")
+
+
+def check_disconnect(zone):
+    """A command is disconnected by an equal command, and the owner's death kills its connections"""
+
+    log = []
+    emitter = _Receiver(log)
+    owner = _Receiver(log)
+    emitter.signal.PING.connect(owner.handle, owner=owner)
+    emitter.signal.PING.connect(owner.handle_value, owner=owner)
+    emitter.signal.PING.disconnect(owner.handle)  # a new, equal bound method
+    emitter.signal.PING.emit(1)
+    assert log == [1], log
+    try:
+        emitter.signal.PING.disconnect(owner.handle)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("A command was disconnected twice")
+
+    owner.disconnect()  # like when the owner is killed
+    emitter.signal.PING.emit(2)
+    assert log == [1], log
+    assert not owner._connections
+
+
+def check_kill_during_emit(zone):
+    """A command can kill its own connection or the next ones during the emission"""
+
+    log = []
+    emitter = _Receiver(log)
+    signal = emitter.signal.PING
+
+    def first():
+        log.append("first")
+        signal.disconnect(first)
+        signal.disconnect(third)
+
+    def second():
+        log.append("second")
+
+    def third():
+        log.append("third")
+
+    def fourth():
+        log.append("fourth")
+        signal.disconnect(fourth)
+        signal.connect(fifth, owner=None)
+
+    def fifth():
+        log.append("fifth")
+
+    for command in (first, second, third, fourth):
+        signal.connect(command, owner=None)
+    signal.emit()
+    assert log == ["first", "second", "fourth"], log  # fifth is connected during the emission
+    log.clear()
+    signal.emit()
+    assert log == ["second", "fifth"], log
+
+
+def check_weak_connection(zone):
+    """A weak connection doesn't keep the object of its method alive, and dies with it"""
+
+    log = []
+    emitter = _Receiver(log)
+    receiver = _Receiver(log)
+    emitter.signal.PING.connect(receiver.handle_value, owner=None, weak=True)
+    emitter.signal.PING.emit(3)
+    assert log == [3], log
+
+    del receiver
+    gc.collect()
+    emitter.signal.PING.emit(4)
+    assert log == [3], log
+    assert not emitter.signal.PING._connections
+
+
+class UT_Signal_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The signals are checked automatically,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="Signal",
+            checks=[
+                check_connect,
+                check_disconnect,
+                check_kill_during_emit,
+                check_weak_connection,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_Signal_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
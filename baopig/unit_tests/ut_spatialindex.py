@@ -0,0 +1,112 @@
+import random
+from baopig import *
+
+
+def _compare(layer, rnd):
+    """The indexed layer finds the same widgets as a walk through its children"""
+
+    widgets = list(layer)
+    for _ in range(30):
+        rect = pygame.Rect(rnd.randrange(-10, 300), rnd.randrange(-10, 200), rnd.randint(1, 60), rnd.randint(1, 60))
+        expected = [widget for widget in widgets if widget.is_visible and widget.hitbox.colliderect(rect)]
+        assert layer.get_visible_colliding(rect) == expected, rect
+
+        pos = rnd.randrange(300), rnd.randrange(200)
+        expected = None
+        for widget in reversed(widgets):
+            if widget.is_visible and widget.hitbox.collidepoint(pos):
+                expected = widget
+                break
+        assert layer.get_topmost_at(pos) is expected, pos
+
+
+def check_index_follows_layout(zone):
+    """The spatial index follows the moves, resizes, hides, windows, sleeps and overlay changes"""
+
+    container = Zone(zone, size=(300, 200), pos=(10, 300), background_color=(200, 200, 200))
+    layer = Layer(container, indexed=True)
+    rnd = random.Random(0)
+    rects = [Rectangle(container, layer=layer, size=(rnd.randint(4, 90), rnd.randint(4, 90)),
+                       pos=(rnd.randrange(280), rnd.randrange(180)), color="red") for _ in range(40)]
+    try:
+        assert layer.is_indexed
+        _compare(layer, rnd)
+
+        # The hitbox leaves the cells where it was indexed, without MOTION nor RESIZE
+        windowed = Rectangle(container, layer=layer, size=(200, 150), pos=(0, 0), color="blue")
+        windowed.set_window((0, 0, 10, 10), follow_movements=False)
+        windowed.move(1, 1)
+        windowed.set_window((150, 100, 20, 20), follow_movements=False)
+        _compare(layer, rnd)
+        assert layer.get_topmost_at((160, 110)) is windowed
+
+        for i in range(40):
+            rect = rnd.choice([rect for rect in rects if rect.is_awake])
+            action = i % 6
+            if action == 0:
+                rect.move(rnd.randint(-30, 30), rnd.randint(-30, 30))
+            elif action == 1:
+                rect.resize(rnd.randint(4, 90), rnd.randint(4, 90))
+            elif action == 2:
+                rect.hide() if rect.is_visible else rect.show()
+            elif action == 3:
+                # The hitbox changes without MOTION nor RESIZE
+                rect.set_window((rect.rect.left + 5, rect.rect.top + 5, 20, 20), follow_movements=rnd.random() < .5)
+            elif action == 4:
+                rect.sleep()
+                rnd.choice([rect for rect in rects if rect.is_asleep]).wake()
+            else:
+                layer.overlay(rnd.randrange(len(layer)), rect)
+            _compare(layer, rnd)
+    finally:
+        container.kill()
+
+
+def check_auto_index(zone):
+    """A layer builds its index when it reaches INDEX_THRESHOLD children, unless it chose"""
+
+    container = Zone(zone, size=(300, 200), pos=(10, 300))
+    auto = Layer(container)
+    never = Layer(container, indexed=False)
+    rnd = random.Random(1)
+    try:
+        for i in range(Layer.INDEX_THRESHOLD):
+            assert not auto.is_indexed
+            for layer in auto, never:
+                Rectangle(container, layer=layer, size=(5, 5), pos=(rnd.randrange(290), rnd.randrange(190)))
+        assert auto.is_indexed and not never.is_indexed
+        _compare(auto, rnd)
+
+        auto.set_indexed(False)
+        never.set_indexed(True)
+        assert not auto.is_indexed and never.is_indexed
+        _compare(never, rnd)
+    finally:
+        container.kill()
+
+
+class UT_SpatialIndex_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The spatial index of the layers is compared with a walk through their children,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="SpatialIndex",
+            checks=[
+                check_index_follows_layout,
+                check_auto_index,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_SpatialIndex_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+from baopig import *
+from baopig.documentation import ApplicationExit
+import time  # after baopig, who has its own time package
+
+
+class _SteppingApp:
+    """Receives the batches of a replay, like a launched headless Application"""
+
+    is_headless = True
+
+    def __init__(self, size, exit_at=None):
+        self.size = size
+        self.steps = []
+        self._exit_at = exit_at
+
+    def step(self, events=(), dt=0):
+        self.steps.append((events, dt))
+        if len(self.steps) == self._exit_at:
+            raise ApplicationExit
+
+
+def _record(path, batches):
+    """Write the batches in a trace, return the recorder"""
+
+    recorder = TraceRecorder(path, size=(400, 300), ignored_types=(pygame.USEREVENT,))
+    recorder.start()
+    try:
+        for events in batches:
+            recorder.record(events)
+            time.sleep(.002)
+    finally:
+        recorder.stop()
+    return recorder
+
+
+def check_trace_round_trip(zone):
+    """A TraceReplayer reads back the events written by a TraceRecorder, with their attributes and order"""
+
+    batches = [
+        [pygame.event.Event(pygame.MOUSEMOTION, pos=(52, 40), rel=(3, 1), buttons=(0, 0, 0), touch=False)],
+        [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(52, 40), button=1, window=object()),
+         pygame.event.Event(pygame.USEREVENT)],  # an ignored type
+        [pygame.event.Event(pygame.USEREVENT)],  # nothing left to record
+        [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, mod=0, unicode="a", scancode=4),
+         pygame.event.Event(pygame.KEYUP, key=pygame.K_a, mod=0, unicode="a", scancode=4)],
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "inputs.jsonl.gz")
+        recorder = _record(path, batches)
+        assert recorder.recorded_batches == 3 and recorder.recorded_events == 4
+        assert not recorder.is_recording
+
+        replayer = TraceReplayer(path)
+        assert len(replayer) == 3 and replayer.size == (400, 300)
+        replayed = list(replayer.get_batches())
+    times = [batch_time for batch_time, events in replayed]
+    assert times == sorted(times), times
+
+    expected = [batches[0], batches[1][:1], batches[3]]
+    for (batch_time, events), expected_events in zip(replayed, expected):
+        assert [event.type for event in events] == [event.type for event in expected_events]
+        for event, expected_event in zip(events, expected_events):
+            expected_dict = {key: value for key, value in expected_event.dict.items() if key != "window"}
+            assert event.dict == expected_dict, (event.dict, expected_dict)
+
+
+def check_trace_replay(zone):
+    """A replay steps the application once per batch, with the recorded delays, and stops at an exit"""
+
+    batches = [[pygame.event.Event(pygame.MOUSEMOTION, pos=(i, i), rel=(1, 1), buttons=(0, 0, 0))] for i in range(5)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "inputs.jsonl.gz")
+        _record(path, batches)
+        replayer = TraceReplayer(path)
+
+        app = _SteppingApp(size=(400, 300))
+        stats = replayer.replay(app)
+        assert stats["frames"] == len(app.steps) == 5 and stats["events"] == 5, stats
+        assert stats["p50"] <= stats["p90"] <= stats["p99"] <= stats["max"], stats
+        times = [batch_time for batch_time, events in replayer.get_batches()]
+        for (events, dt), previous_time, batch_time in zip(app.steps, [0] + times, times):
+            assert abs(dt - (batch_time - previous_time)) < 1e-9, (dt, batch_time, previous_time)
+            assert events[0].type == pygame.MOUSEMOTION
+
+        app = _SteppingApp(size=(400, 300), exit_at=2)
+        stats = replayer.replay(app)
+        assert stats["frames"] == len(app.steps) == 2, stats
+
+        app.is_headless = False
+        try:
+            replayer.replay(app)
+            assert False, "A trace cannot be replayed with a window"
+        except PermissionError:
+            pass
+
+
+class UT_Trace_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The input traces are recorded and replayed automatically,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="Input traces",
+            checks=[
+                check_trace_round_trip,
+                check_trace_replay,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_Trace_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
@@ -0,0 +1,93 @@
+from baopig import *
+
+
+def check_release_acquire(zone):
+    """The lines killed by Text.set_text() are released, then given back to the next lines"""
+
+    text = Text(zone, "a\nb\nc\nd", pos=(10, 60))
+    old_lines = list(text.lines)
+    pool = type(old_lines[0]).widget_pool
+    stats = pool.get_stats()
+
+    text.set_text("e")
+    assert pool.get_stats()["releases"] - stats["releases"] == 4, pool.get_stats()
+    assert len(text.lines) == 1 and text.lines[0] in old_lines
+    released = [line for line in old_lines if line not in text.lines]
+    for line in released:
+        assert line.is_dead and line.is_asleep and line not in text.children
+
+    text.set_text("f\ng\nh")
+    assert pool.get_stats()["hits"] - stats["hits"] >= 3, pool.get_stats()
+    assert [line.text for line in text.lines] == ["f", "g", "h"], [line.text for line in text.lines]
+    for line in text.lines:
+        assert line.is_alive and line.is_awake and line.parent is text
+    text.kill()
+
+
+def check_kill_twice(zone):
+    """Killing a released widget again does nothing"""
+
+    text = Text(zone, "a\nb", pos=(10, 60))
+    line = text.lines[-1]
+    pool = type(line).widget_pool
+    size = len(pool)
+    line.kill()
+    assert line.is_dead and len(pool) == size + 1
+    line.kill()
+    assert len(pool) == size + 1
+
+    text.set_text("c\nd\ne")  # wakes the released line up
+    assert [line.text for line in text.lines] == ["c", "d", "e"]
+    text.kill()
+
+
+def check_parent_kill(zone):
+    """The released widgets die with their parent, and a disabled pool keeps nothing"""
+
+    text = Text(zone, "a\nb\nc", pos=(10, 60))
+    lines = list(text.lines)
+    pool = type(lines[0]).widget_pool
+    size = len(pool)
+    text.set_text("d")
+    assert len(pool) > size
+    text.kill()
+    assert len(pool) == size, pool.get_stats()
+    for line in lines:
+        assert line.is_dead
+
+    pool.set_enabled(False)
+    try:
+        text = Text(zone, "a\nb\nc", pos=(10, 60))
+        text.set_text("d")
+        assert len(pool) == 0, pool.get_stats()
+        text.kill()
+    finally:
+        pool.set_enabled(True)
+
+
+class UT_WidgetPool_Zone(Zone):
+    def __init__(self, *args, **kwargs):
+        Zone.__init__(self, *args, **kwargs)
+
+        Text(self, text="The WidgetPool is checked automatically with the lines of a Text,\n"
+                        "see the results on the left", pos=(10, 10))
+
+    def load_sections(self):
+        self.parent.add_checks(
+            title="WidgetPool",
+            checks=[
+                check_release_acquire,
+                check_kill_twice,
+                check_parent_kill,
+            ]
+        )
+
+
+# For the PresentationScene import
+ut_zone_class = UT_WidgetPool_Zone
+
+if __name__ == "__main__":
+    from baopig.prefabs.testerscene import TesterScene
+    app = Application()
+    TesterScene(app, ut_zone_class)
+    app.launch()
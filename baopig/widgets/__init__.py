@@ -1,4 +1,6 @@
 from .scrollview import ScrollView
+from .virtuallistview import VirtualListView
+from .datagrid import DataGrid, DataGridCell
 from .text import DynamicText, Text
 from .textedit import TextEdit
 from .lineedit import LineEdit
@@ -7,7 +7,7 @@ from .text import Text
 
 class AButton_DisableSail(Rectangle):
     STYLE = Rectangle.STYLE.substyle()
-    STYLE.modify(width="100%", height="100%", color=(255, 255, 255, 128))
+    STYLE.modify(width="100%", height="100%", color=(255, 255, 255, 128), procedural=True)
 
     def __init__(self, abutton):
         Rectangle.__init__(self, abutton, visible=False, layer=abutton.above_content)
@@ -15,7 +15,8 @@ class AButton_DisableSail(Rectangle):
 
 class AButton_FocusSail(Rectangle):
     STYLE = Rectangle.STYLE.substyle()
-    STYLE.modify(width="100%", height="100%", color=(0, 0, 0, 0), border_color="theme-color-border", border_width=1)
+    STYLE.modify(width="100%", height="100%", color=(0, 0, 0, 0), border_color="theme-color-border", border_width=1,
+                 procedural=True)
 
     def __init__(self, abutton):
         Rectangle.__init__(self, abutton, visible=False, layer=abutton.behind_content)
@@ -23,7 +24,7 @@ class AButton_FocusSail(Rectangle):
 
 class AButton_HoverSail(Rectangle):
     STYLE = Rectangle.STYLE.substyle()
-    STYLE.modify(width="100%", height="100%")
+    STYLE.modify(width="100%", height="100%", procedural=True)
     STYLE.create(alpha=63)
 
     def __init__(self, abutton):
@@ -33,7 +34,7 @@ class AButton_HoverSail(Rectangle):
 
 class AButton_LinkSail(Rectangle):
     STYLE = Rectangle.STYLE.substyle()
-    STYLE.modify(width="100%", height="100%")
+    STYLE.modify(width="100%", height="100%", procedural=True)
     STYLE.create(alpha=63)
 
     def __init__(self, abutton):
@@ -125,6 +126,8 @@ class AbstractButton(Container, Focusable, Validable):
             self._flip_without_update()
             if hidden:
                 self.hide()
+            if self.hover_sail.is_procedural:
+                self.hover_sail.set_procedural(False)  # the sail needs its own pixels to be masked
             self.hover_sail.surface.blit(self.surface, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
 
         self.signal.KILL.connect(self.handle_kill, owner=None)
@@ -0,0 +1,492 @@
+import bisect
+import functools
+from baopig.font.font import Font
+from baopig.lib import Widget, Zone, Color, paint_lock
+from .button import Button
+from .scrollview import ScrollView
+
+
+def _argsort(column, reverse=False):
+    """Return the indexes who sort the column, in a stable way"""
+
+    try:
+        import numpy
+    except ImportError:
+        return sorted(range(len(column)), key=column.__getitem__, reverse=reverse)
+
+    values = numpy.asarray(column)
+    if reverse:
+        # Stable too : the equal values keep their order
+        return len(values) - 1 - numpy.argsort(values[::-1], kind="stable")[::-1]
+    return numpy.argsort(values, kind="stable")
+
+
+class DataGridCell(Widget):
+    """
+    A DataGridCell is the default cell of a DataGrid : one line of text, cut at the size of the cell
+
+    Unlike a Text, it isn't selectable and has no child, the text is drawn on its own
+    surface, so a cell is cheap to create and to recycle
+    """
+
+    STYLE = Widget.STYLE.substyle()
+    STYLE.modify(
+        width=100,
+        height=20,
+    )
+    STYLE.create(
+        font_file=None,
+        font_height=15,
+        font_color="theme-color-font",
+        font_bold=False,
+        font_italic=False,
+        font_underline=False,
+        text_padding=4,
+    )
+    STYLE.set_type("font_height", int)
+    STYLE.set_type("font_color", Color)
+    STYLE.set_type("font_bold", bool)
+    STYLE.set_type("font_italic", bool)
+    STYLE.set_type("font_underline", bool)
+    STYLE.set_type("text_padding", int)
+
+    def __init__(self, parent, text="", **kwargs):
+
+        Widget.__init__(self, parent, **kwargs)
+
+        self._text = text
+        self._font = Font(self)
+        self._text_padding = self.style["text_padding"]
+
+        self.send_paint_request()
+
+    font = property(lambda self: self._font)
+    text = property(lambda self: self._text)
+
+    def paint(self):
+
+        self.surface.fill((0, 0, 0, 0))
+        if self._text:
+            rendering = self._font.render(self._text)
+            self.surface.blit(rendering, (self._text_padding, (self.rect.h - rendering.get_height()) // 2))
+
+    def set_text(self, text):
+
+        if text == self._text:
+            return
+        self._text = text
+        self.send_paint_request()
+
+
+def _create_cell(parent):
+    return DataGridCell(parent)
+
+
+def _bind_cell(cell, row, col, value):
+    cell.set_text(str(value))
+
+
+class _DataGridRow(Zone):
+    """A _DataGridRow is a line of the body of a DataGrid, it contains the cells of the visible columns"""
+
+    def __init__(self, body, **kwargs):
+
+        Zone.__init__(self, body, **kwargs)
+
+        self.cells = {}  # col -> cell
+        self.free_cells = []  # hidden cells, ready to be recycled
+
+
+class DataGrid(ScrollView):
+    """
+    A DataGrid is a ScrollView showing a table, stored column by column
+
+    Each column is a sequence, like a list or a numpy array, and every column has the
+    same length. Only the visible columns of the rows inside the viewport, plus a few rows
+    around it (see the 'overscan' style attribute), exist as widgets. When the grid
+    scrolls, the rows and cells leaving the viewport are recycled for the ones entering it.
+
+    A cell is created by cell_factory(parent), then receives a value through
+    bind_cell(cell, row, col, value), where row is the index of the value in its column.
+    The grid resizes its cells to the width of their column and the row height, so a cell
+    must be resizable. By default, a cell is a DataGridCell showing str(value).
+
+    A column has a fixed width, or a width measured from its header and a sample of its
+    values (see the 'col_width' and 'measured_rows' style attributes, and set_col_width())
+
+    A click on a header sorts the rows by this column, a second click reverses the order.
+    The sort uses numpy.argsort() when numpy is installed
+
+    Example :
+
+        DataGrid(scene, columns={"id": numpy.arange(50000), "price": prices}, size=(600, 400))
+
+        DataGrid(scene, columns=(names, ages), headers=("Name", "Age"), col_widths=(None, 40))
+
+    When the values of the columns change, refresh() updates the cells
+
+    The DataGrid doesn't place its rows with a GridLayer : a GridLayer stores a slot for each
+    cell and a Row object for each row of the grid, and pins each widget to its cell with a
+    locked position, re-packed by GridLayer.move(). Here, most rows don't exist as widgets,
+    and the existing ones change their display index at each scroll, so the DataGrid places
+    them itself, at display_index * row_height
+    """
+
+    STYLE = ScrollView.STYLE.substyle()
+    STYLE.create(
+        row_height=20,
+        header_height=25,
+        col_width=100,  # None -> measured
+        measured_rows=100,  # maximum number of values read to measure a column
+        overscan=2,  # number of extra rows above and below the viewport
+        sortable=True,
+    )
+    STYLE.set_type("sortable", bool)
+    STYLE.set_constraint("row_height", lambda val: isinstance(val, int) and val > 0, "must be a positive integer")
+    STYLE.set_constraint("header_height", lambda val: isinstance(val, int) and val >= 0, "must be a positive integer")
+    STYLE.set_constraint("col_width", lambda val: val is None or (isinstance(val, int) and val > 0),
+                         "must be None or a positive integer")
+    STYLE.set_constraint("measured_rows", lambda val: isinstance(val, int) and val > 0, "must be a positive integer")
+    STYLE.set_constraint("overscan", lambda val: isinstance(val, int) and val >= 0, "must be a positive integer")
+
+    def __init__(self, parent, columns, headers=None, col_widths=None, cell_factory=None, bind_cell=None, **kwargs):
+
+        # Needed by _handle_mainwidget_resize(), called during the construction
+        self._columns = ()
+        self._col_titles = ()
+        self._nbrows = 0
+        self._col_lefts = [0]  # the left of each column, and the right of the last one
+        self._visible_cols = range(0)
+        self._scroll_x = self._scroll_y = 0
+        self._order = None  # display index -> row index, None when the rows are not sorted
+        self._rows = {}  # display index -> _DataGridRow
+        self._free_rows = []  # hidden rows, ready to be recycled
+        self._headers = {}  # col -> header button
+        self._free_headers = []
+        self._header_zone = self._body_zone = None
+
+        ScrollView.__init__(self, parent, **kwargs)
+
+        self._cell_factory = _create_cell if cell_factory is None else cell_factory
+        self._bind_cell = _bind_cell if bind_cell is None else bind_cell
+        self._row_height = self.style["row_height"]
+        self._header_height = self.style["header_height"]
+        self._measured_rows = self.style["measured_rows"]
+        self._overscan = self.style["overscan"]
+        self._is_sortable = self.style["sortable"]
+        self._sort_col = None
+        self._sort_reverse = False
+
+        # The content never moves : the rows move inside it
+        width, height = self._get_viewport_size()
+        content = Zone(self, size=(width, height))
+        self._header_zone = Zone(content, size=(width, self._header_height))
+        self._body_zone = Zone(content, size=(width, max(height - self._header_height, 0)),
+                               pos=(0, self._header_height))
+        self._measuring_cell = DataGridCell(self._header_zone, visible=False)
+
+        self.set_columns(columns, headers=headers, col_widths=col_widths)
+
+    col_titles = property(lambda self: self._col_titles)
+    columns = property(lambda self: self._columns)
+    is_sortable = property(lambda self: self._is_sortable)
+    nbcols = property(lambda self: len(self._columns))
+    nbrows = property(lambda self: self._nbrows)
+    row_height = property(lambda self: self._row_height)
+    sort_col = property(lambda self: self._sort_col)
+    sort_reverse = property(lambda self: self._sort_reverse)
+
+    def _bind_row(self, row, display_index):
+        """Give the values of the row at display_index to the cells of row"""
+
+        index = display_index if self._order is None else int(self._order[display_index])
+        for col, cell in row.cells.items():
+            if col in self._visible_cols:  # the other cells will be recycled by _update_cells()
+                self._bind_cell(cell, index, col, self._columns[col][index])
+
+    def _get_content_size(self):
+
+        return self._col_lefts[-1], self._header_height + self._nbrows * self._row_height
+
+    def _get_header_text(self, col):
+
+        if col != self._sort_col:
+            return self._col_titles[col]
+        return self._col_titles[col] + (" v" if self._sort_reverse else " ^")
+
+    def _get_scrollval(self, axis):
+
+        if axis == "x":
+            return self._scroll_x
+        return self._scroll_y
+
+    def _get_viewport_size(self):
+
+        return (max(self.rect.w - self.padding.left - self.padding.right, 0),
+                max(self.rect.h - self.padding.top - self.padding.bottom, 0))
+
+    def _handle_header_click(self, col):
+
+        if col == self._sort_col:
+            self.sort(col, reverse=not self._sort_reverse)
+        else:
+            self.sort(col)
+
+    def _handle_mainwidget_resize(self):
+
+        if self._body_zone is None:
+            return
+
+        body_width, body_height = self._get_viewport_size()
+        body_height -= self._header_height
+        self.max = {
+            "x": max(0, self._col_lefts[-1] - body_width),
+            "y": max(0, self._nbrows * self._row_height - body_height),
+        }
+        self._scroll_x = min(self._scroll_x, self.max["x"])
+        self._scroll_y = min(self._scroll_y, self.max["y"])
+        self.x_scroller.update_from_mainwidget_resize()
+        self.y_scroller.update_from_mainwidget_resize()
+        self._update_cols()
+
+    def _measure_col(self, col):
+        """Return the width needed by the header and a sample of the values of the column"""
+
+        font = self._measuring_cell.font
+        column = self._columns[col]
+        step = max(self._nbrows // self._measured_rows, 1)
+        indexes = list(range(0, self._nbrows, step))
+        if self._nbrows and indexes[-1] != self._nbrows - 1:
+            indexes.append(self._nbrows - 1)
+        width = font.get_width(self._col_titles[col] + " ^")
+        for index in indexes:
+            width = max(width, font.get_width(str(column[index])))
+        return width + 2 * self._measuring_cell.style["text_padding"]
+
+    def _set_scrollval(self, axis, val):
+
+        val = round(val)
+        if axis == "x":
+            if val == self._scroll_x:
+                return
+            self._scroll_x = val
+            self._update_cols()
+        else:
+            if val == self._scroll_y:
+                return
+            self._scroll_y = val
+            self._update_rows()
+
+    def _update_cells(self, row):
+        """Show the cells of the visible columns in row, recycling the other cells"""
+
+        lefts = self._col_lefts
+        index = None
+        for col in tuple(row.cells):
+            if col not in self._visible_cols:
+                row.free_cells.append(row.cells.pop(col))
+
+        for col in self._visible_cols:
+            cell = row.cells.get(col)
+            if cell is None:
+                if row.free_cells:
+                    cell = row.free_cells.pop()
+                else:
+                    cell = self._cell_factory(row)
+                cell.resize(lefts[col + 1] - lefts[col], self._row_height)
+                if index is None:
+                    index = self.get_row_index(row.display_index)
+                self._bind_cell(cell, index, col, self._columns[col][index])
+                row.cells[col] = cell
+                if cell.is_hidden:
+                    cell.show()
+            cell.set_pos(topleft=(lefts[col] - self._scroll_x, 0))
+
+        for cell in row.free_cells:
+            if cell.is_visible:
+                cell.hide()
+
+    def _update_cols(self):
+        """Show the headers and the cells of the visible columns, after a horizontal scroll or a resize"""
+
+        if self._body_zone is None:
+            return
+        lefts = self._col_lefts
+        first = max(bisect.bisect_right(lefts, self._scroll_x) - 1, 0)
+        last = min(bisect.bisect_left(lefts, self._scroll_x + self._body_zone.rect.w), len(self._columns))
+        self._visible_cols = range(first, last)
+
+        with paint_lock:
+            if self._header_height:
+                for col in tuple(self._headers):
+                    if col not in self._visible_cols:
+                        self._free_headers.append(self._headers.pop(col))
+
+                for col in self._visible_cols:
+                    header = self._headers.get(col)
+                    if header is None:
+                        width = lefts[col + 1] - lefts[col]
+                        if self._free_headers:
+                            header = self._free_headers.pop()
+                            header.resize(width, self._header_height)
+                        else:
+                            header = Button(self._header_zone, "", size=(width, self._header_height), padding=2)
+                        header.text_widget.set_text(self._get_header_text(col))
+                        if self._is_sortable:
+                            header.command = functools.partial(self._handle_header_click, col)
+                        self._headers[col] = header
+                        if header.is_hidden:
+                            header.show()
+                    header.set_pos(topleft=(lefts[col] - self._scroll_x, 0))
+
+                for header in self._free_headers:
+                    if header.is_visible:
+                        header.hide()
+
+            for row in self._rows.values():
+                self._update_cells(row)
+            self._update_rows()
+
+    def _update_rows(self):
+        """Show the rows inside and near the viewport, recycling the other rows"""
+
+        body = self._body_zone
+        if body is None:
+            return
+        row_height = self._row_height
+        first = max(self._scroll_y // row_height - self._overscan, 0)
+        last = min((self._scroll_y + body.rect.h) // row_height + 1 + self._overscan, self._nbrows)
+
+        with paint_lock:
+            for display_index in tuple(self._rows):
+                if not first <= display_index < last:
+                    self._free_rows.append(self._rows.pop(display_index))
+
+            for display_index in range(first, last):
+                row = self._rows.get(display_index)
+                if row is None:
+                    if self._free_rows:
+                        row = self._free_rows.pop()
+                        row.display_index = display_index
+                        self._bind_row(row, display_index)
+                    else:
+                        row = _DataGridRow(body, size=(body.rect.w, row_height))
+                        row.display_index = display_index
+                    self._update_cells(row)  # the visible columns may have changed
+                    self._rows[display_index] = row
+                    if row.is_hidden:
+                        row.show()
+                row.set_pos(topleft=(0, display_index * row_height - self._scroll_y))
+
+            # The rows who haven't been reused wait for the next scroll
+            for row in self._free_rows:
+                if row.is_visible:
+                    row.hide()
+
+    def get_cell(self, display_index, col):
+        """Return the cell at this place of the grid, or None if it is too far from the viewport"""
+
+        row = self._rows.get(display_index)
+        if row is None:
+            return None
+        return row.cells.get(col)
+
+    def get_row_index(self, display_index):
+        """Return the index, in the columns, of the row displayed at display_index"""
+
+        return display_index if self._order is None else int(self._order[display_index])
+
+    def handle_resize(self):
+
+        super().handle_resize()
+        if self._body_zone is not None:
+            width, height = self._get_viewport_size()
+            with paint_lock:
+                self.main_widget.resize(width, height)
+                self._header_zone.resize_width(width)
+                self._body_zone.resize(width, max(height - self._header_height, 0))
+                for row in self._rows.values():
+                    row.resize_width(width)
+                for row in self._free_rows:
+                    row.resize_width(width)
+                self._handle_mainwidget_resize()
+
+    def refresh(self):
+        """Give the values to the cells again, and update the scrollbars, after a change in the columns"""
+
+        with paint_lock:
+            for row in self._rows.values():
+                row.free_cells.extend(row.cells.values())
+                row.cells.clear()
+            self._free_rows.extend(self._rows.values())
+            self._rows.clear()
+            self._free_headers.extend(self._headers.values())
+            self._headers.clear()
+            self._handle_mainwidget_resize()
+
+    def scroll_to(self, display_index):
+        """Scroll so the row at display_index is at the top of the viewport, or as close as possible"""
+
+        val = min(max(display_index * self._row_height, 0), self.max["y"])
+        self.y_scroller.set_val(val)
+
+    def set_col_width(self, col, width):
+        """Set the width of a column, None means the width is measured"""
+
+        assert width is None or (isinstance(width, int) and width > 0), width
+        if width is None:
+            width = self._measure_col(col)
+        diff = width - (self._col_lefts[col + 1] - self._col_lefts[col])
+        for i in range(col + 1, len(self._col_lefts)):
+            self._col_lefts[i] += diff
+        self.refresh()
+
+    def set_columns(self, columns, headers=None, col_widths=None):
+        """
+        Replace the table
+        columns is a sequence of columns, or a dictionnary : header -> column
+        col_widths is a sequence of widths, None values are measured (default : the 'col_width' style attribute)
+        """
+
+        if isinstance(columns, dict):
+            assert headers is None, "The headers are the keys of the dictionnary"
+            headers = tuple(str(header) for header in columns)
+            columns = tuple(columns.values())
+        else:
+            columns = tuple(columns)
+            if headers is None:
+                headers = tuple(str(col) for col in range(len(columns)))
+        assert len(headers) == len(columns), "Every column needs a header"
+        nbrows = len(columns[0]) if columns else 0
+        for column in columns:
+            if len(column) != nbrows:
+                raise ValueError("All the columns must have the same length")
+        if col_widths is None:
+            col_widths = (self.style["col_width"],) * len(columns)
+        assert len(col_widths) == len(columns), "Every column needs a width"
+
+        self._columns = columns
+        self._col_titles = tuple(headers)
+        self._nbrows = nbrows
+        self._sort_col = None
+        self._sort_reverse = False
+        self._order = None
+
+        self._col_lefts = [0]
+        for col, width in enumerate(col_widths):
+            if width is None:
+                width = self._measure_col(col)
+            self._col_lefts.append(self._col_lefts[-1] + width)
+
+        self.refresh()
+
+    def sort(self, col, reverse=False):
+        """Sort the rows by the values of the column, col=None restores the order of the columns"""
+
+        if col is None:
+            self._order = None
+        else:
+            self._order = _argsort(self._columns[col], reverse=reverse)
+        self._sort_col = col
+        self._sort_reverse = bool(reverse) and col is not None
+        self.refresh()
@@ -1,9 +1,9 @@
-import time
 import pygame
 from baopig.documentation import ScrollableByMouse as ScrollableByMouseDoc
 from baopig.io import keyboard
+from baopig.time.utilities import clock
 from baopig.lib import Rectangle
-from baopig.lib import Zone, LayersManager
+from baopig.lib import Zone, LayersManager, paint_lock
 from .slider import Slider, SliderBar, SliderBloc
 
 
@@ -23,11 +23,13 @@ class ScrollBloc(SliderBloc):
 
     def update_length(self):
 
+        content_size = self.slider.parent._get_content_size()
         try:
+            # At least a square, a very long content would give an invisible bloc
             if self.slider.axis == "x":
-                self.resize_width(int(self.slider.rect.width ** 2 / self.slider.parent.main_widget.rect.width))
+                self.resize_width(max(int(self.slider.rect.width ** 2 / content_size[0]), self.slider.rect.height))
             else:
-                self.resize_height(int(self.slider.rect.height ** 2 / self.slider.parent.main_widget.rect.height))
+                self.resize_height(max(int(self.slider.rect.height ** 2 / content_size[1]), self.slider.rect.width))
         except ZeroDivisionError:  # main_widget's length is null
             pass
 
@@ -106,10 +108,7 @@ class ScrollSlider(Slider):
 
         self._range = self._maxval = maxval
 
-        if self.axis == "x":
-            val = - self.parent.main_widget.rect.left + self.parent.padding.left
-        else:
-            val = - self.parent.main_widget.rect.top + self.parent.padding.top
+        val = self.parent._get_scrollval(self.axis)
 
         if val == self.val:
             self.bloc.update()
@@ -125,6 +124,12 @@ class ScrollSlider(Slider):
 
 
 class ScrollView(ScrollableByMouseDoc, Zone):
+    """
+    A ScrollView is a Zone who shows a part of a bigger widget, its main widget
+
+    When the main widget scrolls, the pixels already in the viewport are shifted with
+    pygame.Surface.scroll(), so only the newly exposed strips are painted again
+    """
     STYLE = Zone.STYLE.substyle()
     STYLE.create(
         scrollslider_class=ScrollSlider
@@ -132,6 +137,8 @@ class ScrollView(ScrollableByMouseDoc, Zone):
 
     def __init__(self, parent, **kwargs):
 
+        self._scroll_requests = None  # the change requests received while the main widget moves, see _set_scrollval()
+
         Zone.__init__(self, parent, **kwargs)
 
         self.max = {"x": 0, "y": 0}
@@ -162,6 +169,18 @@ class ScrollView(ScrollableByMouseDoc, Zone):
             self._handle_mainwidget_resize()
             self.main_widget.signal.RESIZE.connect(self._handle_mainwidget_resize, owner=None)
 
+    def _get_content_size(self):
+        """Return the size of the scrolled content"""
+
+        return self.main_widget.rect.size
+
+    def _get_scrollval(self, axis):
+        """Return how far the content is scrolled, along the axis"""
+
+        if axis == "x":
+            return - self.main_widget.rect.left + self.padding.left
+        return - self.main_widget.rect.top + self.padding.top
+
     def _handle_mainwidget_resize(self):
 
         rect = pygame.Rect(self.main_widget.rect)
@@ -187,17 +206,91 @@ class ScrollView(ScrollableByMouseDoc, Zone):
         self.x_scroller.update_from_mainwidget_resize()
         self.y_scroller.update_from_mainwidget_resize()
 
+    def _scroll_surface(self, dx, dy):
+        """
+        Shift the pixels of the viewport by (dx, dy), after the main widget moved by (dx, dy)
+        Only the exposed strips, the other children and the rects who were already dirty are painted again
+        """
+
+        border = self._border_width * 2 - 1 if self._border_width else 0  # see Container._update_rect()
+        area = self.auto_rect.inflate(-2 * border, -2 * border)
+        if self.is_hidden or self.background_image is not None or abs(dx) >= area.w or abs(dy) >= area.h:
+            self._warn_change(area)
+            return
+
+        with paint_lock:
+            self.surface.subsurface(area).scroll(dx, dy)
+
+            # The pixels of a dirty rect were wrong, now the wrong pixels are also at the shifted rect
+            for rect in tuple(self._dirty_region):
+                self._dirty_region.add(rect.move(dx, dy).clip(area))
+
+            if dx > 0:
+                self._dirty_region.add((area.left, area.top, dx, area.h))
+            elif dx < 0:
+                self._dirty_region.add((area.right + dx, area.top, -dx, area.h))
+            if dy > 0:
+                self._dirty_region.add((area.left, area.top, area.w, dy))
+            elif dy < 0:
+                self._dirty_region.add((area.left, area.bottom + dy, area.w, -dy))
+
+            # The border isn't shifted, but the main widget may cover it
+            if border:
+                width, height = self.rect.size
+                for rect in ((0, 0, width, border), (0, height - border, width, border),
+                             (0, border, border, height - 2 * border), (width - border, border, border, height - 2 * border)):
+                    self._dirty_region.add(rect)
+
+            # The other children, like the scrollers, didn't move : they have been shifted with the pixels
+            main_widget = self.main_widget
+            for layer in self.layers:
+                for child in layer.get_visible_colliding(area):
+                    if child is not main_widget:
+                        self._dirty_region.add(child.hitbox.clip(area))
+                        self._dirty_region.add(child.hitbox.move(dx, dy).clip(area))
+
+        self._warn_scene()
+        self._warn_parent(area)
+
     def _set_scrollval(self, axis, val):
 
-        if axis == "x":
-            self.main_widget.set_pos(left=-val + self.padding.left)
-        else:
-            self.main_widget.set_pos(top=-val + self.padding.top)
+        main_widget = self.main_widget
+        old_pos = main_widget.rect.topleft
+        old_hitbox = pygame.Rect(main_widget.hitbox)
+        with paint_lock:
+            self._scroll_requests = []
+            try:
+                if axis == "x":
+                    main_widget.set_pos(left=-val + self.padding.left)
+                else:
+                    main_widget.set_pos(top=-val + self.padding.top)
+            finally:
+                requests, self._scroll_requests = self._scroll_requests, None
+            dx = main_widget.rect.left - old_pos[0]
+            dy = main_widget.rect.top - old_pos[1]
+
+            # The motion of the main widget doesn't invalidate the viewport, see _scroll_surface()
+            # Other widgets may have moved with it, like the ones placed from the main widget : their
+            # rects are dirty before the pixels are shifted, so the shifted rects are dirty too
+            own_request = main_widget.hitbox.union(old_hitbox)
+            if own_request in requests:
+                requests.remove(own_request)
+            for rect in requests:
+                super()._warn_change(rect)
+            if dx or dy:
+                self._scroll_surface(dx, dy)
+
+    def _warn_change(self, rect):
+
+        if self._scroll_requests is not None:  # the main widget is moving, see _set_scrollval()
+            self._scroll_requests.append(pygame.Rect(rect))
+            return
+        super()._warn_change(rect)
 
     def handle_mouse_scroll(self, scroll_event):
 
         old_scroll_time = self._last_scroll_time
-        self._last_scroll_time = time.time()
+        self._last_scroll_time = clock.get_time()
         d = self._last_scroll_time - old_scroll_time
 
         accelerator = max(20., 1 / d)
@@ -204,7 +204,7 @@ class Slider(Container, LinkableByMouse):
         # x = (val - min) / (max - min) * max_index
         self.bloc.update()
         current_x = self.bloc.rect.left if self.axis == "x" else self.bloc.rect.top
-        if current_x == 0:
+        if x is not None and current_x == 0:
             self._val = self.minval  # prevent approximations
         self.signal.NEW_VAL.emit(self.val)
 
@@ -11,7 +11,7 @@ separators = " ,„.…:;/\'\"`´”’" \
              ""
 
 
-class _Line(Widget):
+class _Line(Poolable, Widget):
     """
     A Line is a component who only have text on its surface
     It has a transparent background
@@ -52,14 +52,42 @@ class _Line(Widget):
 
         assert isinstance(parent, Text)
 
+        self._line_index = line_index
+        self._font = parent.font  # still readable when the line is asleep, see _recycle()
+        Widget.__init__(self, parent=parent, layer=parent.lines, name=f"{self.__class__.__name__[1:]}({text})",
+                        surface=self._render(parent, text))
+        self._set_text(parent, text, end)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(index={self.line_index}, text={self.text})"
+
+    def __str__(self):
+        return self.text
+
+    end = property(lambda self: self._end)
+    font = property(lambda self: self._font)
+    line_index = property(lambda self: self._line_index)
+    text = property(lambda self: self._text)
+    text_with_end = property(lambda self: self._text + self._end)
+
+    @staticmethod
+    def _render(parent, text):
+
         font_render = parent.font.render(text)
-        surf_w = font_render.get_width()
-        surface = pygame.Surface((surf_w, parent.font.height), pygame.SRCALPHA)
+        surface = pygame.Surface((font_render.get_width(), parent.font.height), pygame.SRCALPHA)
         surface.blit(font_render, (0, 0))
+        return surface
 
+    def _recycle(self, parent, text, line_index, end):
+
+        surface = self._render(parent, text)
         self._line_index = line_index
-        Widget.__init__(self, parent=parent, layer=parent.lines, name=f"{self.__class__.__name__[1:]}({text})",
-                        surface=surface)
+        self._name = f"{self.__class__.__name__[1:]}({text})"
+        self._asked_size = surface.get_size()
+        self.set_surface(surface)
+        self._set_text(parent, text, end)
+
+    def _set_text(self, parent, text, end):
 
         assert end in ('\n', '')
         if parent.width_is_adaptable:
@@ -77,18 +105,6 @@ class _Line(Widget):
         self._chars_pos = []
         self.update_char_pos()
 
-    def __repr__(self):
-        return f"{self.__class__.__name__}(index={self.line_index}, text={self.text})"
-
-    def __str__(self):
-        return self.text
-
-    end = property(lambda self: self._end)
-    font = property(lambda self: self._parent._font)
-    line_index = property(lambda self: self._line_index)
-    text = property(lambda self: self._text)
-    text_with_end = property(lambda self: self._text + self._end)
-
     def find_index(self, x, only_left=False):
         """
         Renvoie l'index correspondant a la separation de deux lettres la plus proche de x
@@ -256,6 +272,12 @@ class _SelectableLine(_Line):
     selection = property(lambda self: self._selection_ref())
     selector = property(lambda self: self._parent.selector)
 
+    def _recycle(self, *args, **kwargs):
+
+        self._selection_ref = lambda: None  # the selection died with the previous line
+        self._is_selected = False
+        super()._recycle(*args, **kwargs)
+
     def check_select(self, selection_rect):
         """
         Method called by the selector each time the selection_rect rect changes
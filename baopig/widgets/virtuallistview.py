@@ -0,0 +1,170 @@
+from baopig.lib import Zone, paint_lock
+from .scrollview import ScrollView
+from .text import Text
+
+
+def _create_text_row(parent):
+    return Text(parent, "")
+
+
+def _bind_text_row(row, index, item):
+    row.set_text(str(item))
+
+
+class VirtualListView(ScrollView):
+    """
+    A VirtualListView is a ScrollView showing a long list of items, one row per item
+
+    Only the rows inside the viewport, plus a few rows around it (see the 'overscan' style
+    attribute), exist as widgets. When the list scrolls, the rows leaving the viewport are
+    recycled for the items entering it, so the memory doesn't depend on the length of the list.
+    The scrollbar is sized from the number of items.
+
+    The items come from a source : any object with a length and an item getter, like a list.
+    A row is created by row_factory(parent), then receives an item through
+    bind_row(row, index, item). By default, a row is a Text showing str(item).
+    Every row has the same height, the 'row_height' style attribute.
+
+    Example :
+
+        VirtualListView(scene, source=range(1000000), size=(300, 400))
+
+        VirtualListView(scene, source=users, size=(300, 400), row_height=30,
+                        row_factory=lambda parent: Button(parent, "", width="100%"),
+                        bind_row=lambda row, index, user: row.text_widget.set_text(user.name))
+
+    When the items of the source change, refresh() updates the rows
+    """
+
+    STYLE = ScrollView.STYLE.substyle()
+    STYLE.create(
+        row_height=20,
+        overscan=2,  # number of extra rows above and below the viewport
+    )
+    STYLE.set_constraint("row_height", lambda val: isinstance(val, int) and val > 0, "must be a positive integer")
+    STYLE.set_constraint("overscan", lambda val: isinstance(val, int) and val >= 0, "must be a positive integer")
+
+    def __init__(self, parent, source, row_factory=None, bind_row=None, **kwargs):
+
+        # Needed by _handle_mainwidget_resize(), called during the construction
+        self._source = source
+        self._scroll_y = 0
+        self._rows = {}  # index -> row showing the item at index
+        self._free_rows = []  # hidden rows, ready to be recycled
+
+        ScrollView.__init__(self, parent, **kwargs)
+
+        self._row_factory = _create_text_row if row_factory is None else row_factory
+        self._bind_row = _bind_text_row if bind_row is None else bind_row
+        self._row_height = self.style["row_height"]
+        self._overscan = self.style["overscan"]
+
+        # The content never moves : the rows move inside it
+        Zone(self, size=self._get_viewport_size())
+        self._update_rows()
+
+    row_height = property(lambda self: self._row_height)
+    source = property(lambda self: self._source)
+
+    def _get_content_size(self):
+
+        return self.main_widget.rect.w, len(self._source) * self._row_height
+
+    def _get_scrollval(self, axis):
+
+        if axis == "x":
+            return 0
+        return self._scroll_y
+
+    def _get_viewport_size(self):
+
+        return (max(self.rect.w - self.padding.left - self.padding.right, 0),
+                max(self.rect.h - self.padding.top - self.padding.bottom, 0))
+
+    def _handle_mainwidget_resize(self):
+
+        if self._main_widget is None:
+            return
+
+        self.max = {
+            "x": 0,
+            "y": max(0, len(self._source) * self._row_height - self.main_widget.rect.h),
+        }
+        if self._scroll_y > self.max["y"]:
+            self._scroll_y = self.max["y"]
+        self.x_scroller.update_from_mainwidget_resize()
+        self.y_scroller.update_from_mainwidget_resize()
+        self._update_rows()
+
+    def _set_scrollval(self, axis, val):
+
+        if axis == "x":
+            return
+        val = round(val)
+        if val == self._scroll_y:
+            return
+        self._scroll_y = val
+        self._update_rows()
+
+    def _update_rows(self):
+        """Show the rows of the items inside and near the viewport, recycling the other rows"""
+
+        content = self.main_widget
+        if content is None:
+            return
+        row_height = self._row_height
+        first = max(self._scroll_y // row_height - self._overscan, 0)
+        last = min((self._scroll_y + content.rect.h) // row_height + 1 + self._overscan, len(self._source))
+
+        with paint_lock:
+            for index in tuple(self._rows):
+                if not first <= index < last:
+                    self._free_rows.append(self._rows.pop(index))
+
+            for index in range(first, last):
+                row = self._rows.get(index)
+                if row is None:
+                    if self._free_rows:
+                        row = self._free_rows.pop()
+                    else:
+                        row = self._row_factory(content)
+                    self._bind_row(row, index, self._source[index])
+                    self._rows[index] = row
+                    if row.is_hidden:
+                        row.show()
+                row.set_pos(topleft=(0, index * row_height - self._scroll_y))
+
+            # The rows who haven't been reused wait for the next scroll
+            for row in self._free_rows:
+                if row.is_visible:
+                    row.hide()
+
+    def get_row(self, index):
+        """Return the row showing the item at index, or None if it is too far from the viewport"""
+
+        return self._rows.get(index)
+
+    def handle_resize(self):
+
+        super().handle_resize()
+        if self._main_widget is not None:
+            self.main_widget.resize(*self._get_viewport_size())
+
+    def refresh(self):
+        """Give the items to the rows again, and update the scrollbar, after a change in the source"""
+
+        with paint_lock:
+            self._free_rows.extend(self._rows.values())
+            self._rows.clear()
+            self._handle_mainwidget_resize()
+
+    def scroll_to(self, index):
+        """Scroll so the item at index is at the top of the viewport, or as close as possible"""
+
+        val = min(max(index * self._row_height, 0), self.max["y"])
+        self.y_scroller.set_val(val)
+
+    def set_source(self, source):
+
+        self._source = source
+        self.refresh()
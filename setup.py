@@ -46,5 +46,8 @@ setup(
         "pygame",
         "httpcore",
         "httpx[http2]"
-    ]
+    ],
+    extras_require={
+        "numpy": ["numpy"],  # Scene.set_geometry_store(), faster DataGrid sorts and render diagnostics
+    }
 )